@@ -0,0 +1,51 @@
+"""
+Time parsing a document whose top level blocks are mostly excluded, with
+the excluded blocks skipped (the default) and parsed (--override-exclude).
+
+Usage:
+    python -m benchmarks.excluded --keys 200000 --exclude-fraction 0.9
+"""
+import argparse
+import io
+import os
+import tempfile
+
+import yamldoc
+from benchmarks.generate import generate
+from benchmarks.run import _best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.excluded")
+    parser.add_argument("--keys", type=int, default=200_000)
+    parser.add_argument("--exclude-fraction", type=float, default=0.9)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    text, _ = generate(
+        args.keys, seed=args.seed, width=50, depth=2, exclude_fraction=args.exclude_fraction
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.yaml")
+        with open(path, "w") as f:
+            f.write(text)
+
+        times = {}
+        for name, override in (("skipped", False), ("parsed", True)):
+            times[name], _ = _best(
+                lambda: yamldoc.parse_yaml(path, override_exclude=override), args.repeat
+            )
+        main_time, _ = _best(
+            lambda: yamldoc.main(path, output=io.StringIO(), footer=False), args.repeat
+        )
+
+    print(f"keys={args.keys} exclude_fraction={args.exclude_fraction}")
+    print(f"parse, excluded blocks skipped: {times['skipped']:8.3f} s")
+    print(f"parse, excluded blocks parsed:  {times['parsed']:8.3f} s")
+    print(f"speedup:                        {times['parsed'] / times['skipped']:8.2f}x")
+    print(f"main, excluded blocks skipped:  {main_time:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Seeded generator of YAML and schema pairs for benchmarking.
+
+The documents only use the subset of YAML that yamldoc understands: key
+value pairs, nested mappings, dash lists, ``#'`` comments and ``#'!``
+excluded blocks.
+"""
+import random
+
+# Shapes used by the benchmark runner. Each is a set of keyword arguments
+# for generate().
+SHAPES = {
+    "wide": dict(width=1000, depth=1),
+    "deep": dict(width=10, depth=4),
+    "lists": dict(width=50, depth=1, list_fraction=0.5, list_length=50),
+    "comments": dict(width=50, depth=1, comment_lines=8),
+    "excluded": dict(width=50, depth=1, exclude_fraction=0.8),
+}
+
+_TYPES = ["string", "number", "boolean", "array"]
+_WORDS = (
+    "sample reads genome threads memory output input path reference index "
+    "filter quality trim adapter align sort merge call variant depth "
+    "coverage report log temp cache cluster queue retry timeout"
+).split()
+
+
+def _comment(rng, char, lines):
+    out = []
+    for _ in range(lines):
+        n = rng.randint(4, 12)
+        out.append(char + " " + " ".join(rng.choice(_WORDS) for _ in range(n)) + ".")
+    return out
+
+
+def _value(rng):
+    kind = rng.randrange(4)
+    if kind == 0:
+        return str(rng.randint(0, 10_000))
+    if kind == 1:
+        return rng.choice(["yes", "no", "True", "False"])
+    if kind == 2:
+        return '"' + "/".join(rng.choice(_WORDS) for _ in range(3)) + '"'
+    return f"{rng.random():.4f}"
+
+
+def generate(
+    n_keys,
+    seed=0,
+    width=50,
+    depth=1,
+    comment_lines=1,
+    list_fraction=0.0,
+    list_length=10,
+    exclude_fraction=0.0,
+    char="#'",
+    exclude_char="#'!",
+):
+    """
+    Generate a YAML document and a matching schema.
+
+    Arguments:
+        n_keys: Approximate number of leaf keys (list items count as keys).
+        seed: Seed for the random number generator.
+        width: Number of leaf keys in each innermost section.
+        depth: Levels of mappings above the leaf keys.
+        comment_lines: Lines of yamldoc comment above each key.
+        list_fraction: Fraction of top level blocks that are dash lists.
+        list_length: Number of items in each dash list.
+        exclude_fraction: Fraction of top level blocks marked with exclude_char.
+
+    Returns:
+        Tuple of (yaml, schema) text.
+    """
+    rng = random.Random(seed)
+    yaml = []
+    schema = [
+        '$schema: "http://json-schema.org/draft-04/schema#"',
+        "",
+        "type: object",
+        "",
+        "properties:",
+    ]
+
+    block = 0
+    keys = 0
+    while keys < n_keys:
+        name = f"block{block}"
+        block += 1
+
+        marker = exclude_char if rng.random() < exclude_fraction else char
+        yaml.extend(_comment(rng, marker, max(comment_lines, 1)))
+
+        if rng.random() < list_fraction:
+            yaml.append(f"{name}:")
+            for _ in range(list_length):
+                yaml.append(f"  - {_value(rng)}")
+            schema.append(f"    {name}:")
+            schema.append("        type: array")
+            keys += list_length
+            continue
+
+        yaml.append(f"{name}:")
+        schema.append(f"    {name}:")
+        schema.append("        type: object")
+        schema.append("        properties:")
+
+        # Nested mappings down to the leaf section. Section names have to
+        # be unique because parse_schema names sections by their own key.
+        indent = 1
+        for level in range(1, depth):
+            section = f"{name}_{level}"
+            yaml.append("  " * indent + f"{section}:")
+            schema.append("    " * (2 * level + 1) + f"{section}:")
+            schema.append("    " * (2 * level + 2) + "type: object")
+            schema.append("    " * (2 * level + 2) + "properties:")
+            indent += 1
+
+        prop_indent = "    " * (2 * depth + 1)
+        for k in range(width):
+            key = f"key{k}"
+            for line in _comment(rng, char, comment_lines):
+                yaml.append("  " * indent + line)
+            yaml.append("  " * indent + f"{key}: {_value(rng)}")
+            schema.append(prop_indent + f"{key}:")
+            schema.append(prop_indent + f"    type: {rng.choice(_TYPES)}")
+        keys += width
+
+    return "\n".join(yaml) + "\n", "\n".join(schema) + "\n"
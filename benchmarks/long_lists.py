@@ -0,0 +1,81 @@
+"""
+Measure parsing and rendering a file holding one very long list, shown in
+full and cut short by a ListPolicy.
+
+Usage:
+    python -m benchmarks.long_lists --items 200000 --limit 10
+"""
+import argparse
+import gc
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import yamldoc
+from yamldoc.entries import ListPolicy
+
+
+def generate(items):
+    """Returns a YAML document with a list of the given length and a few keys."""
+    lines = ["#' A long list of samples.", "samples:"]
+    lines.extend(f"  - sample_{i:08d}" for i in range(items))
+    lines.extend(["#' A short list.", "short:", "  - a", "  - b", "other: 1", ""])
+    return "\n".join(lines)
+
+
+def measure(path, limit):
+    """
+    Parse and render a YAML file.
+
+    Returns:
+        Tuple of (bytes retained by the parsed document, seconds to parse,
+        seconds to render in full, bytes in full, seconds to render cut
+        short, bytes cut short).
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        yaml = yamldoc.parse_yaml(path)
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    yamldoc.parse_yaml(path)
+    parse = time.perf_counter() - start
+
+    results = [retained, parse]
+    for lists in (None, ListPolicy(limit)):
+        out = io.StringIO()
+        start = time.perf_counter()
+        yamldoc.render(yaml, out, footer=False, lists=lists)
+        results.extend([time.perf_counter() - start, len(out.getvalue())])
+
+    return tuple(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.long_lists")
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.yaml")
+        with open(path, "w") as f:
+            f.write(generate(args.items))
+
+        retained, parse, full, full_size, cut, cut_size = measure(path, args.limit)
+
+    print(f"items={args.items} limit={args.limit}")
+    print(f"retained: {retained / 2**20:8.1f} MiB")
+    print(f"parse:    {parse:8.3f} s")
+    print(f"render:   {full:8.3f} s, {full_size:>10} bytes in full")
+    print(f"render:   {cut:8.3f} s, {cut_size:>10} bytes cut to {args.limit} items")
+
+
+if __name__ == "__main__":
+    main()
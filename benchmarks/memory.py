@@ -0,0 +1,58 @@
+"""
+Measure the memory held by a parsed document with tracemalloc.
+
+Usage:
+    python -m benchmarks.memory --keys 1000000 --shape lists
+"""
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+
+import yamldoc
+from benchmarks.generate import SHAPES, generate
+
+
+def measure(path):
+    """
+    Parse a YAML file and report the memory the result holds on to.
+
+    Returns:
+        Tuple of (number of top level entries, bytes retained, peak bytes).
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        yaml = yamldoc.parse_yaml(path)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return len(yaml), current, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory")
+    parser.add_argument("--keys", type=int, default=200_000)
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="wide")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    text, _ = generate(args.keys, seed=args.seed, **SHAPES[args.shape])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.yaml")
+        with open(path, "w") as f:
+            f.write(text)
+        del text
+
+        n, current, peak = measure(path)
+
+    print(f"shape={args.shape} keys={args.keys} top_level={n}")
+    print(f"retained: {current / 2**20:8.1f} MiB ({current / args.keys:6.1f} bytes/key)")
+    print(f"peak:     {peak / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Time documenting a generated file with a schema without the render cache,
+on a cache miss and on a cache hit.
+
+Usage:
+    python -m benchmarks.render_cache --keys 100000
+"""
+import argparse
+import io
+import os
+import shutil
+import tempfile
+
+import yamldoc
+from benchmarks.generate import generate
+from benchmarks.run import _best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.render_cache")
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    yaml_text, schema_text = generate(args.keys, seed=args.seed, depth=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        yaml_path = os.path.join(tmp, "bench.yaml")
+        schema_path = os.path.join(tmp, "bench.schema")
+        cache_dir = os.path.join(tmp, "renders")
+        with open(yaml_path, "w") as f:
+            f.write(yaml_text)
+        with open(schema_path, "w") as f:
+            f.write(schema_text)
+
+        def run(render_cache=None):
+            yamldoc.main(
+                yaml_path, schema_path=schema_path, output=io.StringIO(),
+                deterministic=True, render_cache=render_cache,
+            )
+
+        def miss():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            run(cache_dir)
+
+        uncached, _ = _best(run, args.repeat)
+        missed, _ = _best(miss, args.repeat)
+        run(cache_dir)
+        hit, _ = _best(lambda: run(cache_dir), args.repeat)
+
+    print(f"keys={args.keys}")
+    print(f"no render cache: {uncached:8.3f} s")
+    print(f"cache miss:      {missed:8.3f} s")
+    print(f"cache hit:       {hit:8.3f} s")
+    print(f"speedup:         {uncached / hit:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
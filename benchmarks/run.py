@@ -0,0 +1,177 @@
+"""
+Time each phase of yamldoc on generated documents and compare with a baseline.
+
+Usage:
+    python -m benchmarks.run --sizes 1000 10000 --output results.json
+    python -m benchmarks.run --baseline results.json --tolerance 0.25
+
+parse_yaml, parse_schema, add_type_metadata and rendering are timed
+separately for every shape in benchmarks.generate.SHAPES and every size.
+Results are written as JSON. Given a baseline from an earlier run, any
+phase that is slower than the baseline by more than the tolerance is
+reported and the exit status is 1.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import yamldoc
+import yamldoc.parser
+from benchmarks.generate import SHAPES, generate
+
+PHASES = ["parse_yaml", "parse_schema", "add_type_metadata", "render"]
+
+
+def _best(function, repeat):
+    """Returns the fastest of repeat calls of function, in seconds, and its result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def time_phases(yaml_path, schema_path, repeat=3):
+    """
+    Time each phase of documenting one YAML file with its schema.
+
+    Arguments:
+        yaml_path: Path to YAML file.
+        schema_path: Path to schema file.
+        repeat: Number of times each phase is run; the fastest is kept.
+
+    Returns:
+        Dictionary mapping phase name to seconds.
+    """
+    times = {}
+
+    times["parse_yaml"], _ = _best(lambda: yamldoc.parse_yaml(yaml_path), repeat)
+    times["parse_schema"], parsed = _best(
+        lambda: yamldoc.parser.parse_schema(schema_path), repeat
+    )
+    schema = parsed[0]
+
+    # The merge and render modify the parsed document, so each repeat
+    # starts from a fresh parse that is not timed.
+    merge = float("inf")
+    for _ in range(repeat):
+        yaml = yamldoc.parse_yaml(yaml_path)
+        start = time.perf_counter()
+        yamldoc.parser.add_type_metadata(schema, yaml)
+        merge = min(merge, time.perf_counter() - start)
+    times["add_type_metadata"] = merge
+
+    times["render"], _ = _best(
+        lambda: yamldoc.render(yaml, io.StringIO(), schema=True), repeat
+    )
+
+    return times
+
+
+def run(sizes, shapes=None, seed=0, repeat=3):
+    """
+    Generate documents and time every phase on each of them.
+
+    Arguments:
+        sizes: Numbers of keys to generate.
+        shapes: Names of shapes from SHAPES. Defaults to all of them.
+        seed: Seed for the generator.
+        repeat: Number of times each phase is run.
+
+    Returns:
+        Dictionary ready to be written as JSON.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for shape in shapes or SHAPES:
+            for size in sizes:
+                text, schema_text = generate(size, seed=seed, **SHAPES[shape])
+                yaml_path = os.path.join(tmp, f"{shape}-{size}.yaml")
+                schema_path = os.path.join(tmp, f"{shape}-{size}.schema")
+                with open(yaml_path, "w") as f:
+                    f.write(text)
+                with open(schema_path, "w") as f:
+                    f.write(schema_text)
+
+                times = time_phases(yaml_path, schema_path, repeat)
+                for phase in PHASES:
+                    results.append(
+                        {"case": f"{shape}-{size}", "phase": phase, "seconds": times[phase]}
+                    )
+                print(
+                    f"{shape:>10} {size:>9} "
+                    + " ".join(f"{phase}={times[phase]:.4f}s" for phase in PHASES),
+                    file=sys.stderr,
+                )
+
+    return {
+        "yamldoc": yamldoc.__version__,
+        "python": platform.python_version(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Find phases that got slower than the baseline.
+
+    Arguments:
+        results: Output of run.
+        baseline: Output of an earlier run.
+        tolerance: Allowed slowdown as a fraction, e.g. 0.25 for 25%.
+
+    Returns:
+        List of (case, phase, baseline seconds, seconds) for each regression.
+    """
+    before = {(r["case"], r["phase"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for r in results["results"]:
+        key = (r["case"], r["phase"])
+        if key in before and r["seconds"] > before[key] * (1 + tolerance):
+            regressions.append((r["case"], r["phase"], before[key], r["seconds"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--shapes", nargs="+", choices=sorted(SHAPES), default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None, help="Write results to this file.")
+    parser.add_argument("--baseline", default=None, help="Results to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.shapes, args.seed, args.repeat)
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for case, phase, before, after in regressions:
+            print(
+                f"REGRESSION {case} {phase}: {before:.4f}s -> {after:.4f}s",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Time add_type_metadata on growing documents to check that it scales linearly.
+
+Usage:
+    python -m benchmarks.schema_merge
+"""
+import gc
+import time
+
+import yamldoc.entries
+import yamldoc.parser
+
+
+def build(n_sections, keys_per_section):
+    """Build a parsed document and a matching schema with every key typed."""
+    yaml = []
+    schema = {"base": {}}
+    for s in range(n_sections):
+        name = f"section{s}"
+        meta = yamldoc.entries.MetaEntry(name, "", "#'")
+        schema[name] = {}
+        for k in range(keys_per_section):
+            meta.entries.append(yamldoc.entries.Entry(f"key{k}", str(k), ""))
+            schema[name][f"key{k}"] = "string"
+        yaml.append(meta)
+
+        yaml.append(yamldoc.entries.Entry(f"flat{s}", "1", ""))
+        schema["base"][f"flat{s}"] = "number"
+
+    return schema, yaml
+
+
+def run(sizes=(1_000, 10_000, 100_000, 1_000_000), keys_per_section=100, repeat=3):
+    print(f"{'keys':>10} {'seconds':>10} {'ns/key':>10}")
+    for size in sizes:
+        schema, yaml = build(size // keys_per_section, keys_per_section)
+        best = float("inf")
+        for _ in range(repeat):
+            # Like timeit, keep the garbage collector out of the measurement.
+            gc.disable()
+            start = time.perf_counter()
+            yamldoc.parser.add_type_metadata(schema, yaml)
+            best = min(best, time.perf_counter() - start)
+            gc.enable()
+        print(f"{size:>10} {best:>10.4f} {best / size * 1e9:>10.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,190 @@
+"""
+A copy of the line-by-line parser that yamldoc used before the indent-stack
+engine, kept for differential tests of the new engine.
+"""
+import yamldoc.entries
+from yamldoc.parser import _open_text
+
+
+def legacy_iter_yaml(
+    file_path, char="#'", debug=False, exclude_char="#'!", override_exclude=False, profile=None
+):
+    """
+    Lazily parse a YAML file, yielding each top level block as soon as it is complete.
+
+    The file is read one line at a time, so only the block currently being
+    parsed is held in memory.
+
+    Arguments:
+        file_path: Path to the YAML file, or an open text file object.
+        char: A character string used to identify yamldoc blocks.
+        debug: Print debug information
+        exclude_char: A character string used to identify blocks to exclude.
+        override_exclude: Override the exclusion character and force inclusion.
+        profile: (Optional) yamldoc.profile.Profile to count the lines read in.
+
+    Yields:
+        Top level Entry or MetaEntry objects, in file order.
+    """
+
+    # The parser works as follows:
+    #   YAML files have key value pairings seperated by
+    #   newlines. The most straightforward kind of things to parse will be
+    #   keyvalue pairs preceeded by comments with the Doxygen marker #'
+    #   (or whatever the user specifies). The parser will look for these
+    #   comments and then parse the key value pairs that follow. The
+    #   parser will then look for the next comment and repeat the
+    #   process. The parser will also look for a comment that starts with
+    #   the exclude_char and ignore the following block.
+
+    current_entry = None
+    meta = ""
+    nlines = 0
+
+    with _open_text(file_path) as yaml:
+        for nlines, line in enumerate(yaml, 1):
+            if not line.rstrip():
+                continue
+
+            if debug:
+                print(line.rstrip())
+
+            if current_entry is not None:
+                if current_entry.isBase:
+                    # If we're back at 0 indentation, the
+                    # block is done and we need to quit.
+                    if len(line) - len(line.lstrip(" ")) == 0:
+                        # Is current_entry a list or a meta-entry?
+                        if current_entry.is_list():
+                            if debug:
+                                print("@\tAdding list entry to things.")
+                            yield current_entry.to_list_entry()
+                        else:
+                            if debug:
+                                print("@\tAdding meta entry to things.")
+                            yield current_entry
+                        current_entry = None
+
+                    # If not, continue parsing the sub entries.
+                    #
+                    if current_entry is not None:
+                        if line.lstrip(" ").startswith(char) or line.lstrip(
+                            " "
+                        ).startswith(exclude_char):
+                            meta = meta + line.lstrip().rstrip()
+                        else:
+                            try:
+                                key, value = line.lstrip().rstrip().split(":", 1)
+
+                                if not value.lstrip():
+                                    new_entry = yamldoc.entries.MetaEntry(
+                                        key, meta, char, exclude_char, override_exclude
+                                    )
+                                else:
+                                    new_entry = yamldoc.entries.Entry(
+                                        key,
+                                        value.lstrip(" "),
+                                        meta.lstrip(),
+                                        char,
+                                        exclude_char,
+                                        override_exclude
+                                    )
+
+                                current_entry.entries.append(new_entry)
+
+                                if debug:
+                                    print("@\tFound an entry and deposited it in meta.")
+                                meta = ""
+                            except ValueError:
+                                # If there's only one value, it's a list.
+                                # in this case, we add ths value to the
+                                # current entry and continue.
+                                if debug:
+                                    print("@\tFound a list entry.")
+
+                                # Have to figure out if this is an element of 
+                                # a nested list or a new list.
+
+                                if len(current_entry.entries) != 0:
+                                    if isinstance(current_entry.entries[-1], yamldoc.entries.MetaEntry):
+                                        current_entry.entries[-1].entries.append(
+                                            yamldoc.entries.ListElement(
+                                                line.lstrip().lstrip("-").lstrip().rstrip()
+                                            )
+                                        )
+                                    else: 
+                                        current_entry.entries.append(
+                                            yamldoc.entries.ListElement(
+                                                line.lstrip().lstrip("-").lstrip().rstrip()
+                                            )
+                                        )
+                                else:
+                                    current_entry.entries.append(
+                                        yamldoc.entries.ListElement(
+                                            line.lstrip().lstrip("-").lstrip().rstrip()
+                                        )
+                                    )
+
+            # Either we haven't started yet
+            # or we've just flushed the entry.
+            if current_entry is None:
+                # Find the number of leading spaces.
+                # YAML only uses spaces.
+                nspaces = len(line) - len(line.lstrip(" "))
+                if debug:
+                    print("@\tFound " + str(nspaces) + " indent level.")
+
+                if nspaces == 0:
+                    current_entry = None
+                    if line.startswith(char):
+                        meta = meta + line.rstrip()
+                    else:
+                        key, value = line.rstrip().split(":", 1)
+
+                        # If there is no value, this is the beginning of a
+                        # base entry (i.e. there are subentries to follow)
+                        #
+                        # This could also be a simple list entry but I can't
+                        # know that until I see the next line.
+                        if not value.lstrip():
+                            current_entry = yamldoc.entries.MetaEntry(
+                                key, meta, char, exclude_char, override_exclude
+                            )
+
+                            # Metadata must be flushed after being added as a parent
+                            # element
+                            meta = ""
+
+                            if debug:
+                                print("@\tFound a meta entry.")
+                            continue
+
+                        # Otherwise continue on.
+                        else:
+                            yield yamldoc.entries.Entry(
+                                key,
+                                value.lstrip(" "),
+                                meta.lstrip(),
+                                char,
+                                exclude_char,
+                                override_exclude
+                            )
+                            if debug:
+                                print("@\tFound an entry.")
+                            meta = ""
+
+        # The file might run out
+        # before the final meta
+        # entry is added.
+        try:
+            if current_entry is not None:
+                if current_entry.isBase:
+                    if current_entry.is_list():
+                        yield current_entry.to_list_entry()
+                    else:
+                        yield current_entry
+        except AttributeError:
+            pass
+
+    if profile is not None:
+        profile.count("lines", nlines)
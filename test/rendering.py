@@ -0,0 +1,28 @@
+"""
+Rendering a page to a string, shared by the tests that compare the output
+of one way of documenting a file with another.
+"""
+import io
+
+import yamldoc
+
+
+def render(path, function=None, **kwargs):
+    """
+    Returns the page written for a YAML file.
+
+    Arguments:
+        path: Path to the YAML file, or an open text file object.
+        function: (Optional) Function writing the page to its output keyword
+                  argument, yamldoc.main by default.
+
+        The remaining arguments are passed on to function.
+    """
+    out = io.StringIO()
+    (function or yamldoc.main)(path, output=out, **kwargs)
+    return out.getvalue()
+
+
+def expected_markdown(yaml_path, schema_path=None):
+    """Returns the page yamldoc.main writes for a YAML file, without the footer."""
+    return render(yaml_path, schema_path=schema_path, footer=False)
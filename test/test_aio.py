@@ -0,0 +1,54 @@
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+import yamldoc
+import yamldoc.cache
+
+from rendering import expected_markdown
+
+PAIRS = [
+    ("test/yaml/basic.yaml", "test/schema/basic.schema"),
+    ("test/yaml/two_level.yaml", "test/schema/two_level.schema"),
+]
+
+
+def test_render_async():
+    for yaml_path, schema_path in PAIRS:
+        result = asyncio.run(yamldoc.render_async(yaml_path, schema_path, footer=False))
+        assert result == expected_markdown(yaml_path, schema_path)
+
+
+def test_render_many_parses_schema_once(monkeypatch):
+    calls = []
+    original = yamldoc.cache.load_schema
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(yamldoc.cache, "load_schema", counting)
+
+    paths = ["test/yaml/basic.yaml"] * 5
+    results = asyncio.run(
+        yamldoc.render_many(paths, "test/schema/basic.schema", concurrency=2, footer=False)
+    )
+
+    assert len(calls) == 1
+    assert results == [expected_markdown("test/yaml/basic.yaml", "test/schema/basic.schema")] * 5
+
+
+def test_render_many_to_outputs_in_processes():
+    outputs = [io.StringIO() for _ in PAIRS]
+
+    async def run():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            return await yamldoc.render_many(
+                [yaml_path for yaml_path, _ in PAIRS],
+                outputs=outputs,
+                executor=executor,
+                footer=False,
+            )
+
+    assert asyncio.run(run()) == [None, None]
+    assert [out.getvalue() for out in outputs] == [expected_markdown(p) for p, _ in PAIRS]
@@ -0,0 +1,155 @@
+import io
+import os
+import subprocess
+import sys
+
+import yamldoc
+import yamldoc.batch
+import yamldoc.scanner
+
+from rendering import expected_markdown
+
+
+def test_expand_paths():
+    paths = yamldoc.batch.expand_paths(["test/yaml/*.yaml", "test/yaml/basic.yaml"])
+
+    assert paths == sorted(paths), "Glob matches should be sorted."
+    assert paths.count("test/yaml/basic.yaml") == 1, "Duplicates should be removed."
+    assert "test/yaml/exclusion/nested_list.yaml" not in paths
+
+
+def test_output_paths_mirror_inputs():
+    outputs = yamldoc.batch.output_paths(
+        ["test/yaml/basic.yaml", "test/yaml/exclusion/simple_exclusion.yaml"], "out"
+    )
+
+    assert outputs == ["out/basic.md", "out/exclusion/simple_exclusion.md"]
+
+
+def test_main_many_in_process(tmp_path):
+    outputs = yamldoc.batch.main_many(
+        ["test/yaml/**/*.yaml"], str(tmp_path), jobs=1, footer=False
+    )
+
+    assert len(outputs) == 11
+    with open(tmp_path / "long.md") as f:
+        assert f.read() == expected_markdown("test/yaml/long.yaml")
+
+
+def test_main_many_process_pool(tmp_path):
+    paths = ["test/yaml/basic.yaml", "test/yaml/lists.yaml"]
+    outputs = yamldoc.batch.main_many(
+        paths, str(tmp_path), jobs=2, schema_path="test/schema/basic.schema", footer=False
+    )
+
+    assert outputs == [str(tmp_path / "basic.md"), str(tmp_path / "lists.md")]
+    with open(outputs[0]) as f:
+        assert f.read() == expected_markdown(paths[0], "test/schema/basic.schema")
+
+
+def test_incremental_skips_unchanged(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    for name in ["basic", "lists"]:
+        with open(f"test/yaml/{name}.yaml") as f:
+            (src / f"{name}.yaml").write_text(f.read())
+    out = tmp_path / "out"
+
+    paths = [str(src / "basic.yaml"), str(src / "lists.yaml")]
+    yamldoc.batch.main_many(paths, str(out), incremental=True, footer=False)
+    assert (out / ".yamldoc-manifest.json").exists()
+
+    for name in ["basic.md", "lists.md"]:
+        os.utime(out / name, (0, 0))
+
+    with open(src / "lists.yaml", "a") as f:
+        f.write("\n  - 4\n")
+    yamldoc.batch.main_many(paths, str(out), incremental=True, footer=False)
+
+    assert os.stat(out / "basic.md").st_mtime == 0, "Unchanged input was rebuilt."
+    assert os.stat(out / "lists.md").st_mtime != 0, "Changed input was not rebuilt."
+    assert "'4'" in (out / "lists.md").read_text()
+
+    # Changing an option invalidates every output.
+    yamldoc.batch.main_many(paths, str(out), incremental=True, footer=False, title="New")
+    assert "# New" in (out / "basic.md").read_text()
+
+
+def sharded_markdown(yaml_path, schema_path=None, jobs=1, shard_bytes=16):
+    out = io.StringIO()
+    yamldoc.batch.main_sharded(
+        yaml_path, out, jobs=jobs, schema_path=schema_path, footer=False,
+        shard_bytes=shard_bytes,
+    )
+    return out.getvalue()
+
+
+def test_split_points_start_at_top_level_keys():
+    path = "test/yaml/exclusion/complex_exclusion.yaml"
+    points = yamldoc.scanner.split_points(path, 4)
+
+    with open(path, "rb") as f:
+        data = f.read()
+
+    assert points[0] == 0 and points[-1] == len(data)
+    assert points == sorted(set(points))
+    for point in points[1:-1]:
+        # Comments stay with the key they document.
+        assert data[point:].lstrip(b"\n").startswith((b"#'", b"list", b"test"))
+
+
+def test_main_sharded_matches_main():
+    for name in [
+        "anchors",
+        "long",
+        "URLs",
+        "exclusion/complex_exclusion",
+        "exclusion/nested_list",
+        "list_of_mappings",
+        "multiline/continuation",
+    ]:
+        path = f"test/yaml/{name}.yaml"
+        assert sharded_markdown(path) == expected_markdown(path), name
+
+    for name in ["basic", "two_level", "lists"]:
+        path = f"test/yaml/{name}.yaml"
+        schema = f"test/schema/{name}.schema"
+        assert sharded_markdown(path, schema) == expected_markdown(path, schema), name
+
+
+def test_main_sharded_process_pool(tmp_path):
+    yaml_path = tmp_path / "big.yaml"
+    with open(yaml_path, "w") as f:
+        for block in range(100):
+            f.write(f"#' Block {block}.\nblock{block}:\n")
+            for key in range(10):
+                f.write(f"  #' Key {key} of block {block}.\n  key{key}: {block * key}\n")
+            f.write(f"#' Top level {block}.\ntop{block}: {block}\n")
+
+    expected = expected_markdown(str(yaml_path))
+    assert sharded_markdown(str(yaml_path), jobs=2, shard_bytes=1024) == expected
+
+
+def run_cli(*args):
+    return subprocess.run(
+        [sys.executable, "-c", "from yamldoc.cli import cli; cli()", *args],
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_cli_expands_patterns_without_output_dir():
+    result = run_cli("test/yaml/b*.yaml", "--deterministic")
+    assert result.returncode == 0, result.stderr
+
+    expected = io.StringIO()
+    yamldoc.main("test/yaml/basic.yaml", output=expected, deterministic=True)
+    assert result.stdout == expected.getvalue()
+
+    result = run_cli("test/yaml/*.yaml")
+    assert result.returncode == 2
+    assert "--output-dir is required" in result.stderr
+
+    result = run_cli("test/yaml/nothing*.yaml")
+    assert result.returncode == 2
+    assert "no YAML files match" in result.stderr
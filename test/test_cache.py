@@ -0,0 +1,153 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import yamldoc
+import yamldoc.cache
+
+from rendering import render
+
+
+def test_schema_cache_hit(tmp_path, monkeypatch):
+    expected = yamldoc.parser.parse_schema("test/schema/two_level.schema")
+
+    first = yamldoc.cache.load_schema("test/schema/two_level.schema", cache_dir=str(tmp_path))
+    assert first == expected
+    assert len(os.listdir(tmp_path)) == 1
+
+    # A hit must not parse the schema again.
+    def fail(*args, **kwargs):
+        raise AssertionError("Schema should have come from the cache.")
+
+    monkeypatch.setattr(yamldoc.parser, "parse_schema", fail)
+    second = yamldoc.cache.load_schema("test/schema/two_level.schema", cache_dir=str(tmp_path))
+    assert second == expected
+
+
+def test_schema_cache_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("YAMLDOC_CACHE_DIR", str(tmp_path / "env"))
+    yamldoc.cache.load_schema("test/schema/basic.schema")
+    assert len(os.listdir(tmp_path / "env")) == 1
+
+
+def test_schema_cache_changed_content(tmp_path):
+    schema = tmp_path / "schema.yaml"
+    shutil.copy("test/schema/basic.schema", schema)
+    cache_dir = str(tmp_path / "cache")
+
+    yamldoc.cache.load_schema(str(schema), cache_dir=cache_dir)
+    with open(schema, "a") as f:
+        f.write("        extra:\n                type: number\n")
+    parsed, _, _ = yamldoc.cache.load_schema(str(schema), cache_dir=cache_dir)
+
+    assert parsed["base"]["extra"] == "number"
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_corrupt_entry_is_rebuilt(tmp_path):
+    cache_dir = str(tmp_path)
+    yamldoc.cache.load_schema("test/schema/basic.schema", cache_dir=cache_dir)
+    (path,) = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+
+    with open(path, "r+b") as f:
+        f.seek(-4, os.SEEK_END)
+        f.write(b"oops")
+
+    parsed = yamldoc.cache.load_schema("test/schema/basic.schema", cache_dir=cache_dir)
+    assert parsed == yamldoc.parser.parse_schema("test/schema/basic.schema")
+
+    cache = yamldoc.cache.DiskCache(cache_dir)
+    assert cache.get(os.path.basename(path)[: -len(".cache")]) == parsed
+
+
+def test_lru_eviction(tmp_path):
+    cache = yamldoc.cache.DiskCache(str(tmp_path))
+    cache.put("probe", "x" * 100)
+    size = os.path.getsize(cache.path("probe"))
+    os.remove(cache.path("probe"))
+
+    # Room for three entries but not four.
+    cache.max_bytes = 3 * size
+    for i in range(3):
+        cache.put(f"key{i}", "x" * 100)
+        os.utime(cache.path(f"key{i}"), (i, i))
+
+    # key0 is used again, so key1 is now the least recently used.
+    assert cache.get("key0") is not None
+    cache.put("key3", "x" * 100)
+
+    assert cache.get("key1") is None
+    assert cache.get("key0") is not None
+    assert cache.get("key3") is not None
+
+
+def test_deterministic_footer():
+    page = render("test/yaml/basic.yaml", deterministic=True)
+    assert page.endswith(f" v{yamldoc.__version__}\n")
+    assert " on " not in page.splitlines()[-1]
+    assert yamldoc.parser.strip_footer(page) == yamldoc.parser.strip_footer(
+        render("test/yaml/basic.yaml")
+    )
+
+
+def test_render_cache_hit(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "renders")
+    options = dict(schema_path="test/schema/two_level.schema", render_cache=cache_dir)
+    expected = render("test/yaml/two_level.yaml", schema_path=options["schema_path"])
+
+    first_report = {}
+    assert render("test/yaml/two_level.yaml", schema_report=first_report, **options) == expected
+
+    # A hit must not parse the YAML or the schema.
+    def fail(*args, **kwargs):
+        raise AssertionError("Page should have come from the cache.")
+
+    monkeypatch.setattr(yamldoc.parser, "parse_documents", fail)
+    monkeypatch.setattr(yamldoc.parser, "parse_schema", fail)
+
+    report = {}
+    profile = yamldoc.profile.Profile()
+    page = render(
+        "test/yaml/two_level.yaml", schema_report=report, profile=profile, **options
+    )
+    assert page == expected
+    assert report == first_report
+    assert profile.counters == {"render_cache_hits": 1}
+
+
+def test_render_cache_key(tmp_path):
+    yaml_path = tmp_path / "config.yaml"
+    shutil.copy("test/yaml/basic.yaml", yaml_path)
+    cache_dir = str(tmp_path / "renders")
+
+    render(str(yaml_path), render_cache=cache_dir, deterministic=True)
+
+    # Other options, or other contents, are rendered afresh.
+    page = render(str(yaml_path), render_cache=cache_dir, title="Other")
+    assert page.startswith("# Other\n")
+    with open(yaml_path, "a") as f:
+        f.write("added: 1\n")
+    page = render(str(yaml_path), render_cache=cache_dir, deterministic=True)
+    assert "`added`" in page
+
+    assert len(os.listdir(cache_dir)) == 3
+
+
+def test_render_cache_concurrent(tmp_path):
+    cache_dir = str(tmp_path / "renders")
+    paths = ["test/yaml/basic.yaml", "test/yaml/lists.yaml", "test/yaml/long.yaml"] * 4
+    expected = {path: render(path, deterministic=True) for path in set(paths)}
+
+    with ThreadPoolExecutor(4) as pool:
+        pages = list(
+            pool.map(lambda path: render(path, render_cache=cache_dir, deterministic=True), paths)
+        )
+    assert pages == [expected[path] for path in paths]
+
+    outputs = yamldoc.batch.main_many(
+        paths[:3], str(tmp_path / "docs"), jobs=2, render_cache=cache_dir, deterministic=True
+    )
+    for path, output in zip(paths, outputs):
+        with open(output) as f:
+            assert f.read() == expected[path]
+    assert len([name for name in os.listdir(cache_dir) if name.endswith(".cache")]) == 3
@@ -1,4 +1,5 @@
 """Additional tests to improve code coverage."""
+import textwrap
 import unittest
 import yamldoc
 from yamldoc.entries import MetaEntry, Entry, sanitize_meta
@@ -67,6 +68,35 @@ class TestEntries(unittest.TestCase):
         self.assertIn("Unknown", markdown)
 
 
+    def test_entries_share_options(self):
+        """Test entries are slotted and share their parsing options."""
+        entries = yamldoc.parse_yaml("test/yaml/long.yaml")
+        self.assertFalse(hasattr(entries[0], "__dict__"))
+        self.assertIs(entries[0].options, entries[-1].entries[0].options)
+        self.assertEqual(entries[0].char, "#'")
+        self.assertEqual(entries[0].exclude_char, "#'!")
+
+    def test_list_element(self):
+        """Test ListElement behaves like the dataclass it replaced."""
+        element = yamldoc.entries.ListElement("a")
+        self.assertEqual(element, yamldoc.entries.ListElement("a", False))
+        self.assertEqual(repr(element), "ListElement(entry='a', exclude=False)")
+
+    def test_wrap_meta_is_memoized(self):
+        """Test repeated comments are wrapped once and render the same."""
+        meta = "A long comment that is copied across many keys " * 3
+        first = Entry("a", "1", "#' " + meta, "#'")
+        second = Entry("b", "2", "#' " + meta, "#'")
+
+        before = yamldoc.entries.wrap_meta.cache_info().hits
+        self.assertIn("<br />", first.to_markdown())
+        second.to_markdown()
+        self.assertEqual(yamldoc.entries.wrap_meta.cache_info().hits, before + 1)
+        self.assertEqual(
+            yamldoc.entries.wrap_meta(first.meta), "<br />".join(textwrap.wrap(first.meta, 50))
+        )
+
+
 class TestParserUtilities(unittest.TestCase):
     """Test parser utility functions."""
 
@@ -146,6 +176,40 @@ class TestMainFunction(unittest.TestCase):
         self.assertIn("Custom Title", output)
         self.assertIn("Custom description text", output)
 
+    def test_main_output_path(self):
+        """Test main function writing to an output file."""
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.md")
+            yamldoc.main(yaml_path="test/yaml/long.yaml", footer=False, output=path)
+            with open(path) as f:
+                output = f.read()
+
+        self.assertIn("## `test5`", output)
+
+    def test_render_matches_main(self):
+        """Test render writes the same markdown as main."""
+        import io
+
+        expected = io.StringIO()
+        yamldoc.main(
+            yaml_path="test/yaml/two_level.yaml",
+            schema_path="test/schema/two_level.schema",
+            footer=False,
+            output=expected,
+        )
+
+        yaml = yamldoc.parse_yaml("test/yaml/two_level.yaml")
+        schema, specials, extras = yamldoc.parser.parse_schema("test/schema/two_level.schema")
+        yamldoc.parser.add_type_metadata(schema, yaml)
+        out = io.StringIO()
+        yamldoc.render(yaml, out, schema=True, footer=False)
+
+        self.assertEqual(out.getvalue(), expected.getvalue())
+        self.assertEqual("".join(yamldoc.iter_markdown(yaml, schema=True, footer=False)), out.getvalue())
+
 
 if __name__ == "__main__":
     unittest.main()
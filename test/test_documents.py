@@ -0,0 +1,104 @@
+import io
+
+import pytest
+
+import yamldoc
+import yamldoc.batch
+import yamldoc.scanner
+from yamldoc.parser import parse_documents
+
+from rendering import render
+
+BUNDLE = """\
+---
+#' Kind of object.
+kind: Deployment
+#' Object metadata.
+metadata:
+  #' Name of the object.
+  name: web
+...
+---
+# A plain comment.
+---
+kind: Service
+spec:
+  ports:
+    - 80
+---
+"""
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    path = tmp_path / "bundle.yaml"
+    path.write_text(BUNDLE)
+    return str(path)
+
+
+def test_parse_documents(bundle):
+    documents = parse_documents(bundle)
+
+    assert [[value.isBase for value in yaml] for yaml in documents] == [
+        [False, True],
+        [False, True],
+    ]
+    assert documents[0][1].entries[0].meta == "Name of the object."
+    assert documents[1][1].entries[0].key == "ports"
+
+    # parse_yaml still runs the documents together.
+    assert len(yamldoc.parse_yaml(bundle)) == 4
+
+
+def test_main_renders_each_document(bundle):
+    md = render(bundle, footer=False)
+
+    assert md.index("## Document 1") < md.index("### `metadata`") < md.index("## Document 2")
+    assert md.count("| `kind` |") == 2
+    assert "#### Member variables:" in md
+
+
+def test_single_document_unchanged(tmp_path):
+    plain = tmp_path / "plain.yaml"
+    marked = tmp_path / "marked.yaml"
+    plain.write_text("a: 1\nb:\n  c: 2\n")
+    marked.write_text("---\na: 1\nb:\n  c: 2\n...\n")
+
+    assert render(str(marked), footer=False) == render(str(plain), footer=False)
+
+
+def test_split_documents(bundle, tmp_path):
+    output = tmp_path / "out" / "bundle.md"
+    output.parent.mkdir()
+    yamldoc.main(bundle, output=str(output), split_documents=True, footer=False)
+
+    assert sorted(p.name for p in output.parent.iterdir()) == ["bundle-1.md", "bundle-2.md"]
+    second = (output.parent / "bundle-2.md").read_text()
+    assert "Deployment" not in second and "## `spec`" in second
+
+    with pytest.raises(ValueError):
+        yamldoc.main(bundle, split_documents=True)
+
+
+def test_has_several_documents(bundle, tmp_path):
+    single = tmp_path / "single.yaml"
+    single.write_text("---\na: 1\n---\n")
+
+    assert yamldoc.scanner.has_several_documents(bundle)
+    assert not yamldoc.scanner.has_several_documents(str(single))
+
+
+def test_sharded_documents_match_main(bundle, tmp_path):
+    expected = render(bundle, footer=False)
+    for jobs in [1, 2]:
+        sharded = render(
+            bundle, yamldoc.batch.main_sharded, footer=False, jobs=jobs, shard_bytes=16
+        )
+        assert sharded == expected
+
+    output = tmp_path / "sharded.md"
+    yamldoc.batch.main_sharded(
+        bundle, str(output), jobs=2, split_documents=True, footer=False, shard_bytes=16
+    )
+    first = (tmp_path / "sharded-1.md").read_text()
+    assert first == render(io.StringIO(BUNDLE.split("...")[0]), footer=False)
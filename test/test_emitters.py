@@ -0,0 +1,116 @@
+import io
+import json
+
+import pytest
+
+import yamldoc
+from yamldoc.emitters import emit, format_outputs
+from yamldoc.ir import page_ir
+from yamldoc.parser import parse_documents
+
+from rendering import render
+
+FIXTURES = [
+    ("test/yaml/basic.yaml", "test/schema/basic.schema"),
+    ("test/yaml/two_level.yaml", "test/schema/two_level.schema"),
+    ("test/yaml/lists.yaml", "test/schema/lists.schema"),
+    ("test/yaml/long.yaml", "test/schema/long.schema"),
+    ("test/yaml/URLs.yaml", None),
+    ("test/yaml/exclusion/complex_exclusion.yaml", None),
+    ("test/yaml/exclusion/nested_list.yaml", None),
+]
+
+BUNDLE = """\
+#' Kind of object.
+kind: Deployment
+#' Object metadata.
+metadata:
+  #' Name of the object.
+  name: <web>
+  #'! Not shown.
+  secret: 1
+---
+kind: Service
+"""
+
+
+def formatted(path, format, **kwargs):
+    return render(path, formats=[format], **kwargs)
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    path = tmp_path / "bundle.yaml"
+    path.write_text(BUNDLE)
+    return str(path)
+
+
+@pytest.mark.parametrize("yaml_path, schema_path", FIXTURES)
+def test_markdown_emitter_matches_render(yaml_path, schema_path):
+    for schema in {None, schema_path}:
+        expected = render(yaml_path, schema_path=schema)
+        assert formatted(yaml_path, "markdown", schema_path=schema) == expected
+
+        # The JSON form holds everything needed to write the page again.
+        ir = json.loads(formatted(yaml_path, "json", schema_path=schema))
+        out = io.StringIO()
+        emit(ir, out, "markdown")
+        assert out.getvalue() == expected
+
+
+def test_several_documents(bundle):
+    assert formatted(bundle, "markdown") == render(bundle)
+
+    ir = page_ir(parse_documents(bundle), footer=False)
+    assert ir["generator"] is None
+    assert [len(document["entries"]) for document in ir["documents"]] == [1, 1]
+    section = ir["documents"][0]["sections"][0]
+    assert section["path"] == "metadata"
+    assert [entry["key"] for entry in section["entries"]] == ["name"]
+
+
+def test_html_and_rst(bundle):
+    html = formatted(bundle, "html", footer=False)
+    assert html.startswith("<!DOCTYPE html>")
+    assert "<h2>Document 2</h2>" in html
+    assert "<code>&lt;web&gt;</code>" in html
+    assert "secret" not in html
+
+    rst = formatted(bundle, "rst", footer=False)
+    assert "Document 2\n----------\n" in rst
+    assert "``metadata``\n~~~~~~~~~~~~\n" in rst
+    assert "``<web>``" in rst
+    assert "secret" not in rst
+
+
+def test_formats_written_from_one_parse(tmp_path, monkeypatch):
+    calls = []
+    original = yamldoc.parser.parse_documents
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(yamldoc.parser, "parse_documents", counting)
+
+    output = str(tmp_path / "out.md")
+    yamldoc.main(
+        "test/yaml/basic.yaml", output=output, formats=["markdown", "html", "json"]
+    )
+
+    assert len(calls) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["out.html", "out.json", "out.md"]
+    assert (tmp_path / "out.md").read_text() == render("test/yaml/basic.yaml")
+
+
+def test_format_outputs():
+    assert format_outputs(["rst", "json"], "docs/config.md") == {
+        "rst": "docs/config.rst",
+        "json": "docs/config.json",
+    }
+
+    with pytest.raises(ValueError):
+        format_outputs(["markdown", "html"])
+
+    with pytest.raises(ValueError):
+        format_outputs(["pdf"], "out.pdf")
@@ -110,6 +110,25 @@ class TestYAMLs(unittest.TestCase):
         self.assertEqual(entries[0].value, ["1", "2", "3"])
         self.assertTrue(entries[0].meta.strip() == "List metadata")
 
+    def test_iter_yaml_matches_parse_yaml(self):
+        for path in ["test/yaml/basic.yaml", "test/yaml/long.yaml", "test/yaml/lists.yaml"]:
+            streamed = list(yamldoc.iter_yaml(path))
+            self.assertEqual(repr(streamed), repr(yamldoc.parse_yaml(path)))
+
+    def test_iter_yaml_file_object(self):
+        stream = io.StringIO("a: 1\nb:\n  c: 2\nd: 3\n")
+        entries = yamldoc.iter_yaml(stream)
+
+        # The first block is yielded before the rest of the stream is read.
+        first = next(entries)
+        self.assertEqual(first.key, "a")
+        self.assertLess(stream.tell(), len(stream.getvalue()))
+
+        rest = list(entries)
+        self.assertEqual(rest[0].name, "b")
+        self.assertEqual(rest[1].key, "d")
+        self.assertFalse(stream.closed)
+
 class TestSchemas(unittest.TestCase):
     def test_basic(self):
         yaml = yamldoc.parse_yaml("test/yaml/basic.yaml", debug=False)
@@ -138,6 +157,24 @@ class TestSchemas(unittest.TestCase):
         self.assertTrue(yaml[0].meta.strip() == "List metadata")
         self.assertTrue(yaml[0].type == "array")
 
+    def test_nested(self):
+        schema, specials, extra = yamldoc.parser.parse_schema(
+            "test/schema/long.schema", debug=False
+        )
+        test5 = yamldoc.entries.MetaEntry("test5", "", "#'")
+        entry = yamldoc.entries.MetaEntry("entry", "", "#'")
+        entry.entries = [
+            yamldoc.entries.Entry("i", "9", ""),
+            yamldoc.entries.Entry("j", "10", ""),
+        ]
+        test5.entries = [entry]
+        yaml = [yamldoc.entries.Entry("foo", "bar", ""), test5]
+
+        yamldoc.parser.add_type_metadata(schema, yaml)
+        self.assertEqual(yaml[0].type, "string")
+        self.assertEqual([e.type for e in entry.entries], ["number", "number"])
+        self.assertTrue(entry.has_schema)
+
     def test_complex(self):
         schema, specials, extra = yamldoc.parser.parse_schema(
             "test/schema/complex.schema", debug=False
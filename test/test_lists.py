@@ -0,0 +1,92 @@
+import hashlib
+import io
+import json
+import os
+
+import pytest
+
+import yamldoc
+from yamldoc.emitters import emit
+from yamldoc.entries import ListPolicy, ListValue
+from yamldoc.ir import page_ir
+
+from rendering import render
+
+ITEMS = [f"sample_{i}" for i in range(50)]
+SOURCE = "#' Samples.\nsamples:\n" + "".join(f"  - {item}\n" for item in ITEMS) + "other: 1\n"
+
+
+@pytest.fixture
+def samples(tmp_path):
+    path = tmp_path / "samples.yaml"
+    path.write_text(SOURCE)
+    return str(path)
+
+
+def test_list_value_behaves_like_a_list():
+    value = ListValue(["a", "b", "c"])
+
+    assert value == ["a", "b", "c"]
+    assert ["a", "b", "c"] == value
+    assert value != ["a", "b"]
+    assert str(value) == str(["a", "b", "c"])
+    assert (len(value), list(value), value[1], value[-1], value[:2]) == (
+        3, ["a", "b", "c"], "b", "c", ["a", "b"]
+    )
+    assert "b" in value
+    assert value.head(2) == ["a", "b"]
+    assert value.digest() == hashlib.sha256(b"a\nb\nc").hexdigest()
+
+    with pytest.raises(IndexError):
+        value[3]
+
+    assert ListValue() == [] and ListValue([""]) == [""]
+    assert ListValue() != ListValue([""])
+
+
+def test_parsed_lists_are_list_values(samples):
+    (entry, _) = yamldoc.parse_yaml(samples)
+    assert isinstance(entry.value, ListValue)
+    assert entry.value == ITEMS
+
+
+def test_lists_shown_in_full_by_default(samples):
+    assert f"| `samples` | `{ITEMS}` | Samples. |" in render(samples, footer=False)
+    assert render(samples, footer=False, lists=ListPolicy(100)) == render(samples, footer=False)
+
+
+def test_list_limit(samples):
+    digest = hashlib.sha256("\n".join(ITEMS).encode()).hexdigest()
+
+    cut = render(samples, footer=False, lists=ListPolicy(2))
+    assert (
+        f"| `samples` | `['sample_0', 'sample_1', ...]` (50 items, sha256 `{digest[:12]}`)"
+        " | Samples. |"
+    ) in cut
+    assert "sample_2" not in cut
+
+    assert "| `samples` | `[...]` (50 items" in render(samples, footer=False, lists=ListPolicy(0))
+
+
+def test_list_spill(samples, tmp_path):
+    output = tmp_path / "docs" / "samples.md"
+    output.parent.mkdir()
+    spill = tmp_path / "lists"
+    yamldoc.main(samples, output=str(output), lists=ListPolicy(1, str(spill)))
+
+    (name,) = os.listdir(spill)
+    assert (spill / name).read_text().splitlines() == ITEMS
+    assert f"[full list](../lists/{name})" in output.read_text()
+
+
+def test_emitters_apply_the_policy(samples):
+    lists = ListPolicy(2)
+    ir = json.loads(json.dumps(page_ir(yamldoc.parser.parse_documents(samples), lists=lists)))
+    (entry, _) = ir["documents"][0]["entries"]
+    assert entry["value"] == ITEMS[:2]
+    assert entry["list"]["length"] == 50
+
+    out = io.StringIO()
+    ir["generator"] = None
+    emit(ir, out, "markdown")
+    assert out.getvalue() == render(samples, footer=False, lists=lists)
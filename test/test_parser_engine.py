@@ -0,0 +1,350 @@
+"""Differential and unit tests for the indent-stack parser engine."""
+import glob
+import io
+import unittest
+
+import yamldoc
+from yamldoc.entries import Entry, ListElement, ListValue, MetaEntry
+from yamldoc.parser import (
+    COMMENT,
+    DOCUMENT,
+    KEY,
+    KEY_VALUE,
+    LIST_ITEM,
+    PLAIN_COMMENT,
+    classify_line,
+)
+
+from legacy_parser import legacy_iter_yaml
+
+
+def signature(entry, children=None):
+    if isinstance(entry, ListElement):
+        return ("L", entry.entry)
+    if isinstance(entry, Entry):
+        if entry.key.startswith("- "):
+            # The legacy parser read an item "- name: web" next to keys as
+            # the key "- name"; it is now a ListElement shown the same way.
+            return ("L", f"{entry.key[2:]}: {entry.value}")
+        return ("E", entry.key, entry.value, entry.meta, entry.exclude)
+    return ("M", entry.name, entry.meta, entry.exclude, children)
+
+
+def legacy_layout(entry):
+    """
+    Signature of an entry as the legacy parser would have laid it out: every
+    mapping below the second level flattened into its top level block, with
+    list items attached to the mapping directly above them, and nested lists
+    left as mappings rather than turned into list entries.
+    """
+    if not isinstance(entry, MetaEntry):
+        return signature(entry)
+
+    children = []
+
+    def flatten(meta):
+        for child in meta.entries:
+            if isinstance(child, MetaEntry):
+                items = [signature(e) for e in child.entries if isinstance(e, ListElement)]
+                children.append(signature(child, items))
+                flatten(child)
+            elif isinstance(child, Entry) and isinstance(child.value, (list, ListValue)):
+                items = [("L", value) for value in child.value]
+                children.append(("M", child.key, child.meta, child.exclude, items))
+            elif not isinstance(child, ListElement) or meta is entry:
+                children.append(signature(child))
+
+    flatten(entry)
+    return signature(entry, children)
+
+
+def skipped(signature):
+    """
+    Signature of a top level entry as parsed without override_exclude: an
+    excluded block is skipped, so it has no children.
+    """
+    if signature[0] == "M" and signature[3]:
+        return signature[:4] + ([],)
+    if signature[0] == "E" and signature[4] and isinstance(signature[2], list):
+        return ("E", signature[1], [], signature[3], signature[4])
+    return signature
+
+
+def tree(entry):
+    if isinstance(entry, MetaEntry):
+        return signature(entry, [tree(child) for child in entry.entries])
+    return signature(entry)
+
+
+class TestDifferential(unittest.TestCase):
+    def assert_same_as_legacy(self, source):
+        if isinstance(source, str) and "\n" in source:
+            legacy = list(legacy_iter_yaml(io.StringIO(source)))
+            new = yamldoc.parse_yaml(io.StringIO(source))
+        else:
+            legacy = list(legacy_iter_yaml(source))
+            new = yamldoc.parse_yaml(source)
+
+        self.assertEqual([legacy_layout(e) for e in new], [skipped(tree(e)) for e in legacy])
+
+    def test_fixtures(self):
+        # The legacy parser read the lines of multi-line values, and the
+        # content of anchored or tagged nodes below the top level, as
+        # entries; those fixtures are checked in TestContinuation instead.
+        paths = [
+            path
+            for path in sorted(glob.glob("test/yaml/**/*.yaml", recursive=True))
+            if not path.startswith("test/yaml/multiline/")
+            and path != "test/yaml/anchors.yaml"
+        ]
+        self.assertTrue(paths)
+        for path in paths:
+            with self.subTest(path=path):
+                self.assert_same_as_legacy(path)
+
+    def test_override_exclude_parses_excluded_blocks(self):
+        for path in sorted(glob.glob("test/yaml/exclusion/*.yaml")):
+            with self.subTest(path=path):
+                legacy = list(legacy_iter_yaml(path, override_exclude=True))
+                new = yamldoc.parse_yaml(path, override_exclude=True)
+                self.assertEqual([legacy_layout(e) for e in new], [tree(e) for e in legacy])
+
+    def test_synthetic(self):
+        sources = [
+            "a: 1\n#' Doc\n#'! Hidden\nb:\n  c: 2\n  d:\n    - x\n    - y\n",
+            "#'! Skip\nblock:\n  #' Inner\n  key: value\n  other: https://a.b:80/c\n",
+            "top:\n  mid:\n    low:\n      leaf: 1\n    items:\n      - x\nnext: 2\n",
+            "list:\n  - 1\n  - 2\nafter: 3\n",
+        ]
+        for source in sources:
+            with self.subTest(source=source):
+                self.assert_same_as_legacy(source)
+
+
+class TestEngine(unittest.TestCase):
+    def test_deep_nesting(self):
+        source = "a:\n  b:\n    c:\n      d:\n        #' Deep\n        e: 1\n    f: 2\ng: 3\n"
+        a, g = yamldoc.parse_yaml(io.StringIO(source))
+
+        b = a.entries[0]
+        c = b.entries[0]
+        d = c.entries[0]
+        self.assertEqual([a.name, b.name, c.name, d.name], ["a", "b", "c", "d"])
+        self.assertEqual((d.entries[0].key, d.entries[0].meta), ("e", "Deep"))
+        self.assertEqual(b.entries[1].key, "f")
+        self.assertEqual(g.key, "g")
+
+        markdown = a.to_markdown()
+        self.assertIn("## `a.b.c.d`", markdown)
+        self.assertIn("| `e` | `1` | Deep |", markdown)
+
+    def test_compact_list(self):
+        (entry,) = yamldoc.parse_yaml(io.StringIO("a:\n  l:\n  - 1\n  - 2\n"))
+        self.assertIsInstance(entry.entries[0], Entry)
+        self.assertEqual(entry.entries[0].value, ["1", "2"])
+
+    def test_nested_lists_converted_while_parsing(self):
+        source = "a:\n  b:\n    l:\n      - x\n    k: 1\n  m:\n    - y\n"
+        (a,) = yamldoc.parse_yaml(io.StringIO(source))
+        b, m = a.entries
+        self.assertEqual((m.key, m.value), ("m", ["y"]))
+        self.assertEqual((b.entries[0].key, b.entries[0].value), ("l", ["x"]))
+
+    def test_list_items_kept_with_keys(self):
+        (a,) = yamldoc.parse_yaml(io.StringIO("a:\n  - x\n  k: 1\n  - y: 2\n"))
+        self.assertEqual([type(e) for e in a.entries], [ListElement, Entry, ListElement])
+        self.assertEqual([e.entry for e in a.entries if isinstance(e, ListElement)], ["x", "y: 2"])
+        with self.assertRaises(ValueError):
+            a.to_list_entry()
+
+        markdown = a.to_markdown()
+        self.assertLess(markdown.index("| `-` | `x` |"), markdown.index("| `k` | `1` |"))
+        self.assertLess(markdown.index("| `k` | `1` |"), markdown.index("| `- y` | `2` |"))
+
+    def test_list_of_mappings(self):
+        name, containers, replicas = yamldoc.parse_yaml("test/yaml/list_of_mappings.yaml")
+        self.assertEqual(
+            [(e.key, e.value) for e in containers.entries],
+            [
+                ("- name", "web"),
+                ("image", "nginx"),
+                ("ports", ["80", "443"]),
+                ("- name", "db"),
+                ("image", "postgres"),
+                ("-", "sidecar"),
+            ],
+        )
+
+        markdown = containers.to_markdown(schema=True)
+        self.assertIn("| `- name` | `web` | Unknown |  |\n| `image` | `nginx` |", markdown)
+        self.assertIn("| `-` | `sidecar` | Unknown |  |", markdown)
+
+        from yamldoc.ir import section_ir
+
+        self.assertEqual(
+            section_ir(containers)["entries"][0],
+            {"key": "- name", "value": "web", "type": None, "meta": ""},
+        )
+
+    def test_to_markdown_is_pure(self):
+        (a,) = yamldoc.parse_yaml(io.StringIO("a:\n  l:\n    - 1\n  b:\n    c: 2\n"))
+        entries = a.entries
+        first = a.to_markdown()
+        self.assertEqual(a.to_markdown(), first)
+        self.assertIs(a.entries, entries)
+
+    def test_cached_markdown_invalidated(self):
+        (a,) = yamldoc.parse_yaml(io.StringIO("#' Doc\na:\n  b:\n    c: 2\n"))
+        c = a.entries[0].entries[0]
+
+        plain = a.to_markdown(cache=True)
+        self.assertIs(a.to_markdown(cache=True), plain)
+        with_schema = a.to_markdown(schema=True, cache=True)
+        self.assertIn("Unknown", with_schema)
+        self.assertIs(a.to_markdown(cache=True), plain)
+
+        c.type = "number"
+        self.assertIn("| number |", a.to_markdown(schema=True, cache=True))
+
+        a.meta = "Changed"
+        self.assertIn("Changed", a.to_markdown(cache=True))
+
+        a.entries[0].entries = []
+        self.assertNotIn("`c`", a.to_markdown(cache=True))
+
+        a.entries.append(Entry("d", "4", "", "#'"))
+        a.invalidate()
+        self.assertIn("`d`", a.to_markdown(cache=True))
+        self.assertEqual(a.to_markdown(cache=True), a.to_markdown())
+
+    def test_cache_invalidation_is_scoped(self):
+        (a,) = yamldoc.parse_yaml(io.StringIO("a:\n  b:\n    c: 2\n"))
+        (other,) = yamldoc.parse_yaml(io.StringIO("a:\n  b:\n    c: 2\n"))
+        plain = a.to_markdown(cache=True)
+
+        # Changes to another tree, or to entries made from this one, do not
+        # drop the cache.
+        other.entries[0].entries[0].type = "number"
+        other.name = "renamed"
+        from yamldoc.schema import compile_schema
+
+        compile_schema("test/schema/basic.schema").apply(
+            yamldoc.parse_yaml("test/yaml/basic.yaml")
+        )
+        self.assertIs(a.to_markdown(cache=True), plain)
+
+        a.entries[0].name = "renamed"
+        self.assertIn("## `a.renamed`", a.to_markdown(cache=True))
+        a.entries[0].entries[0].key = "d"
+        self.assertIn("| `d` | `2` |", a.to_markdown(cache=True))
+
+        # Entries added by hand are noticed once the tree was rendered.
+        added = Entry("e", "5", "", "#'")
+        a.entries.append(added)
+        a.invalidate()
+        self.assertIn("| `e` | `5` |", a.to_markdown(cache=True))
+        added.value = "6"
+        self.assertIn("| `e` | `6` |", a.to_markdown(cache=True))
+
+    def test_hand_built_list_rendered_as_row(self):
+        a = MetaEntry("a", "", "#'")
+        items = MetaEntry("items", "", "#'")
+        items.entries = [ListElement("a"), ListElement("b")]
+        a.entries = [items]
+
+        self.assertIn("| `items` | `['a', 'b']` |  |", a.to_markdown())
+        self.assertIs(a.entries[0], items)
+
+        from yamldoc.ir import section_ir
+
+        self.assertEqual(section_ir(a)["entries"][0]["value"], ["a", "b"])
+
+    def test_plain_comments_ignored(self):
+        source = "# A plain comment\n---\na:\n  # Another\n  b: 1\n"
+        (entry,) = yamldoc.parse_yaml(io.StringIO(source))
+        self.assertEqual(len(entry.entries), 1)
+
+    def test_bad_top_level_line(self):
+        with self.assertRaises(ValueError):
+            yamldoc.parse_yaml(io.StringIO("a: 1\nnot yaml\n"))
+
+    def test_classify_line(self):
+        self.assertEqual(classify_line("  #' doc\n")[:2], (2, COMMENT))
+        self.assertEqual(classify_line("# plain\n")[1], PLAIN_COMMENT)
+        self.assertEqual(classify_line("key:\n"), (0, KEY, "key", None))
+        self.assertEqual(classify_line("  url: http://x:80\n"), (2, KEY_VALUE, "url", "http://x:80"))
+        self.assertEqual(classify_line("    - a: b\n"), (4, LIST_ITEM, "a: b", None))
+        self.assertEqual(classify_line("---\n")[1], DOCUMENT)
+
+
+class TestContinuation(unittest.TestCase):
+    def test_multi_line_values(self):
+        top = yamldoc.parse_yaml("test/yaml/multiline/continuation.yaml")
+        self.assertEqual(
+            [(e.key, e.value) for e in top if isinstance(e, Entry)],
+            [
+                ("script", "|"),
+                ("folded", ">-"),
+                ("description", "a long plain"),
+                ("flow", "[1,"),
+                ("next", "1"),
+            ],
+        )
+        (job,) = [e for e in top if isinstance(e, MetaEntry)]
+        self.assertEqual(
+            [(e.key, e.value, e.meta) for e in job.entries],
+            [
+                ("run", "|", "A block scalar inside a mapping."),
+                ("after", "done", "Documented after the block scalar."),
+            ],
+        )
+
+    def test_anchors_and_tags(self):
+        top = yamldoc.parse_yaml("test/yaml/anchors.yaml")
+        self.assertEqual(
+            [(e.key, e.value) for e in top if isinstance(e, Entry)],
+            [("defaults", "&defaults"), ("tagged", "!!map"), ("alias", "*defaults")],
+        )
+        development, nested = [e for e in top if isinstance(e, MetaEntry)]
+        self.assertEqual([e.key for e in development.entries], ["<<", "database"])
+        self.assertEqual(
+            [(e.key, e.value, e.meta) for e in nested.entries],
+            [
+                ("shared", "&shared !!map", ""),
+                ("after", "value", "Read after the anchored mapping."),
+                ("text", "!!str |", ""),
+            ],
+        )
+
+    def test_unindented_line_still_rejected(self):
+        with self.assertRaises(ValueError):
+            yamldoc.parse_yaml(io.StringIO("script: |\n  echo hi\nnot yaml\n"))
+
+
+class TestMmap(unittest.TestCase):
+    def test_fixtures_match_text_reader(self):
+        for path in sorted(glob.glob("test/yaml/**/*.yaml", recursive=True)):
+            with self.subTest(path=path):
+                text = [tree(e) for e in yamldoc.parse_yaml(path)]
+                mapped = [tree(e) for e in yamldoc.parse_yaml(path, use_mmap=True)]
+                self.assertEqual(mapped, text)
+
+    def test_bom_crlf_and_empty(self):
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bom.yaml")
+            with open(path, "wb") as f:
+                f.write(b"\xef\xbb\xbf#' Caf\xc3\xa9\r\nkey: val\xc3\xbc\r\nblock:\r\n  - 1\r\n")
+            key, block = yamldoc.parse_yaml(path, use_mmap=True)
+            self.assertEqual((key.key, key.value, key.meta), ("key", "val\u00fc", "Caf\u00e9"))
+            self.assertEqual(block.value, ["1"])
+
+            empty = os.path.join(tmp, "empty.yaml")
+            open(empty, "w").close()
+            self.assertEqual(yamldoc.parse_yaml(empty, use_mmap=True), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import io
+
+import yamldoc
+import yamldoc.batch
+from yamldoc.profile import Profile
+
+
+def test_main_profile():
+    profile = Profile()
+    yamldoc.main(
+        "test/yaml/two_level.yaml",
+        schema_path="test/schema/two_level.schema",
+        output=io.StringIO(),
+        profile=profile,
+    )
+
+    assert set(profile.phases) == {"parse_schema", "parse_yaml", "add_type_metadata", "render"}
+    assert profile.counters["lines"] == 7
+    assert profile.counters["entries"] == 2
+    assert profile.counters["schema_properties_matched"] == 2
+    assert "schema_properties_matched" in profile.report()
+
+
+def test_profile_counts_lists_and_exclusions():
+    profile = Profile()
+    yamldoc.main(
+        "test/yaml/exclusion/complex_exclusion.yaml", output=io.StringIO(), profile=profile
+    )
+
+    assert profile.counters["excluded_blocks"] == 2
+    # The items of the excluded list are skipped, not parsed.
+    assert profile.counters["list_elements"] == 3
+    assert profile.counters["lines_skipped"] == 4
+
+
+def test_profile_callback():
+    seen = []
+    profile = Profile(callback=lambda phase, seconds: seen.append(phase))
+    yamldoc.main("test/yaml/basic.yaml", output=io.StringIO(), profile=profile)
+
+    assert seen == ["parse_yaml", "render"]
+
+
+def test_batch_profile_merges_workers(tmp_path):
+    profile = Profile()
+    yamldoc.batch.main_many(
+        ["test/yaml/basic.yaml", "test/yaml/two_level.yaml"],
+        str(tmp_path),
+        jobs=2,
+        schema_path="test/schema/basic.schema",
+        profile=profile,
+    )
+
+    assert profile.counters["entries"] == 4
+    assert profile.phases["parse_schema"] > 0
+
+
+def test_profile_counts_memo_hits():
+    profile = Profile()
+    yamldoc.main("test/yaml/long.yaml", output=io.StringIO(), profile=profile)
+
+    counters = profile.counters
+    assert counters["wrap_meta_cache_hits"] + counters["wrap_meta_cache_misses"] == counters["entries"]
+    assert "sanitize_meta_cache_hits" in counters
@@ -0,0 +1,114 @@
+import io
+import pickle
+
+import pytest
+
+import yamldoc
+import yamldoc.batch
+from yamldoc.parser import TOP_LEVEL, add_type_metadata, parse_schema, parse_yaml
+from yamldoc.schema import CompiledSchema, SchemaReport, apply_schema, compile_schema
+
+DEV = """\
+#' Flat.
+flat: 1
+#' Not in the schema.
+extra: 2
+two:
+  other: 3
+---
+unknown_block:
+  key: value
+"""
+
+
+@pytest.fixture
+def dev(tmp_path):
+    path = tmp_path / "dev.yaml"
+    path.write_text(DEV)
+    return str(path)
+
+
+@pytest.mark.parametrize("name", ["basic", "two_level", "lists", "long"])
+def test_apply_matches_add_type_metadata(name):
+    yaml_path = f"test/yaml/{name}.yaml"
+    parsed = parse_schema(f"test/schema/{name}.schema")
+
+    expected = parse_yaml(yaml_path)
+    add_type_metadata(parsed[0], expected)
+
+    yaml = parse_yaml(yaml_path)
+    report = CompiledSchema(parsed).apply(yaml)
+
+    assert repr(yaml) == repr(expected)
+    assert not report.missing
+
+
+def test_report(dev):
+    compiled = compile_schema("test/schema/two_level.schema")
+    [(documents, report)] = apply_schema(compiled, [dev])
+
+    assert documents[0][0].type == "string"
+    assert report.as_dict() == {
+        "matched": ["flat"],
+        "missing": ["two.entry"],
+        "unknown": ["extra", "two.other", "unknown_block", "unknown_block.key"],
+    }
+
+
+def test_mapping_named_base(tmp_path):
+    path = tmp_path / "base.yaml"
+    path.write_text("flat: 1\nbase:\n  flat: 2\n")
+    compiled = compile_schema("test/schema/two_level.schema")
+    [([(flat, base)], report)] = apply_schema(compiled, [str(path)])
+
+    assert flat.type == "string"
+    assert base.entries[0].type is None
+    assert report.as_dict()["unknown"] == ["base", "base.flat"]
+
+    yaml = parse_yaml(str(path))
+    add_type_metadata(parse_schema("test/schema/two_level.schema")[0], yaml)
+    assert (yaml[0].type, yaml[1].entries[0].type) == ("string", None)
+
+
+def test_report_from_main_and_shards(dev):
+    reports = {}
+    for function in (yamldoc.main, yamldoc.batch.main_sharded):
+        report = {}
+        function(
+            dev,
+            output=io.StringIO(),
+            schema_path="test/schema/two_level.schema",
+            schema_report=report,
+        )
+        reports[function] = report[dev]
+
+    assert reports[yamldoc.main] == reports[yamldoc.batch.main_sharded]
+    assert reports[yamldoc.main].matched == {(TOP_LEVEL, "flat")}
+
+
+def test_compiled_schema_is_immutable():
+    compiled = compile_schema("test/schema/two_level.schema")
+
+    with pytest.raises(AttributeError):
+        compiled.types = {}
+    with pytest.raises(TypeError):
+        compiled.types[(TOP_LEVEL, "flat")] = "number"
+
+    copy = pickle.loads(pickle.dumps(compiled))
+    assert copy.types == compiled.types
+    assert copy.sections == compiled.sections
+
+    # Entries get their own copy of a list of types.
+    first = parse_yaml("test/yaml/two_level.yaml")
+    second = parse_yaml("test/yaml/two_level.yaml")
+    compiled.apply(first)
+    compiled.apply(second)
+    assert first[1].entries[0].type == ["string", "number"]
+    assert first[1].entries[0].type is not second[1].entries[0].type
+
+
+def test_merge():
+    a = SchemaReport({(TOP_LEVEL, "a")}, {(TOP_LEVEL, "b")}, {(TOP_LEVEL, "x")})
+    b = SchemaReport({(TOP_LEVEL, "b")}, {(TOP_LEVEL, "a")}, set())
+
+    assert a.merge(b) == SchemaReport({(TOP_LEVEL, "a"), (TOP_LEVEL, "b")}, (), {(TOP_LEVEL, "x")})
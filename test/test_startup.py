@@ -0,0 +1,90 @@
+"""
+Import time and command line start-up against the budget in startup_budget.json.
+
+The budgets are wall-clock times, which depend on the machine and its load
+as much as on the code, so they are only checked when the environment
+variable YAMLDOC_TIMING_TESTS is set, e.g. on a quiet machine before a
+release.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+with open(os.path.join(ROOT, "test", "startup_budget.json")) as f:
+    BUDGET = json.load(f)
+
+timing = pytest.mark.skipif(
+    not os.environ.get("YAMLDOC_TIMING_TESTS"),
+    reason="timing budgets are only checked with YAMLDOC_TIMING_TESTS set",
+)
+
+# Modules that only some modes need, which importing yamldoc must not load.
+HEAVY = ["argparse", "concurrent.futures", "pickle", "tempfile", "yamldoc.parser"]
+
+
+def run(code, *args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def best_of(n, function):
+    return min(function() for _ in range(n))
+
+
+def test_import_is_lazy():
+    code = "import sys, yamldoc; print(' '.join(sorted(sys.modules)))"
+    loaded = set(run(code).stdout.split())
+
+    assert not loaded & set(HEAVY)
+
+
+def test_lazy_names_resolve():
+    code = (
+        "import yamldoc; "
+        "yamldoc.parse_yaml; yamldoc.MetaEntry; yamldoc.batch.main_many; "
+        "assert callable(yamldoc.cli) and callable(yamldoc.render)"
+    )
+    run(code)
+
+
+@timing
+def test_import_time_budget():
+    def import_time():
+        stderr = run("import yamldoc", "-X", "importtime").stderr
+        line = [l for l in stderr.splitlines() if l.endswith("| yamldoc")][-1]
+        return int(line.split("|")[1])
+
+    assert best_of(3, import_time) <= BUDGET["import_microseconds"]
+
+
+@timing
+def test_cli_start_up_budget():
+    def seconds(code):
+        start = time.perf_counter()
+        run(code)
+        return time.perf_counter() - start
+
+    bare = best_of(3, lambda: seconds("pass"))
+    cli = best_of(
+        3,
+        lambda: seconds(
+            "import sys, yamldoc; "
+            "sys.argv = ['yamldoc', 'test/yaml/basic.yaml', '-s', 'test/schema/basic.schema']; "
+            "yamldoc.cli()"
+        ),
+    )
+
+    assert cli - bare <= BUDGET["cli_overhead_seconds"]
@@ -0,0 +1,154 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import yamldoc
+import yamldoc.tree
+
+from rendering import expected_markdown
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A config tree pairing files with schemas in every supported way."""
+    root = tmp_path / "repo"
+    for path, source in [
+        ("envs/dev.yaml", "test/yaml/two_level.yaml"),
+        ("envs/prod.yaml", "test/yaml/two_level.yaml"),
+        ("schemas/envs.schema", "test/schema/two_level.schema"),
+        ("basic.yaml", "test/yaml/basic.yaml"),
+        ("basic.schema", "test/schema/basic.schema"),
+        ("misc/lists.yaml", "test/yaml/lists.yaml"),
+        ("misc/lists.yml", "test/yaml/lists.yaml"),
+        (".github/ci.yaml", "test/yaml/basic.yaml"),
+    ]:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(source, root / path)
+
+    (root / ".yamldoc-schemas.yaml").write_text('"envs/*.yaml": schemas/envs.schema\n')
+    (root / "broken.yaml").write_bytes(b"key: \xff\xfe\n")
+    return root
+
+
+def test_find_pairs(repo):
+    pairs = yamldoc.tree.find_pairs(str(repo))
+    relative = [
+        (os.path.relpath(path, repo), schema and os.path.relpath(schema, repo))
+        for path, schema in pairs
+    ]
+
+    assert relative == [
+        ("basic.yaml", "basic.schema"),
+        ("broken.yaml", None),
+        ("envs/dev.yaml", "schemas/envs.schema"),
+        ("envs/prod.yaml", "schemas/envs.schema"),
+        ("misc/lists.yaml", None),
+        ("misc/lists.yml", None),
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_main_tree(repo, tmp_path, jobs):
+    out = tmp_path / "docs"
+    report = {}
+    pages, failures = yamldoc.tree.main_tree(
+        str(repo), str(out), jobs=jobs, footer=False, schema_report=report
+    )
+
+    assert list(failures) == [str(repo / "broken.yaml")]
+    assert failures[str(repo / "broken.yaml")].startswith("UnicodeDecodeError")
+    assert not (out / "broken.md").exists()
+
+    assert [os.path.relpath(output, out) for _, _, output in pages] == [
+        "basic.md",
+        "envs/dev.md",
+        "envs/prod.md",
+        "misc/lists.yaml.md",
+        "misc/lists.yml.md",
+    ]
+    assert (out / "envs/dev.md").read_text() == expected_markdown(
+        "test/yaml/two_level.yaml", "test/schema/two_level.schema"
+    )
+    assert (out / "misc/lists.yml.md").read_text() == expected_markdown("test/yaml/lists.yaml")
+    assert sorted(report) == [
+        str(repo / "basic.yaml"),
+        str(repo / "envs/dev.yaml"),
+        str(repo / "envs/prod.yaml"),
+    ]
+
+    index = (out / "index.md").read_text()
+    assert "5 of 6 YAML files documented." in index
+    assert "| `envs/dev.yaml` | `schemas/envs.schema` | [envs/dev.md](envs/dev.md) |" in index
+    assert "## Failures" in index and "`broken.yaml`" in index
+
+
+def test_read_mapping_unquotes(tmp_path):
+    path = tmp_path / "map.yaml"
+    path.write_text('"envs/*.yaml": "schemas/app.schema"\n\'a.yaml\': \'a.schema\'\n')
+
+    assert yamldoc.tree.read_mapping(str(path)) == [
+        ("envs/*.yaml", str(tmp_path / "schemas/app.schema")),
+        ("a.yaml", str(tmp_path / "a.schema")),
+    ]
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "envs/*.yaml:\n  - a.schema\n  - b.schema\n",
+        "envs/*.yaml: [a.schema, b.schema]\n",
+        "envs/*.yaml:\n  schema: a.schema\n",
+    ],
+)
+def test_read_mapping_rejects_non_scalars(tmp_path, source):
+    path = tmp_path / "map.yaml"
+    path.write_text(source)
+
+    with pytest.raises(ValueError, match="'envs/\\*.yaml' should map a pattern to a schema"):
+        yamldoc.tree.read_mapping(str(path))
+
+
+def test_schemas_compiled_once(repo, tmp_path, monkeypatch):
+    calls = []
+    original = yamldoc.tree.compile_schema
+
+    def counting(schema_path, *args):
+        calls.append(os.path.relpath(schema_path, repo))
+        return original(schema_path, *args)
+
+    monkeypatch.setattr(yamldoc.tree, "compile_schema", counting)
+    yamldoc.tree.main_tree(str(repo), str(tmp_path / "docs"))
+
+    assert sorted(calls) == ["basic.schema", "schemas/envs.schema"]
+
+
+def test_broken_schema_fails_its_files(repo, tmp_path):
+    (repo / "schemas/envs.schema").write_bytes(b"\xff")
+    pages, failures = yamldoc.tree.main_tree(str(repo), str(tmp_path / "docs"))
+
+    assert sorted(os.path.relpath(path, repo) for path in failures) == [
+        "broken.yaml",
+        "envs/dev.yaml",
+        "envs/prod.yaml",
+    ]
+    assert len(pages) == 3
+
+
+def test_cli_tree(repo, tmp_path):
+    out = tmp_path / "docs"
+    result = subprocess.run(
+        [
+            sys.executable, "-c", "from yamldoc.cli import cli; cli()",
+            "--tree", str(repo), "-O", str(out), "--deterministic",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+    assert result.returncode == 1
+    assert "could not document" in result.stderr and "broken.yaml" in result.stderr
+    assert (out / "index.md").read_text().endswith(f" v{yamldoc.__version__}\n")
@@ -0,0 +1,68 @@
+import shutil
+
+import yamldoc.watch
+
+
+def make_watcher(tmp_path, debounce=1.0):
+    shutil.copy("test/yaml/basic.yaml", tmp_path / "a.yaml")
+    shutil.copy("test/yaml/two_level.yaml", tmp_path / "b.yaml")
+    shutil.copy("test/schema/basic.schema", tmp_path / "schema.yaml")
+
+    return yamldoc.watch.Watcher(
+        [str(tmp_path / "a.yaml"), str(tmp_path / "b.yaml")],
+        [str(tmp_path / "a.md"), str(tmp_path / "b.md")],
+        schema_path=str(tmp_path / "schema.yaml"),
+        debounce=debounce,
+        footer=False,
+    )
+
+
+def test_start_renders_everything(tmp_path):
+    watcher = make_watcher(tmp_path)
+
+    assert len(watcher.start()) == 2
+    assert "| string |" in (tmp_path / "a.md").read_text()
+    assert watcher.poll(now=100.0) == [], "Nothing changed."
+
+
+def test_yaml_change_renders_only_that_output(tmp_path, monkeypatch):
+    watcher = make_watcher(tmp_path)
+    watcher.start()
+
+    # The schema must be reused when only the YAML changes.
+    def fail(*args, **kwargs):
+        raise AssertionError("Schema should not be parsed again.")
+
+    monkeypatch.setattr(yamldoc.cache, "load_schema", fail)
+
+    with open(tmp_path / "a.yaml", "a") as f:
+        f.write("\n#' Added later.\nadded: 1\n")
+
+    # Debounced: nothing happens until the change has settled.
+    assert watcher.poll(now=10.0) == []
+    assert watcher.poll(now=10.5) == []
+    assert watcher.poll(now=11.0) == [str(tmp_path / "a.yaml")]
+    assert "Added later." in (tmp_path / "a.md").read_text()
+
+
+def test_schema_change_renders_everything(tmp_path):
+    watcher = make_watcher(tmp_path, debounce=0)
+    watcher.start()
+
+    with open(tmp_path / "schema.yaml", "a") as f:
+        f.write("        flat:\n                type: number\n")
+
+    assert len(watcher.poll()) == 2
+    assert "| number |" in (tmp_path / "b.md").read_text()
+
+
+def test_bad_yaml_does_not_stop_watching(tmp_path, capsys):
+    watcher = make_watcher(tmp_path, debounce=0)
+    watcher.start()
+
+    (tmp_path / "a.yaml").write_text("no colon here\n")
+    assert watcher.poll() == []
+    assert "could not document" in capsys.readouterr().err
+
+    shutil.copy("test/yaml/basic.yaml", tmp_path / "a.yaml")
+    assert watcher.poll() == [str(tmp_path / "a.yaml")]
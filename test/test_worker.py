@@ -0,0 +1,82 @@
+import io
+import json
+import os
+
+import yamldoc
+from yamldoc.worker import LRU, Worker
+
+from rendering import expected_markdown
+
+
+def test_lru():
+    lru = LRU(2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    lru.get("a")
+    lru.put("c", 3)
+
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c"), len(lru)) == (1, 3, 2)
+
+
+def test_handle_caches_outputs(tmp_path):
+    worker = Worker()
+    request = {
+        "id": 7,
+        "yaml_path": "test/yaml/two_level.yaml",
+        "schema_path": "test/schema/two_level.schema",
+        "footer": False,
+    }
+
+    first = worker.handle(request)
+    second = worker.handle(request)
+
+    assert first["status"] == second["status"] == "ok"
+    assert first["id"] == 7
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert "render" in first["timings"] and "render" not in second["timings"]
+    assert first["markdown"] == second["markdown"]
+    assert first["markdown"] == expected_markdown(
+        "test/yaml/two_level.yaml", "test/schema/two_level.schema"
+    )
+
+    output = tmp_path / "out" / "two_level.md"
+    third = worker.handle(dict(request, output=str(output)))
+    assert third["cached"] and third["output"] == str(output)
+    assert output.read_text() == first["markdown"]
+
+
+def test_handle_notices_changes(tmp_path):
+    yaml_path = tmp_path / "a.yaml"
+    schema_path = tmp_path / "a.schema"
+    yaml_path.write_text("#' Doc\na: 1\n")
+    schema_path.write_text("properties:\n    a:\n        type: number\n")
+
+    worker = Worker()
+    request = {"yaml_path": str(yaml_path), "schema_path": str(schema_path), "footer": False}
+    assert "| number |" in worker.handle(request)["markdown"]
+
+    schema_path.write_text("properties:\n    a:\n        type: string\n")
+    os.utime(schema_path, ns=(0, 0))
+    response = worker.handle(request)
+    assert not response["cached"]
+    assert response["counters"]["schema_cache_misses"] == 1
+    assert "| string |" in response["markdown"]
+
+
+def test_serve_reports_errors():
+    requests = [
+        '{"id": 1, "yaml_path": "test/yaml/basic.yaml", "footer": false}',
+        "",
+        "not json",
+        '{"id": 2, "yaml_path": "missing.yaml"}',
+        '{"id": 3, "yaml_path": "test/yaml/basic.yaml", "colour": "red"}',
+        "[1, 2]",
+    ]
+    out = io.StringIO()
+    Worker().serve(io.StringIO("\n".join(requests) + "\n"), out)
+
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["status"] for r in responses] == ["ok", "error", "error", "error", "error"]
+    assert [r["id"] for r in responses] == [1, None, 2, 3, None]
+    assert "colour" in responses[3]["error"]
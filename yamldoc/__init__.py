@@ -1,5 +1,60 @@
 __version__ = "0.1.6"
 
-from .parser import parse_yaml, main
-from .cli import cli
-from .entries import *
+import importlib
+
+from .render import render, iter_markdown
+
+# Everything else is imported the first time it is used, so that importing
+# yamldoc, or starting the command line tool, only loads what is needed.
+_LAZY = {
+    "parse_yaml": "parser",
+    "iter_yaml": "parser",
+    "main": "parser",
+    "cli": "cli",
+    "render_async": "aio",
+    "render_many": "aio",
+    "compile_schema": "schema",
+    "CompiledSchema": "schema",
+    "sanitize_meta": "entries",
+    "wrap_meta": "entries",
+    "EntryOptions": "entries",
+    "entry_options": "entries",
+    "MetaEntry": "entries",
+    "ListElement": "entries",
+    "ListValue": "entries",
+    "ListPolicy": "entries",
+    "Entry": "entries",
+}
+
+_SUBMODULES = {
+    "aio",
+    "batch",
+    "cache",
+    "emitters",
+    "entries",
+    "ir",
+    "manifest",
+    "parser",
+    "profile",
+    "scanner",
+    "schema",
+    "tree",
+    "watch",
+    "worker",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module("." + _LAZY[name], __name__), name)
+        # Importing yamldoc.cli binds the module to the name cli, so the
+        # function has to be put back.
+        globals()[name] = value
+        return value
+    if name in _SUBMODULES:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | _SUBMODULES)
@@ -0,0 +1,144 @@
+"""
+Documenting YAML files from asyncio code.
+
+Reading and parsing are run in an executor, so the event loop is never
+blocked, and a schema is parsed and compiled once and shared by every file
+documented with it (see yamldoc.schema.CompiledSchema).
+"""
+import asyncio
+import io
+from functools import partial
+
+import yamldoc.parser
+from yamldoc.schema import compile_schema
+
+
+def _document(yaml_path, parsed_schema, options):
+    """Returns the markdown for a YAML file. Run in an executor."""
+    out = io.StringIO()
+    yamldoc.parser.document(yaml_path, out, parsed_schema, **options)
+    return out.getvalue()
+
+
+async def _write(out, markdown):
+    """Write markdown to a text stream, or to an asyncio.StreamWriter."""
+    if hasattr(out, "drain"):
+        out.write(markdown.encode("utf-8"))
+        await out.drain()
+    else:
+        out.write(markdown)
+
+
+async def load_schema_async(schema_path, cache_dir=None, executor=None):
+    """
+    Parse and compile a schema file in an executor, see schema.compile_schema.
+
+    Arguments:
+        schema_path: Path to schema file.
+        cache_dir: Directory to cache parsed schemas in.
+        executor: concurrent.futures executor to run in. Defaults to the
+                  event loop's default executor.
+
+    Returns:
+        schema.CompiledSchema.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, partial(compile_schema, schema_path, cache_dir=cache_dir)
+    )
+
+
+async def render_async(
+    yaml_path,
+    schema_path=None,
+    out=None,
+    parsed_schema=None,
+    executor=None,
+    cache_dir=None,
+    **options,
+):
+    """
+    Document a YAML file without blocking the event loop.
+
+    Arguments:
+        yaml_path: Path to YAML file.
+        schema_path: (Optional) Path to schema file.
+        out: (Optional) Text stream or asyncio.StreamWriter to write the
+             markdown to. StreamWriters are drained after writing.
+        parsed_schema: (Optional) Schema already parsed with load_schema_async
+                       or schema.compile_schema, used instead of schema_path.
+        executor: concurrent.futures executor to read and parse in. Defaults
+                  to the event loop's default executor (threads). A process
+                  pool runs the parsing in parallel.
+        cache_dir: Directory to cache parsed schemas in.
+        options: Any of char, debug, exclude_char, override_exclude, title,
+                 description, footer, deterministic and use_mmap, see
+                 parser.main.
+
+    Returns:
+        The markdown, or None if it was written to out.
+    """
+    if parsed_schema is None and schema_path is not None:
+        parsed_schema = await load_schema_async(schema_path, cache_dir, executor)
+
+    loop = asyncio.get_running_loop()
+    markdown = await loop.run_in_executor(
+        executor, partial(_document, yaml_path, parsed_schema, options)
+    )
+
+    if out is None:
+        return markdown
+    await _write(out, markdown)
+
+
+async def render_many(
+    yaml_paths,
+    schema_path=None,
+    concurrency=4,
+    outputs=None,
+    parsed_schema=None,
+    executor=None,
+    cache_dir=None,
+    **options,
+):
+    """
+    Document many YAML files with one schema, at most concurrency at a time.
+
+    The schema is parsed and compiled once, before any of the YAML files.
+
+    Arguments:
+        yaml_paths: Paths to YAML files.
+        schema_path: (Optional) Path to the schema file shared by all of them.
+        concurrency: Largest number of files being documented at once.
+        outputs: (Optional) A text stream or asyncio.StreamWriter for each
+                 YAML file, in the same order, that its markdown is written
+                 to as soon as it is ready.
+
+        The remaining arguments are the same as for render_async.
+
+    Returns:
+        List with the markdown of each file, in the order of yaml_paths, or
+        None for each one written to an output.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1.")
+
+    yaml_paths = list(yaml_paths)
+    outputs = [None] * len(yaml_paths) if outputs is None else list(outputs)
+    if len(outputs) != len(yaml_paths):
+        raise ValueError("Give one output for each YAML file.")
+
+    if parsed_schema is None and schema_path is not None:
+        parsed_schema = await load_schema_async(schema_path, cache_dir, executor)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(yaml_path, out):
+        async with semaphore:
+            return await render_async(
+                yaml_path, out=out, parsed_schema=parsed_schema, executor=executor, **options
+            )
+
+    return await asyncio.gather(
+        *(one(yaml_path, out) for yaml_path, out in zip(yaml_paths, outputs))
+    )
@@ -0,0 +1,556 @@
+import codecs
+import glob
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import yamldoc.parser
+import yamldoc.scanner
+from yamldoc.manifest import Manifest, fingerprint
+from yamldoc.profile import Profile, count_memo, memo_snapshot, tally, timed
+from yamldoc.render import (
+    document_header,
+    footer_text,
+    has_rows,
+    iter_rows,
+    iter_sections,
+    page_header,
+    table_header,
+)
+from yamldoc.schema import SchemaReport, compile_schema
+
+# Smallest piece of a single YAML file that main_sharded hands to a worker.
+SHARD_BYTES = 1 << 20
+
+# The schema compiled by _init_worker, shared by every file a worker documents,
+# and the time it took, reported with the first file the worker profiles.
+_worker_schema = None
+_worker_schema_seconds = 0.0
+
+
+def expand_paths(patterns):
+    """
+    Expand a list of paths and glob patterns into a sorted list of files.
+
+    Plain paths are kept as given; patterns are expanded (``**`` is allowed)
+    and sorted so that the result does not depend on the file system.
+
+    Arguments:
+        patterns: Paths or glob patterns.
+
+    Returns:
+        List of paths with duplicates removed, in order of first appearance.
+    """
+    paths = []
+    for pattern in patterns:
+        if glob.escape(pattern) != pattern:
+            paths.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            paths.append(pattern)
+
+    return list(dict.fromkeys(paths))
+
+
+def output_paths(yaml_paths, output_dir, suffix=".md"):
+    """
+    Work out where the documentation for each YAML file is written.
+
+    Outputs mirror the layout of the inputs relative to their common
+    directory, so files with the same name in different folders don't clash.
+
+    Arguments:
+        yaml_paths: Paths to YAML files.
+        output_dir: Directory to write the documentation to.
+        suffix: Extension given to the output files.
+
+    Returns:
+        List of output paths, one for each input.
+    """
+    if not yaml_paths:
+        return []
+
+    dirs = [os.path.dirname(os.path.abspath(path)) for path in yaml_paths]
+    root = os.path.commonpath(dirs)
+
+    outputs = []
+    for path in yaml_paths:
+        relative = os.path.relpath(os.path.abspath(path), root)
+        outputs.append(os.path.join(output_dir, os.path.splitext(relative)[0] + suffix))
+
+    return outputs
+
+
+def _init_worker(schema_path, debug=False, cache_dir=None):
+    """Parse and compile the shared schema once when a worker starts."""
+    global _worker_schema, _worker_schema_seconds
+
+    if schema_path is None:
+        _worker_schema = None
+        _worker_schema_seconds = 0.0
+    else:
+        profile = Profile()
+        with profile.phase("parse_schema"):
+            _worker_schema = compile_schema(schema_path, debug, cache_dir)
+        _worker_schema_seconds = profile.phases["parse_schema"]
+
+
+def write_page(
+    yaml_path, output_path, parsed_schema, options, profile=None, render_cache=None,
+    schema_path=None,
+):
+    """
+    Document a YAML file into output_path, creating its directory, and reuse
+    the page from render_cache if it holds one (see cache.render_cached).
+
+    Arguments:
+        yaml_path: Path to YAML file.
+        output_path: Path to write the markdown to.
+        parsed_schema: schema.CompiledSchema or parsed schema, or None.
+        options: Rendering options as given to parser.document. Spill files
+                 of lists are linked relative to output_path.
+        profile: (Optional) yamldoc.profile.Profile, see main.
+        render_cache: (Optional) Directory of the render cache.
+        schema_path: Path parsed_schema was read from, used as part of the
+                     render cache key.
+
+    Returns:
+        The schema.SchemaReport of the file, or None without a schema.
+    """
+    lists = options.get("lists")
+    if lists is not None:
+        lists = lists.for_output(output_path)
+        options = dict(options, lists=lists)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    if render_cache is not None and (lists is None or lists.spill_dir is None):
+        from yamldoc.cache import render_cached
+
+        def page():
+            out = io.StringIO()
+            report = {}
+            yamldoc.parser.document(
+                yaml_path, out, parsed_schema, profile=profile, schema_report=report,
+                **options
+            )
+            return out.getvalue(), report.get(yaml_path)
+
+        markdown, report = render_cached(
+            render_cache, yaml_path, schema_path, options, page, profile
+        )
+        with open(output_path, "w") as out:
+            out.write(markdown)
+        return report
+
+    report = {}
+    with open(output_path, "w") as out:
+        yamldoc.parser.document(
+            yaml_path, out, parsed_schema, profile=profile, schema_report=report, **options
+        )
+    return report.get(yaml_path)
+
+
+def _document_one(
+    yaml_path, output_path, options, profiling=False, render_cache=None, schema_path=None
+):
+    """
+    Document a single YAML file with the worker's schema, see write_page.
+
+    Returns a tuple of (profile, report): the profile of the work as a
+    dictionary if profiling, else None, and the schema.SchemaReport of the
+    file, or None without a schema.
+    """
+    global _worker_schema_seconds
+
+    profile = None
+    if profiling:
+        profile = Profile()
+        if _worker_schema_seconds:
+            profile.phases["parse_schema"] = _worker_schema_seconds
+            _worker_schema_seconds = 0.0
+
+    report = write_page(
+        yaml_path, output_path, _worker_schema, options, profile, render_cache, schema_path
+    )
+    return None if profile is None else profile.as_dict(), report
+
+
+def main_many(
+    yaml_paths,
+    output_dir,
+    jobs=1,
+    schema_path=None,
+    char="#'",
+    debug=False,
+    exclude_char="#'!",
+    override_exclude=False,
+    title="Configuration Parameters Reference",
+    description="Any information about this page goes here.",
+    footer=True,
+    cache_dir=None,
+    incremental=False,
+    profile=None,
+    use_mmap=False,
+    schema_report=None,
+    lists=None,
+    deterministic=False,
+    render_cache=None,
+):
+    """
+    Document many YAML files, writing one markdown file per input.
+
+    The schema, if given, is parsed once per worker process and shared by
+    every file that worker handles. Each input always maps to the same output
+    file, so the result does not depend on the order in which jobs finish.
+
+    Arguments:
+        yaml_paths: Paths or glob patterns of YAML files.
+        output_dir: Directory to write the documentation to.
+        jobs: Number of worker processes. 1 documents the files in this process
+              and 0 or None uses one process per CPU.
+        schema_path: Path to a schema file shared by all the inputs.
+        cache_dir: Directory to cache the parsed schema in, see main.
+        incremental: Skip inputs whose YAML, schema, options and yamldoc version
+                     are unchanged since the last run, leaving their output
+                     files untouched. Fingerprints are kept in a manifest in
+                     output_dir.
+        profile: (Optional) yamldoc.profile.Profile, which receives the phases
+                 and counters of every worker added together.
+        schema_report: (Optional) Dictionary to store the schema.SchemaReport
+                       of each file documented in, see main. Files skipped as
+                       unchanged have none.
+        lists: (Optional) entries.ListPolicy, see main. Spill files are
+               linked relative to each output.
+        render_cache: (Optional) Directory to cache rendered pages in, shared
+                      by all the workers, see main.
+
+        The remaining arguments are the same as for main.
+
+    Returns:
+        List of the output paths, in input order.
+    """
+    yaml_paths = expand_paths(yaml_paths)
+    outputs = output_paths(yaml_paths, output_dir)
+
+    options = dict(
+        char=char,
+        debug=debug,
+        exclude_char=exclude_char,
+        override_exclude=override_exclude,
+        title=title,
+        description=description,
+        footer=footer,
+        use_mmap=use_mmap,
+        lists=lists,
+        deterministic=deterministic,
+    )
+
+    todo = list(zip(yaml_paths, outputs))
+    if incremental:
+        manifest = Manifest(output_dir)
+        fingerprints = {
+            out: fingerprint(path, schema_path, **options) for path, out in todo
+        }
+        todo = [
+            (path, out) for path, out in todo
+            if not manifest.is_current(out, fingerprints[out])
+        ]
+
+    if todo:
+        results = _document_all(
+            todo, options, jobs, schema_path, debug, cache_dir, profile is not None,
+            render_cache,
+        )
+        for (path, _), (worker_profile, report) in zip(todo, results):
+            if profile is not None:
+                profile.merge(worker_profile)
+            if schema_report is not None and report is not None:
+                schema_report[path] = report
+
+    if incremental:
+        for _, out in todo:
+            manifest.record(out, fingerprints[out])
+        manifest.save()
+
+    return outputs
+
+
+def _document_all(
+    todo, options, jobs, schema_path, debug, cache_dir, profiling=False, render_cache=None
+):
+    """
+    Document (yaml_path, output_path) pairs, in a process pool if jobs allows.
+
+    Returns the result of _document_one for each pair.
+    """
+    yaml_paths = [path for path, _ in todo]
+    outputs = [out for _, out in todo]
+    n = len(todo)
+
+    if not jobs or jobs > 1:
+        with ProcessPoolExecutor(
+            max_workers=jobs or None,
+            initializer=_init_worker,
+            initargs=(schema_path, debug, cache_dir),
+        ) as pool:
+            return list(
+                pool.map(
+                    _document_one, yaml_paths, outputs, [options] * n, [profiling] * n,
+                    [render_cache] * n, [schema_path] * n,
+                )
+            )
+
+    _init_worker(schema_path, debug, cache_dir)
+    return [
+        _document_one(path, out, options, profiling, render_cache, schema_path)
+        for path, out in todo
+    ]
+
+
+def _document_shard(yaml_path, start, end, options, level=2, profiling=False, lists=None):
+    """
+    Parse, merge and render the bytes of a YAML file between start and end.
+
+    The piece is split at document markers. The first part carries on the
+    document the previous piece ended in, and every later one starts a new
+    document.
+
+    Returns a tuple of (parts, profile, report). Each part is a tuple of
+    (first_is_base, has_rows, rows, sections): whether its first entry is
+    a mapping (None if it has no entries), whether it has any top level key
+    value pairs, and the markdown of its table rows and of its sections.
+    profile is the profile of the work as a dictionary if profiling, else
+    None, and report the schema.SchemaReport of the piece, or None without a
+    schema.
+    """
+    profile = None
+    if profiling:
+        profile = Profile()
+        memo = memo_snapshot()
+
+    with timed(profile, "parse_yaml"):
+        with open(yaml_path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        if start == 0 and data.startswith(codecs.BOM_UTF8):
+            data = data[len(codecs.BOM_UTF8):]
+        items = yamldoc.parser.iter_yaml(
+            io.StringIO(data.decode("utf-8")), profile=profile, documents=True, **options
+        )
+        documents = yamldoc.parser.split_documents(items)
+
+    if profile is not None:
+        for yaml in documents:
+            tally(profile, yaml)
+
+    report = None
+    if _worker_schema is not None:
+        report = SchemaReport(missing=_worker_schema.properties)
+        with timed(profile, "add_type_metadata"):
+            for yaml in documents:
+                document_report = _worker_schema.apply(yaml)
+                report = report.merge(document_report)
+                if profile is not None:
+                    profile.count("schema_properties_matched", len(document_report.matched))
+
+    schema = _worker_schema is not None
+    parts = []
+    with timed(profile, "render"):
+        for yaml in documents:
+            parts.append(
+                (
+                    yaml[0].isBase if yaml else None,
+                    has_rows(yaml),
+                    "".join(iter_rows(yaml, schema, lists)),
+                    "".join(iter_sections(yaml, schema, level=level, lists=lists)),
+                )
+            )
+
+    if profile is not None:
+        count_memo(profile, memo)
+
+    return parts, None if profile is None else profile.as_dict(), report
+
+
+def main_sharded(
+    yaml_path,
+    output=None,
+    jobs=None,
+    schema_path=None,
+    char="#'",
+    debug=False,
+    exclude_char="#'!",
+    override_exclude=False,
+    title="Configuration Parameters Reference",
+    description="Any information about this page goes here.",
+    footer=True,
+    cache_dir=None,
+    profile=None,
+    use_mmap=False,
+    split_documents=False,
+    shard_bytes=SHARD_BYTES,
+    schema_report=None,
+    lists=None,
+    deterministic=False,
+):
+    """
+    Document one large YAML file by splitting it between worker processes.
+
+    The file is cut at top level keys (see yamldoc.scanner.split_points) into
+    pieces of at least shard_bytes. Each worker parses its pieces, merges in
+    the schema and renders their table rows and sections, which are then put
+    back together in file order, so the output is the same as that of main.
+    The documents of a file holding several are handled the same way.
+
+    Arguments:
+        yaml_path: Path to YAML file.
+        output: (Optional) Path or open text file to write the markdown to.
+                Defaults to stdout.
+        jobs: Number of worker processes. 0 or None uses one process per CPU
+              and 1 documents every piece in this process.
+        shard_bytes: Smallest size of a piece worth handing to a worker.
+        use_mmap: Ignored; the pieces are always read directly.
+        schema_report: (Optional) Dictionary to store the schema.SchemaReport
+                       of the file in, see main.
+
+        The remaining arguments are the same as for main.
+
+    Returns:
+        Nothing, writes to stdout or the given output.
+    """
+    global _worker_schema, _worker_schema_seconds
+
+    if split_documents and (output is None or hasattr(output, "write")):
+        raise ValueError("split_documents needs an output path to name the files after.")
+
+    if lists is not None:
+        lists = lists.for_output(output)
+
+    parsed_schema = None
+    if schema_path is not None:
+        with timed(profile, "parse_schema"):
+            parsed_schema = compile_schema(schema_path, debug, cache_dir)
+        title, description = parsed_schema.page_text(title, description)
+
+    workers = jobs or os.cpu_count() or 1
+    with timed(profile, "split"):
+        n = max(1, min(workers * 4, os.path.getsize(yaml_path) // shard_bytes))
+        points = yamldoc.scanner.split_points(yaml_path, n, char, exclude_char)
+        several = yamldoc.scanner.has_several_documents(yaml_path)
+
+    # Sections sit below the document headings when the documents share a page.
+    level = 3 if several and not split_documents else 2
+
+    starts = points[:-1]
+    ends = points[1:]
+    options = dict(
+        char=char, debug=debug, exclude_char=exclude_char, override_exclude=override_exclude
+    )
+    m = len(starts)
+    profiling = profile is not None
+
+    if workers > 1 and m > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, m),
+            initializer=_init_worker,
+            initargs=(schema_path, debug, cache_dir),
+        ) as pool:
+            shards = list(
+                pool.map(
+                    _document_shard,
+                    [yaml_path] * m, starts, ends, [options] * m, [level] * m,
+                    [profiling] * m, [lists] * m,
+                )
+            )
+    else:
+        _worker_schema = parsed_schema
+        _worker_schema_seconds = 0.0
+        shards = [
+            _document_shard(yaml_path, start, end, options, level, profiling, lists)
+            for start, end in zip(starts, ends)
+        ]
+
+    # Put the parts of each document back together.
+    documents = []
+    for number, (parts, _, _) in enumerate(shards):
+        for i, (first, has_rows, rows, sections) in enumerate(parts):
+            if i == 0 and number > 0:
+                document = documents[-1]
+                if document[0] is None:
+                    document[0] = first
+                document[1] = document[1] or has_rows
+            else:
+                document = [first, has_rows, [], []]
+                documents.append(document)
+            document[2].append(rows)
+            document[3].append(sections)
+
+    documents = [document for document in documents if document[0] is not None]
+
+    if profile is not None:
+        profile.count("shards", m)
+        profile.count("documents", len(documents))
+        for _, shard_profile, _ in shards:
+            profile.merge(shard_profile)
+
+    if schema_report is not None and parsed_schema is not None:
+        report = SchemaReport(missing=parsed_schema.properties)
+        for _, _, shard_report in shards:
+            report = report.merge(shard_report)
+        schema_report[yaml_path] = report
+
+    schema = parsed_schema is not None
+    # The quick scan can only miss documents in unusual files, e.g. ones
+    # with indented top level keys. Never drop any.
+    several = several or len(documents) > 1
+
+    if split_documents:
+        stem, extension = os.path.splitext(output)
+        for number, document in enumerate(documents, 1):
+            with open(f"{stem}-{number}{extension}", "w") as out:
+                out.writelines(
+                    _page(title, description, footer, schema, [document], False, deterministic)
+                )
+        return
+
+    chunks = _page(title, description, footer, schema, documents, several, deterministic)
+    if output is None:
+        sys.stdout.writelines(chunks)
+    elif hasattr(output, "write"):
+        output.writelines(chunks)
+    else:
+        with open(output, "w") as out:
+            out.writelines(chunks)
+
+
+def _page(title, description, footer, schema, documents, several=False, deterministic=False):
+    """
+    Lay out the rendered parts of documents as a page, as render and
+    render_documents do.
+
+    Returns a list of markdown chunks.
+    """
+    chunks = [page_header(title, description)]
+
+    if not several:
+        # A single document, or none at all, is laid out as the whole page.
+        first, _, rows, sections = documents[0] if documents else (True, False, [], [])
+        if not first:
+            chunks.append(table_header(schema))
+        chunks.extend(rows)
+        chunks.extend(sections)
+    else:
+        for number, (first, has_rows, rows, sections) in enumerate(documents, 1):
+            chunks.append(document_header(number))
+            if not first:
+                chunks.append(table_header(schema))
+            chunks.extend(rows)
+            if has_rows:
+                chunks.append("\n")
+            chunks.extend(sections)
+
+    if footer:
+        chunks.append(footer_text(False if deterministic else None))
+
+    return chunks
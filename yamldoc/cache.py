@@ -0,0 +1,278 @@
+import hashlib
+import io
+import os
+
+import yamldoc
+import yamldoc.parser
+
+# Every cache file starts with this marker followed by a SHA-256 digest of
+# the pickled payload, so truncated or corrupt files can be detected.
+_MAGIC = b"YAMLDOC-CACHE-1\n"
+_SUFFIX = ".cache"
+
+
+class DiskCache:
+    """
+    A directory of pickled values, keyed by content hash, with a bound on the
+    total size. The least recently used files are removed first.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        """
+        Initialize the object.
+
+        Arguments:
+            directory: Directory to keep the cache files in. Created if missing.
+            max_bytes: Total size the cache files may take up before eviction.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, *parts):
+        """
+        Returns a hex key for the given parts and the yamldoc version.
+
+        Arguments:
+            parts: Strings or bytes that identify the cached value.
+        """
+        h = hashlib.sha256(yamldoc.__version__.encode())
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode()
+            h.update(len(part).to_bytes(8, "little"))
+            h.update(part)
+        return h.hexdigest()
+
+    def path(self, key):
+        """Returns the path of the file holding the given key."""
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key):
+        """
+        Returns the value stored under key, or None if there is no usable value.
+
+        Corrupt entries are removed so that they are rebuilt on the next put.
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except OSError:
+            return None
+
+        header = len(_MAGIC) + hashlib.sha256().digest_size
+        payload = blob[header:]
+        if (
+            not blob.startswith(_MAGIC)
+            or blob[len(_MAGIC):header] != hashlib.sha256(payload).digest()
+        ):
+            self._remove(path)
+            return None
+
+        # Only imported when the cache is used, to keep start-up fast.
+        import pickle
+
+        try:
+            value = pickle.loads(payload)
+        except Exception:
+            self._remove(path)
+            return None
+
+        # Mark the entry as recently used.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        return value
+
+    def put(self, key, value):
+        """
+        Stores value under key and evicts old entries if the cache is too big.
+
+        The file is written to a temporary name and moved into place, so
+        readers in other processes never see a partly written entry.
+        """
+        import pickle
+        import tempfile
+
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        blob = _MAGIC + hashlib.sha256(payload).digest() + payload
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            self._remove(tmp)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Returns the SHA-256 hex digest of a file's contents, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_signature(path):
+    """
+    Returns the modification time and size of a file, or None if it cannot
+    be read. A cheap way to notice that a file has changed.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def cache_dir_from_env(cache_dir=None):
+    """Returns cache_dir, falling back on the YAMLDOC_CACHE_DIR environment variable."""
+    if cache_dir is None:
+        cache_dir = os.environ.get("YAMLDOC_CACHE_DIR") or None
+    return cache_dir
+
+
+def load_schema(schema_path, debug=False, cache_dir=None):
+    """
+    Parse a schema file, reusing an earlier result from the cache if there is one.
+
+    The cache is keyed by the schema's contents and the yamldoc version, so an
+    edited schema or an upgraded yamldoc is always parsed afresh.
+
+    Arguments:
+        schema_path: Path to schema file.
+        debug: Print debug information
+        cache_dir: Cache directory. Defaults to YAMLDOC_CACHE_DIR; without
+                   either the schema is parsed without caching.
+
+    Returns:
+        The (schema, specials, extras) tuple from parse_schema.
+    """
+    cache_dir = cache_dir_from_env(cache_dir)
+    if cache_dir is None:
+        return yamldoc.parser.parse_schema(schema_path, debug)
+
+    with open(schema_path, "rb") as f:
+        content = f.read()
+
+    cache = DiskCache(cache_dir)
+    key = cache.key("schema", content)
+
+    parsed = cache.get(key)
+    if parsed is None:
+        # Parse the bytes that were hashed rather than reopening the file,
+        # in case it changes in the meantime.
+        parsed = yamldoc.parser.parse_schema(io.TextIOWrapper(io.BytesIO(content)), debug)
+        cache.put(key, parsed)
+
+    return parsed
+
+
+def render_key(cache, yaml_path, schema_path=None, **options):
+    """
+    Returns the key a rendered page is stored under in a render cache.
+
+    The key covers the contents of the YAML and schema files, the options
+    that change the page (see manifest.FINGERPRINT_OPTIONS), the yamldoc
+    version and, when the footer is dated, today's date.
+
+    Arguments:
+        cache: DiskCache the page is kept in.
+        yaml_path: Path to YAML file.
+        schema_path: Path to schema file, or None.
+        **options: Render options as given to main.
+    """
+    import json
+    from yamldoc.manifest import FINGERPRINT_OPTIONS
+
+    record = {key: options.get(key) for key in FINGERPRINT_OPTIONS}
+    if record["footer"] and not record["deterministic"]:
+        from datetime import date
+
+        record["date"] = date.today().isoformat()
+
+    return cache.key(
+        "render",
+        file_digest(yaml_path),
+        "" if schema_path is None else file_digest(schema_path),
+        json.dumps(record, sort_keys=True),
+    )
+
+
+def render_cached(cache_dir, yaml_path, schema_path, options, render, profile=None):
+    """
+    Returns the page for a YAML file from a render cache, rendering and
+    storing it if it is not there.
+
+    Pages are kept in a DiskCache, so the cache is bounded in size and can be
+    shared by several processes at once.
+
+    Arguments:
+        cache_dir: Directory of the render cache.
+        yaml_path: Path to YAML file.
+        schema_path: Path to schema file, or None.
+        options: Render options as given to main, see render_key.
+        render: Called without arguments when the page is not cached, and
+                returns a (markdown, report) pair, report being the
+                schema.SchemaReport of the file or None.
+        profile: (Optional) yamldoc.profile.Profile to count cache hits and
+                 misses in.
+
+    Returns:
+        The (markdown, report) pair.
+    """
+    cache = DiskCache(cache_dir)
+    signatures = file_signature(yaml_path), schema_path and file_signature(schema_path)
+    key = render_key(cache, yaml_path, schema_path, **options)
+
+    page = cache.get(key)
+    if page is not None:
+        if profile is not None:
+            profile.count("render_cache_hits")
+        return page
+
+    if profile is not None:
+        profile.count("render_cache_misses")
+    page = render()
+
+    # The key was made from the files as they were before rendering; don't
+    # store the page if either changed in the meantime.
+    if signatures == (file_signature(yaml_path), schema_path and file_signature(schema_path)):
+        cache.put(key, page)
+
+    return page
@@ -1,10 +1,34 @@
+# yamldoc.batch, yamldoc.watch and the other submodules are loaded when
+# first used (see yamldoc.__getattr__), so each mode only imports what it
+# needs.
 import yamldoc
 import argparse
+import sys
 
 
 def cli():
     parser = argparse.ArgumentParser(prog="YAML Documentation Engine")
-    parser.add_argument("yaml_path", help="YAML file.")
+    parser.add_argument(
+        "yaml_path",
+        nargs="*",
+        help="YAML file. Several files or glob patterns may be given with --output-dir.",
+    )
+    parser.add_argument(
+        "--tree",
+        default=None,
+        help=(
+            "Document every YAML file under this directory into --output-dir, "
+            "pairing each with a schema, and write an index page."
+        ),
+    )
+    parser.add_argument(
+        "--schema-map",
+        default=None,
+        help=(
+            "With --tree, a YAML file mapping glob patterns of YAML files to their "
+            "schemas (default: .yamldoc-schemas.yaml at the top of the tree)."
+        ),
+    )
     parser.add_argument("-c", "--char", default="#'", help="Metadata character prefix.")
     parser.add_argument(
         "-d", "--debug", action="store_true", help="Show debug information."
@@ -21,12 +45,257 @@ def cli():
         default="#'!",
         help="Prefix to exclude the following entry from generated documentation.",
     )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Write the markdown to this file instead of stdout.",
+    )
+    parser.add_argument(
+        "-O",
+        "--output-dir",
+        default=None,
+        help="Write one markdown file per input YAML file into this directory.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Number of worker processes (0 for one per CPU). With a single file "
+            "and no --output-dir, the file is split between the workers."
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="With --output-dir, skip inputs that are unchanged since the last run.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-render whenever the YAML or schema files change.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between checks for changes with --watch.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        help="Seconds files must stay unchanged before re-rendering with --watch.",
+    )
+    parser.add_argument(
+        "--split-documents",
+        action="store_true",
+        help=(
+            "Write each document of a file holding several (separated by ---) to its "
+            "own file, named after --output: out.md becomes out-1.md, out-2.md, ..."
+        ),
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        dest="formats",
+        action="append",
+        default=None,
+        help=(
+            "Output format: markdown (default), html, rst or json. May be given "
+            "several times to write each from one parse, named after --output."
+        ),
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help=(
+            "Keep running and document the files requested as JSON lines on stdin, "
+            "answering each with a line of JSON on stdout."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report the time spent in each phase and counts of what was parsed on stderr.",
+    )
+    parser.add_argument(
+        "--mmap",
+        dest="use_mmap",
+        action="store_true",
+        help="Read YAML files through a memory map. Faster for very large files.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory to cache parsed schemas in (default: $YAMLDOC_CACHE_DIR).",
+    )
+    parser.add_argument(
+        "--render-cache",
+        default=None,
+        help=(
+            "Directory to cache rendered pages in. A file whose YAML, schema, options "
+            "and yamldoc version are unchanged is written from the cache without parsing."
+        ),
+    )
+    parser.add_argument(
+        "--deterministic",
+        action="store_true",
+        help="Leave the date out of the footer, so the same input always gives the same output.",
+    )
+    parser.add_argument(
+        "--schema-report",
+        default=None,
+        help=(
+            "With --schema-path, write a JSON report to this file of the schema "
+            "properties each YAML file matched or is missing, and of its keys the "
+            "schema does not describe."
+        ),
+    )
+    parser.add_argument(
+        "--list-limit",
+        type=int,
+        default=None,
+        help=(
+            "Show at most this many items of a list, followed by its length and a "
+            "hash (0 for only the length and hash). Lists are shown in full by default."
+        ),
+    )
+    parser.add_argument(
+        "--list-spill",
+        default=None,
+        help="With --list-limit, write each list that is cut short in full to this directory.",
+    )
     parser.add_argument(
         "--override-exclude",
         action="store_true",
         help="Override the exclusion character and force inclusion of all entries.",
     )
 
-    args = parser.parse_args()
+    args = vars(parser.parse_args())
+
+    yaml_paths = args.pop("yaml_path")
+    tree = args.pop("tree")
+    schema_map = args.pop("schema_map")
+    output_dir = args.pop("output_dir")
+    jobs = args.pop("jobs")
+    incremental = args.pop("incremental")
+    watch = args.pop("watch")
+    interval = args.pop("poll_interval")
+    debounce = args.pop("debounce")
+    worker = args.pop("worker")
+    list_limit = args.pop("list_limit")
+    list_spill = args.pop("list_spill")
+    report_path = args.pop("schema_report")
+    schema_report = args["schema_report"] = {} if report_path else None
+    profile = args["profile"] = yamldoc.profile.Profile() if args["profile"] else None
+
+    if list_spill is not None and list_limit is None:
+        parser.error("--list-spill requires --list-limit.")
+    if list_limit is not None and list_limit < 0:
+        parser.error("--list-limit cannot be negative.")
+    if list_limit is not None:
+        args["lists"] = yamldoc.entries.ListPolicy(list_limit, list_spill)
+
+    if worker:
+        if yaml_paths:
+            parser.error("--worker takes its YAML files from stdin.")
+        yamldoc.worker.serve(cache_dir=args["cache_dir"])
+        return
+
+    if schema_map is not None and tree is None:
+        parser.error("--schema-map requires --tree.")
+
+    if tree is not None:
+        if yaml_paths or output_dir is None:
+            parser.error("--tree takes no YAML files and requires --output-dir.")
+        if args["output"] or watch or incremental or args["split_documents"] or args["formats"]:
+            parser.error(
+                "--tree cannot be used with --output, --watch, --incremental, "
+                "--split-documents or --format."
+            )
+        del args["output"], args["split_documents"], args["formats"]
+        try:
+            _, failures = yamldoc.tree.main_tree(
+                tree, output_dir, jobs=jobs, mapping_path=schema_map, **args
+            )
+        except (OSError, ValueError) as e:
+            # The tree itself or the mapping file could not be read.
+            parser.error(str(e))
+        yamldoc.tree.report_failures(failures)
+        _write_reports(report_path, schema_report, profile)
+        if failures:
+            sys.exit(1)
+        return
+
+    if not yaml_paths:
+        parser.error("the following arguments are required: yaml_path")
+
+    if report_path and (args["schema_path"] is None or watch):
+        parser.error("--schema-report requires --schema-path and cannot be used with --watch.")
+
+    if args["split_documents"] and (args["output"] is None or watch or output_dir):
+        parser.error("--split-documents requires --output and a single file.")
+
+    if args["render_cache"] is not None and (watch or (jobs != 1 and output_dir is None)):
+        parser.error("--render-cache cannot be used with --watch or --jobs on a single file.")
+
+    if args["formats"]:
+        if watch or output_dir:
+            parser.error("--format can only be used with a single file.")
+        if jobs != 1:
+            parser.error("--format cannot be used with --jobs.")
+        try:
+            yamldoc.emitters.format_outputs(args["formats"], args["output"])
+        except ValueError as e:
+            parser.error(str(e))
+
+    yaml_paths = yamldoc.batch.expand_paths(yaml_paths)
+
+    if watch:
+        if output_dir is not None:
+            outputs = yamldoc.batch.output_paths(yaml_paths, output_dir)
+        elif len(yaml_paths) == 1:
+            outputs = [args["output"]]
+        else:
+            parser.error("--output-dir is required when watching several files.")
+        del args["output"], args["split_documents"], args["formats"], args["schema_report"]
+        del args["render_cache"]
+        yamldoc.watch.watch(yaml_paths, outputs, interval=interval, debounce=debounce, **args)
+    elif output_dir is None:
+        if not yaml_paths:
+            parser.error("no YAML files match the given patterns.")
+        if len(yaml_paths) > 1:
+            parser.error("--output-dir is required when documenting several files.")
+        if incremental:
+            parser.error("--incremental requires --output-dir.")
+        if jobs == 1:
+            yamldoc.main(yaml_paths[0], **args)
+        else:
+            del args["formats"], args["render_cache"]
+            yamldoc.batch.main_sharded(yaml_paths[0], jobs=jobs, **args)
+    else:
+        if args.pop("output") is not None:
+            parser.error("--output and --output-dir cannot be used together.")
+        del args["split_documents"], args["formats"]
+        yamldoc.batch.main_many(
+            yaml_paths, output_dir, jobs=jobs, incremental=incremental, **args
+        )
+
+    _write_reports(report_path, schema_report, profile)
+
+
+def _write_reports(report_path, schema_report, profile):
+    """Write the schema report and print the profile, if they were asked for."""
+    if schema_report is not None:
+        import json
+
+        reports = {path: report.as_dict() for path, report in schema_report.items()}
+        with open(report_path, "w") as f:
+            json.dump(reports, f, indent=2)
+            f.write("\n")
 
-    yamldoc.main(**(vars(args)))
+    if profile is not None:
+        print(profile.report(), file=sys.stderr)
@@ -0,0 +1,289 @@
+import html
+import json
+import os
+import sys
+
+from yamldoc.entries import (
+    SCHEMA_TABLE_HEADER,
+    TABLE_HEADER,
+    cut_list_text,
+    value_cell,
+    wrap_meta,
+)
+from yamldoc.render import document_header, footer_text, page_header, table_header
+
+# Emitters by format name, each a tuple of (function, file extension). The
+# function is called as function(ir, out) with a page from yamldoc.ir.page_ir
+# and a text stream to write to.
+EMITTERS = {}
+
+
+def register(name, extension):
+    """
+    Returns a decorator that adds an emitter for a new output format.
+
+    Arguments:
+        name: Name of the format, as given to --format.
+        extension: Extension of the files written in this format, e.g. ".md".
+    """
+
+    def decorator(function):
+        EMITTERS[name] = (function, extension)
+        return function
+
+    return decorator
+
+
+def emit(ir, out, format="markdown"):
+    """
+    Write a page in the given format.
+
+    Arguments:
+        ir: Page from yamldoc.ir.page_ir.
+        out: Text stream to write to.
+        format: Name of a registered format.
+    """
+    check_formats([format])
+    EMITTERS[format][0](ir, out)
+
+
+def extension(format):
+    """Returns the file extension of a registered format."""
+    return EMITTERS[format][1]
+
+
+def check_formats(formats):
+    """Raises ValueError if any of the formats is not registered."""
+    unknown = [format for format in formats if format not in EMITTERS]
+    if unknown:
+        raise ValueError(
+            f"Unknown format {unknown[0]!r}, expected one of: {', '.join(sorted(EMITTERS))}"
+        )
+
+
+def format_outputs(formats, output=None):
+    """
+    Work out where each format is written.
+
+    Arguments:
+        formats: Names of registered formats.
+        output: Path whose extension is replaced by that of each format, or
+                an open text file or None (stdout) when there is one format.
+
+    Returns:
+        Dictionary mapping each format to a path or a text stream.
+    """
+    check_formats(formats)
+
+    if output is None or hasattr(output, "write"):
+        if len(formats) > 1:
+            raise ValueError("Several formats need an output path to name the files after.")
+        return {formats[0]: sys.stdout if output is None else output}
+
+    stem = os.path.splitext(output)[0]
+    return {format: stem + extension(format) for format in formats}
+
+
+@register("markdown", ".md")
+def emit_markdown(ir, out):
+    """Writes a page as markdown, exactly as yamldoc.render does."""
+    schema = ir["schema"]
+    write = out.write
+
+    def row(entry):
+        meta = wrap_meta(entry["meta"])
+        value = value_cell(entry["value"], entry.get("list"))
+        if schema:
+            vartype = "Unknown" if entry["type"] is None else entry["type"]
+            return f"| `{entry['key']}` | {value} | {vartype} | {meta} |\n"
+        return f"| `{entry['key']}` | {value} | {meta} |\n"
+
+    def write_section(section, level):
+        write(f"{'#' * level} `{section['path']}`\n\n{section['meta']}\n\n")
+        if not section["entries"]:
+            write("No member variables.\n\n")
+        else:
+            write("#" * (level + 1) + " Member variables:\n\n")
+            write(SCHEMA_TABLE_HEADER if schema else TABLE_HEADER)
+            for entry in section["entries"]:
+                write(row(entry))
+        for child in section["sections"]:
+            write("\n")
+            write_section(child, level)
+
+    write(page_header(ir["title"], ir["description"]))
+
+    several = len(ir["documents"]) > 1
+    for number, document in enumerate(ir["documents"], 1):
+        if several:
+            write(document_header(number))
+        if document["table_header"]:
+            write(table_header(schema))
+        for entry in document["entries"]:
+            write(row(entry))
+        if several and document["entries"]:
+            write("\n")
+        for child in document["sections"]:
+            write_section(child, 3 if several else 2)
+            write("\n")
+
+    if ir["generator"] is not None:
+        write(footer_text(ir["generator"]["date"] or False))
+
+
+def _value_text(entry):
+    """Returns the value of an entry as plain text."""
+    if "list" in entry:
+        return cut_list_text(entry["value"])
+    return str(entry["value"])
+
+
+def _on(generator, escape=str):
+    """Returns the " on <date>" of the footer, or nothing if it is undated."""
+    return "" if generator["date"] is None else f" on {escape(generator['date'])}"
+
+
+def _list_note(entry):
+    """Returns the length and hash of a list cut short, as plain text."""
+    summary = entry["list"]
+    return f"{summary['length']} items, sha256 {summary['sha256'][:12]}"
+
+
+@register("json", ".json")
+def emit_json(ir, out):
+    """Writes a page as JSON."""
+    json.dump(ir, out, indent=2)
+    out.write("\n")
+
+
+@register("html", ".html")
+def emit_html(ir, out):
+    """Writes a page as a standalone HTML file."""
+    schema = ir["schema"]
+    write = out.write
+    e = html.escape
+
+    def write_table(entries):
+        columns = ["Key", "Value", "Information"]
+        if schema:
+            columns.insert(2, "Type")
+        write("<table>\n<thead><tr>")
+        write("".join(f"<th>{column}</th>" for column in columns))
+        write("</tr></thead>\n<tbody>\n")
+        for entry in entries:
+            value = f"<code>{e(_value_text(entry))}</code>"
+            if "list" in entry:
+                value += f" ({e(_list_note(entry))}"
+                if entry["list"]["spill"] is not None:
+                    value += f', <a href="{e(entry["list"]["spill"])}">full list</a>'
+                value += ")"
+            cells = [f"<code>{e(entry['key'])}</code>", value]
+            if schema:
+                cells.append(e(str(entry["type"] or "Unknown")))
+            cells.append(e(entry["meta"]))
+            write("<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>\n")
+        write("</tbody>\n</table>\n")
+
+    def write_section(section, level):
+        write(f'<section id="{e(section["path"])}">\n')
+        write(f"<h{level}><code>{e(section['path'])}</code></h{level}>\n")
+        if section["meta"]:
+            write(f"<p>{e(section['meta'])}</p>\n")
+        if section["entries"]:
+            write_table(section["entries"])
+        else:
+            write("<p>No member variables.</p>\n")
+        write("</section>\n")
+        for child in section["sections"]:
+            write_section(child, level)
+
+    write("<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n")
+    write(f"<title>{e(ir['title'])}</title>\n</head>\n<body>\n")
+    write(f"<h1>{e(ir['title'])}</h1>\n<p>{e(ir['description'])}</p>\n")
+
+    several = len(ir["documents"]) > 1
+    for number, document in enumerate(ir["documents"], 1):
+        if several:
+            write(f"<h2>Document {number}</h2>\n")
+        if document["entries"]:
+            write_table(document["entries"])
+        for child in document["sections"]:
+            write_section(child, 3 if several else 2)
+
+    generator = ir["generator"]
+    if generator is not None:
+        write(
+            '<footer>Generated by <a href="https://github.com/chris1221/yaml.doc">yamldoc</a>'
+            f" v{e(generator['version'])}{_on(generator, e)}</footer>\n"
+        )
+    write("</body>\n</html>\n")
+
+
+def _rst_heading(text, underline):
+    return f"{text}\n{underline * len(text)}\n\n"
+
+
+def _rst_literal(value):
+    """Returns value as inline rST literal text."""
+    text = str(value)
+    if not text or "``" in text or text.startswith(" ") or text.endswith((" ", "\\")):
+        # Not expressible as an inline literal; escape instead.
+        return text.replace("\\", "\\\\").replace("`", "\\`").replace("*", "\\*") or "\\ "
+    return f"``{text}``"
+
+
+@register("rst", ".rst")
+def emit_rst(ir, out):
+    """Writes a page as reStructuredText."""
+    schema = ir["schema"]
+    write = out.write
+
+    def write_table(entries):
+        columns = ["Key", "Value", "Information"]
+        if schema:
+            columns.insert(2, "Type")
+        write(".. list-table::\n   :header-rows: 1\n\n")
+        write("   * - " + "\n     - ".join(columns) + "\n")
+        for entry in entries:
+            value = _rst_literal(_value_text(entry))
+            if "list" in entry:
+                value += f" ({_list_note(entry)}"
+                if entry["list"]["spill"] is not None:
+                    value += f", `full list <{entry['list']['spill']}>`__"
+                value += ")"
+            cells = [_rst_literal(entry["key"]), value]
+            if schema:
+                cells.append(str(entry["type"] or "Unknown"))
+            cells.append(" ".join(entry["meta"].split()))
+            write("   * - " + "\n     - ".join(cells) + "\n")
+        write("\n")
+
+    def write_section(section, underline):
+        write(_rst_heading(_rst_literal(section["path"]), underline))
+        if section["meta"]:
+            write(section["meta"] + "\n\n")
+        if section["entries"]:
+            write_table(section["entries"])
+        else:
+            write("No member variables.\n\n")
+        for child in section["sections"]:
+            write_section(child, underline)
+
+    write(_rst_heading(ir["title"], "="))
+    write(ir["description"] + "\n\n")
+
+    several = len(ir["documents"]) > 1
+    for number, document in enumerate(ir["documents"], 1):
+        if several:
+            write(_rst_heading(f"Document {number}", "-"))
+        if document["entries"]:
+            write_table(document["entries"])
+        for child in document["sections"]:
+            write_section(child, "~" if several else "-")
+
+    generator = ir["generator"]
+    if generator is not None:
+        write(
+            "----\n\nGenerated by `yamldoc <https://github.com/chris1221/yaml.doc>`_"
+            f" v{generator['version']}{_on(generator)}\n"
+        )
@@ -1,7 +1,22 @@
+import os
+import sys
 import textwrap
-from dataclasses import dataclass
+from collections import namedtuple
+from collections.abc import Sequence
+from functools import lru_cache
 
+# Number of distinct comments remembered by sanitize_meta and wrap_meta. The
+# caches live for the whole process, so the same comment copied across many
+# keys, or many documents in a batch, is only processed once.
+MEMO_SIZE = 4096
 
+TABLE_HEADER = "\n| Key | Value | Information |\n| :-: | :-: | :-- |\n"
+SCHEMA_TABLE_HEADER = (
+    "\n| Key | Value | Type | Information |\n| :-: | :-: | :-: | :-- |\n"
+)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
 def sanitize_meta(meta, char, exclude_char="#'!", override_exclude=False):
     """
     Sanitizes the meta information and indicates
@@ -30,12 +45,276 @@ def sanitize_meta(meta, char, exclude_char="#'!", override_exclude=False):
     return meta, exclude
 
 
+@lru_cache(maxsize=MEMO_SIZE)
+def wrap_meta(meta):
+    """
+    Wraps the meta information to 50 characters for a table cell.
+
+    Arguments:
+        meta: Sanitized meta information.
+
+    Returns:
+        The wrapped lines joined with html line breaks.
+    """
+    return "<br />".join(textwrap.wrap(meta, width=50))
+
+
+def _changed(entry):
+    """
+    Drops the cached markdown of an entry and of every MetaEntry it is inside
+    of, as their sections show it too.
+    """
+    while entry is not None:
+        if entry.isBase:
+            entry._markdown = None
+        entry = entry._parent
+
+
+def _tracked(name):
+    """
+    A property over the slot _name. Setting it drops the cached markdown of
+    the entry and its parents.
+    """
+    slot = "_" + name
+
+    def get(self):
+        return getattr(self, slot)
+
+    def set(self, value):
+        setattr(self, slot, value)
+        _changed(self)
+
+    return property(get, set)
+
+
+class EntryOptions:
+    """
+    The parsing options an entry was created with. One instance is shared by
+    every entry created with the same options, rather than each entry keeping
+    its own copies.
+    """
+
+    __slots__ = ("char", "exclude_char", "override_exclude")
+
+    def __init__(self, char, exclude_char, override_exclude):
+        self.char = char
+        self.exclude_char = exclude_char
+        self.override_exclude = override_exclude
+
+    def __repr__(self):
+        return (
+            f"EntryOptions(char={self.char!r}, exclude_char={self.exclude_char!r},"
+            f" override_exclude={self.override_exclude!r})"
+        )
+
+
+@lru_cache(maxsize=64)
+def entry_options(char="#'", exclude_char="#'!", override_exclude=False):
+    """Returns the shared EntryOptions for the given options."""
+    return EntryOptions(char, exclude_char, override_exclude)
+
+
+class ListValue(Sequence):
+    """
+    The items of a YAML list, held as a single string with one item per line
+    rather than as a Python list of strings, which for long lists takes
+    several times the memory.
+
+    Compares equal to a list of the same items and prints like one. Items are
+    read back by scanning the string, so indexing is linear in the index;
+    iterate, or use head, to read many.
+    """
+
+    __slots__ = ("_text", "_length")
+
+    def __init__(self, items=()):
+        """
+        Initialize the object.
+
+        Arguments:
+            items: The items, each a string without line breaks.
+        """
+        items = list(items)
+        self._text = "\n".join(items)
+        self._length = len(items)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        if not self._length:
+            return
+        text = self._text
+        start = 0
+        while True:
+            end = text.find("\n", start)
+            if end == -1:
+                yield text[start:]
+                return
+            yield text[start:end]
+            start = end + 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ListValue index out of range")
+        for i, item in enumerate(self):
+            if i == index:
+                return item
+
+    def head(self, n):
+        """Returns a list of the first n items."""
+        items = []
+        for item in self:
+            if len(items) == n:
+                break
+            items.append(item)
+        return items
+
+    def digest(self):
+        """Returns the SHA-256 of the items, one per line, as hexadecimal."""
+        # Imported here as only lists cut short need it, to keep start-up fast.
+        import hashlib
+
+        return hashlib.sha256(self._text.encode("utf-8")).hexdigest()
+
+    def __eq__(self, other):
+        if isinstance(other, ListValue):
+            return (self._length, self._text) == (other._length, other._text)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class ListPolicy(namedtuple("ListPolicy", ["limit", "spill_dir", "link_dir"])):
+    """
+    How lists are shown in a table cell.
+
+    A list longer than limit is cut to its first limit items and followed by
+    its length and a SHA-256 of its items, so the size of the output does not
+    depend on the length of the list. With a spill_dir, the whole list is
+    also written there, one item per line, to a file named after the hash and
+    linked from the cell.
+
+    Attributes:
+        limit: Most items shown. None shows every list in full, and 0 only
+               the length and hash of lists that are not empty.
+        spill_dir: (Optional) Directory to write lists that are cut to.
+        link_dir: (Optional) spill_dir as linked from the markdown, if not
+                  the same, e.g. relative to the output file.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, limit=None, spill_dir=None, link_dir=None):
+        if limit is not None and limit < 0:
+            raise ValueError("The list limit cannot be negative.")
+        return super().__new__(cls, limit, spill_dir, link_dir)
+
+    def for_output(self, output):
+        """
+        Returns the policy with spill files linked relative to the directory
+        of output, a path, unless a link_dir is already set.
+        """
+        if self.spill_dir is None or self.link_dir is not None or not isinstance(output, str):
+            return self
+        return self._replace(
+            link_dir=os.path.relpath(self.spill_dir, os.path.dirname(output) or ".")
+        )
+
+    def summarise(self, value):
+        """
+        Apply the policy to a list.
+
+        Arguments:
+            value: A list or ListValue.
+
+        Returns:
+            Tuple of (items, summary): the items to show, and None if that is
+            all of them, else a dictionary with the length, sha256 and the
+            spill file ("spill", None without a spill_dir) of the list.
+        """
+        if self.limit is None or len(value) <= self.limit:
+            return list(value), None
+
+        if not isinstance(value, ListValue):
+            value = ListValue(value)
+
+        digest = value.digest()
+        spill = None
+        if self.spill_dir is not None:
+            name = digest + ".txt"
+            path = os.path.join(self.spill_dir, name)
+            # Named by content, so an existing file already holds this list.
+            if not os.path.exists(path):
+                os.makedirs(self.spill_dir, exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(value._text + "\n")
+            spill = "/".join([(self.link_dir or self.spill_dir).replace(os.sep, "/"), name])
+
+        summary = {"length": len(value), "sha256": digest, "spill": spill}
+        return value.head(self.limit), summary
+
+
+def cut_list_text(items):
+    """Returns the items shown of a list cut short, as a list ending in "..."."""
+    return repr(items)[:-1] + ", ...]" if items else "[...]"
+
+
+def value_cell(value, summary=None):
+    """
+    Returns the markdown of a value's table cell.
+
+    Arguments:
+        value: The value, or the items shown of a list.
+        summary: The summary from ListPolicy.summarise, if the list was cut.
+    """
+    if summary is None:
+        return f"`{value}`"
+
+    cell = f"`{cut_list_text(value)}` ({summary['length']} items, sha256 `{summary['sha256'][:12]}`"
+    if summary["spill"] is not None:
+        cell += f", [full list]({summary['spill']})"
+    return cell + ")"
+
+
 class MetaEntry:
     """
     A container to hold a base level YAML entry plus any associated
     hierarchical keys and values.
     """
 
+    __slots__ = (
+        "_name",
+        "_meta",
+        "_exclude",
+        "_entries",
+        "has_schema",
+        "_type",
+        "options",
+        "plain_text",
+        "enum",
+        "_markdown",
+        "_items",
+        "_parent",
+    )
+
+    isBase = True
+
+    name = _tracked("name")
+    meta = _tracked("meta")
+    exclude = _tracked("exclude")
+    entries = _tracked("entries")
+    type = _tracked("type")
+
     def __init__(self, name, meta, char, exclude_char="#'!", override_exclude=False):
         """
         Initialize the object.
@@ -44,31 +323,81 @@ class MetaEntry:
             name: Name of the value.
             meta: Comments derived from YAML file.
         """
-        self.name = name
-        self.char = char
-        self.exclude_char = exclude_char
-        self.isBase = True
-        self.entries = []
+        self._name = sys.intern(name)
+        self.options = entry_options(char, exclude_char, override_exclude)
+        self._entries = []
         self.has_schema = False
+        self._type = None
+        self._markdown = None
+        self._items = None
+        self._parent = None
+
+        self._meta, self._exclude = sanitize_meta(
+            meta, char, exclude_char, override_exclude
+        )
+
+    @property
+    def char(self):
+        return self.options.char
 
-        self.meta, self.exclude = sanitize_meta(meta, char, exclude_char, override_exclude)
+    @property
+    def exclude_char(self):
+        return self.options.exclude_char
+
+    def add_item(self, item):
+        """
+        Adds an item of a YAML list. While the entry holds nothing else, items
+        are kept as plain strings until to_list_entry turns them into a
+        ListValue; next to keys they are kept as ListElements, in file order.
+        """
+        if self._entries:
+            self._entries.append(ListElement(item))
+            return
+        if self._items is None:
+            self._items = []
+        self._items.append(item)
+
+    def add_entry(self, entry):
+        """
+        Adds a child Entry or MetaEntry after any list items added so far,
+        which are kept as ListElements from then on.
+        """
+        if self._items:
+            self._entries.extend(ListElement(item) for item in self._items)
+            self._items = None
+        self._entries.append(entry)
+        entry._parent = self
 
     def is_list(self):
         """Returns True if all elements are list elements and False otherwise."""
         return all([isinstance(entry, ListElement) for entry in self.entries])
 
     def to_list_entry(self):
-        """Converts this meta instance to a base level list entry."""
-        if self.is_list():
+        """
+        Converts this meta instance to a base level list entry.
+
+        Raises:
+            ValueError: If it holds keys as well as list items.
+        """
+        if not self.is_list():
+            raise ValueError(f"{self.name!r} holds keys, so is not a list.")
+
+        # Entries built by hand hold ListElements, parsed ones add_item.
+        if self.entries:
             values = [entry.entry for entry in self.entries]
-            entry = Entry(self.name, values, self.meta, self.char, self.exclude_char)
-            
-            # Small detail here, the meta has already been parsed
-            # so we don't want to do it again.
-            if self.exclude:
-                entry.exclude = True
+        else:
+            values = ListValue(self._items or ())
+        entry = Entry(self.name, values, self.meta, self.char, self.exclude_char)
+
+        # Small detail here, the meta has already been parsed
+        # so we don't want to do it again.
+        if self.exclude:
+            entry.exclude = True
 
-            return entry
+        # Keep any type given to the list by a schema.
+        entry.type = self.type
+
+        return entry
 
     def __repr__(self):
         """
@@ -86,19 +415,16 @@ class MetaEntry:
 
     def table_header(self, schema=False):
         if schema:
-            header = textwrap.dedent("""
-            | Key | Value | Type | Information |
-            | :-: | :-: | :-: | :-- |
-            """)
-        else:
-            header = textwrap.dedent("""
-            | Key | Value | Information |
-            | :-: | :-: | :-- |
-            """)
-
-        return header
+            return SCHEMA_TABLE_HEADER
+        return TABLE_HEADER
     
     def check_for_lists(self):
+        """
+        Converts children that only hold list elements to list entries.
+
+        parse_yaml already does this as it reads the file, so it is only
+        needed for entries put together by hand.
+        """
         new_entries = []
         for entry in self.entries:
             if isinstance(entry, MetaEntry):
@@ -109,53 +435,201 @@ class MetaEntry:
         
         self.entries = new_entries
 
-    def to_markdown(self, schema=False):
+    def to_markdown(self, schema=False, cache=False, level=2, lists=None):
         """
         Prints the contents of the object in markdown.
 
+        Rendering does not modify the object, so it can be rendered any
+        number of times, from several threads at once.
+
+        Argumenets:
+            schema: Print with four columns instead of three.
+            cache: Keep the result and return it again from later calls, until
+                   the name, key, value, type, meta, exclusion or children of
+                   this entry or any entry inside it change. Children changed
+                   in place (e.g. entries.append) are not noticed; call
+                   invalidate afterwards.
+            level: Markdown heading level of the section.
+            lists: (Optional) ListPolicy for the lists in the section.
+        """
+        if not cache:
+            return "".join(self.iter_markdown(schema, level=level, lists=lists))
+
+        key = (schema, level, lists)
+        if self._markdown is not None and key in self._markdown:
+            return self._markdown[key]
+
+        # Entries put together by hand may not know their parent yet, and a
+        # change to one of them has to reach this cache.
+        self._adopt()
+        markdown = "".join(self.iter_markdown(schema, level=level, lists=lists))
+        if self._markdown is None:
+            self._markdown = {}
+        self._markdown[key] = markdown
+        return markdown
+
+    def _adopt(self):
+        """Sets this entry as the parent of its children, at every depth."""
+        stack = [self]
+        while stack:
+            parent = stack.pop()
+            for entry in parent.entries:
+                if not isinstance(entry, ListElement):
+                    entry._parent = parent
+                    if entry.isBase:
+                        stack.append(entry)
+
+    def invalidate(self):
+        """
+        Drops the cached markdown of this entry and its parents after
+        changing its entries in place.
+        """
+        _changed(self)
+
+    def iter_markdown(self, schema=False, prefix="", level=2, lists=None):
+        """
+        Generates the markdown for the object in chunks, so that large
+        sections can be written out without building one big string.
+
+        Nested mappings are written as their own sections after this one's
+        table, named by their dotted path.
+
         Argumenets:
             schema: Print with four columns instead of three.
+            prefix: Dotted path of the parent sections, if any.
+            level: Markdown heading level of the section.
+            lists: (Optional) ListPolicy for the lists in the section.
         """
 
         # If the object is excluded, we don't want to print anything.
         if self.exclude:
-            return ""
-        
-        # Check for any sublists that need to be converted
-        # from meta to entries
-        self.check_for_lists()
+            return
+
+        name = prefix + self.name
         
         # Regardles of whether or not there are entries to print, we still want to print the
         # meta information.
-        output = f"## `{self.name}`\n\n{self.meta.lstrip()}\n\n"
+        yield f"{'#' * level} `{name}`\n\n{self.meta.lstrip()}\n\n"
+
+        entries_to_print = []
+        sections = []
+        for entry in self.non_excluded_entries():
+            if isinstance(entry, MetaEntry):
+                # parse_yaml turns mappings holding only list items into list
+                # entries; ones put together by hand are shown the same way.
+                if entry.is_list():
+                    entries_to_print.append(entry.to_list_entry())
+                else:
+                    sections.append(entry)
+            else:
+                entries_to_print.append(entry)
 
-        # This is an early exit if there are no entries to print.
-        entries_to_print = self.non_excluded_entries()
         if len(entries_to_print) == 0:
-            output += "No member variables.\n\n"
+            yield "No member variables.\n\n"
+        else:
+            # So we have entries to print. Let's print them.
+            yield "#" * (level + 1) + " Member variables:\n\n"
+            yield self.table_header(schema)
 
-            return output
+            for entry in entries_to_print:
+                yield entry.to_markdown(schema, lists) + "\n"
 
-        # So we have entries to print. Let's print them.
-        output += "### Member variables:\n\n"
-        output += self.table_header(schema)
+        for section in sections:
+            yield "\n"
+            yield from section.iter_markdown(
+                schema, prefix=name + ".", level=level, lists=lists
+            )
 
-        for entry in entries_to_print:
-            output += entry.to_markdown(schema) + "\n"
 
-        return output
+class ListElement:
+    """
+    A single item of a YAML list.
 
+    An item in a mapping that also holds keys, e.g. each "- name: web" of a
+    list of mappings, is shown as a row of its own: "name: web" under the
+    key "- name" with the value "web", any other item under the key "-".
+    """
 
-@dataclass
-class ListElement:
-    entry: str
-    exclude: bool = False 
+    __slots__ = ("entry", "exclude")
+
+    # Items carry no comments or types of their own.
+    meta = ""
+    type = None
+
+    def __init__(self, entry, exclude=False):
+        self.entry = entry
+        self.exclude = exclude
+
+    def _split(self):
+        """Returns the (key, value) the item is shown as."""
+        item = str(self.entry)
+        key, colon, value = item.partition(":")
+        if colon and (not value or value[0] == " "):
+            return "- " + key.rstrip(), value.strip()
+        return "-", item
+
+    @property
+    def key(self):
+        return self._split()[0]
+
+    @property
+    def value(self):
+        return self._split()[1]
+
+    def to_markdown(self, schema=False, lists=None):
+        """
+        Prints the item as a markdown table row.
+
+        Arguments:
+            schema: Print with four columns instead of three.
+            lists: Unused, items are never lists themselves.
+        """
+        if self.exclude:
+            return ""
+
+        key, value = self._split()
+        if schema:
+            return f"| `{key}` | {value_cell(value)} | Unknown |  |"
+        return f"| `{key}` | {value_cell(value)} |  |"
+
+    def __repr__(self):
+        return f"ListElement(entry={self.entry!r}, exclude={self.exclude!r})"
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.entry, self.exclude) == (other.entry, other.exclude)
+
+    __hash__ = None
 
 
 class Entry:
     """
     Container for a single YAML key value pairing and associated metadata."""
 
+    # plain_text and enum are only set when a schema provides them, see
+    # parser.add_extra_metadata.
+    __slots__ = (
+        "_key",
+        "_value",
+        "_meta",
+        "_exclude",
+        "_type",
+        "has_schema",
+        "options",
+        "plain_text",
+        "enum",
+        "_parent",
+    )
+
+    isBase = False
+
+    key = _tracked("key")
+    value = _tracked("value")
+    meta = _tracked("meta")
+    exclude = _tracked("exclude")
+    type = _tracked("type")
+
     def __init__(
         self, key, value, meta, char="#'", exclude_char="#'!", override_exclude=False
     ):
@@ -170,17 +644,25 @@ class Entry:
             exclude_char: Character to denote exclusion.
             override_exclude: Override the exclusion character and force inclusion.
         """
-        self.key = key
-        self.value = value
-        self.char = char
-        self.exclude_char = exclude_char
-        self.isBase = False
-        self.type = None
+        self._key = sys.intern(key)
+        self._value = value
+        self.options = entry_options(char, exclude_char, override_exclude)
+        self._type = None
+        self.has_schema = False
+        self._parent = None
 
-        self.meta, self.exclude = sanitize_meta(
+        self._meta, self._exclude = sanitize_meta(
             meta, char, exclude_char, override_exclude
         )
 
+    @property
+    def char(self):
+        return self.options.char
+
+    @property
+    def exclude_char(self):
+        return self.options.exclude_char
+
     def __repr__(self):
         """
         Gives a print representation for the class.
@@ -193,25 +675,29 @@ class Entry:
         else:
             return f"YAML Entry [{self.key}: {self.value}]\n\t Meta: {self.meta}"
 
-    def to_markdown(self, schema=False):
+    def to_markdown(self, schema=False, lists=None):
         """
         Prints the entry as markdown.
 
         Arguments:
             schema: Print with four columns instead of three.
+            lists: (Optional) ListPolicy applied if the value is a list.
         """
 
         # If the entry is excluded, we don't want to print it.
         if self.exclude:
             return ""
         
+        m = wrap_meta(self.meta)
+        if lists is not None and isinstance(self.value, (list, ListValue)):
+            value = value_cell(*lists.summarise(self.value))
+        else:
+            value = value_cell(self.value)
         if schema:
-            m = "<br />".join(textwrap.wrap(self.meta, width=50))
             if self.type == None:
                 vartype = "Unknown"
             else:
                 vartype = self.type
-            return f"| `{self.key}` | `{self.value}` | {vartype} | {m} |"
+            return f"| `{self.key}` | {value} | {vartype} | {m} |"
         else:
-            m = "<br />".join(textwrap.wrap(self.meta, width=50))
-            return f"| `{self.key}` | `{self.value}` | {m} |"
+            return f"| `{self.key}` | {value} | {m} |"
@@ -0,0 +1,144 @@
+"""
+A plain representation of documented YAML, made of dictionaries, lists and
+strings, which the emitters in yamldoc.emitters turn into output formats.
+
+The representation of a page looks like::
+
+    {
+        "title": "Configuration Parameters Reference",
+        "description": "...",
+        "schema": True,
+        "generator": {"name": "yamldoc", "version": "0.1.6", "date": "2023-06-26"},
+        "documents": [
+            {
+                "table_header": True,
+                "entries": [{"key": "a", "value": "1", "type": "number", "meta": "..."}],
+                "sections": [
+                    {
+                        "name": "b",
+                        "path": "b",
+                        "meta": "...",
+                        "entries": [...],
+                        "sections": [...],
+                    },
+                ],
+            },
+        ],
+    }
+
+Excluded entries and sections are left out. A value is a string, or a list
+of strings for a YAML list. A list cut short by an entries.ListPolicy has
+only the items shown, and the entry gets a "list" key holding the summary
+from ListPolicy.summarise. "generator" is None without a footer, and its
+"date" is None when the output is deterministic.
+"""
+import yamldoc
+import yamldoc.entries
+
+
+def entry_ir(entry, lists=None):
+    """Returns the representation of a key value pair."""
+    ir = {
+        "key": entry.key,
+        "value": entry.value,
+        "type": entry.type,
+        "meta": entry.meta,
+    }
+
+    if isinstance(entry.value, (list, yamldoc.entries.ListValue)):
+        if lists is None:
+            ir["value"] = list(entry.value)
+        else:
+            ir["value"], summary = lists.summarise(entry.value)
+            if summary is not None:
+                ir["list"] = summary
+
+    return ir
+
+
+def section_ir(meta_entry, prefix="", lists=None):
+    """Returns the representation of a mapping and the mappings inside it."""
+    path = prefix + meta_entry.name
+    entries = []
+    sections = []
+    for entry in meta_entry.non_excluded_entries():
+        if isinstance(entry, yamldoc.entries.MetaEntry):
+            # As in MetaEntry.iter_markdown.
+            if entry.is_list():
+                entries.append(entry_ir(entry.to_list_entry(), lists))
+            else:
+                sections.append(section_ir(entry, path + ".", lists))
+        else:
+            entries.append(entry_ir(entry, lists))
+
+    return {
+        "name": meta_entry.name,
+        "path": path,
+        "meta": meta_entry.meta.lstrip(),
+        "entries": entries,
+        "sections": sections,
+    }
+
+
+def document_ir(yaml, lists=None):
+    """Returns the representation of one YAML document."""
+    return {
+        # As in render.iter_markdown, the table of top level key value pairs
+        # only has a header when the document starts with one.
+        "table_header": bool(yaml) and not yaml[0].isBase,
+        "entries": [
+            entry_ir(value, lists)
+            for value in yaml
+            if not value.isBase and not value.exclude
+        ],
+        "sections": [
+            section_ir(value, lists=lists)
+            for value in yaml
+            if value.isBase and not value.exclude
+        ],
+    }
+
+
+def page_ir(
+    documents,
+    schema=False,
+    title="Configuration Parameters Reference",
+    description="Any information about this page goes here.",
+    footer=True,
+    lists=None,
+    deterministic=False,
+):
+    """
+    Build the representation of a page from parsed YAML documents.
+
+    Arguments:
+        documents: List of documents from parse_documents, each a list of
+                   yaml representations.
+        schema: Whether a schema was merged in, i.e. whether to show types.
+        title: Title of the page.
+        description: Description given below the title.
+        footer: Whether to include the generator and date.
+        lists: (Optional) entries.ListPolicy bounding how much of each list
+               is kept.
+        deterministic: Leave out the date.
+
+    Returns:
+        Dictionary as described in the module documentation.
+    """
+    generator = None
+    if footer:
+        from datetime import date
+
+        generator = {
+            "name": "yamldoc",
+            "version": yamldoc.__version__,
+            "date": None if deterministic else date.today().isoformat(),
+        }
+
+    return {
+        "title": title,
+        "description": description,
+        "schema": schema,
+        "generator": generator,
+        "documents": [document_ir(yaml, lists) for yaml in documents],
+    }
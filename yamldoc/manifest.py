@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import yamldoc
+from yamldoc.cache import file_digest
+
+MANIFEST_NAME = ".yamldoc-manifest.json"
+
+# The options that change the generated markdown. Anything else (e.g. debug)
+# does not invalidate an output.
+FINGERPRINT_OPTIONS = (
+    "char",
+    "exclude_char",
+    "override_exclude",
+    "title",
+    "description",
+    "footer",
+    "lists",
+    "deterministic",
+)
+
+
+def fingerprint(yaml_path, schema_path=None, **options):
+    """
+    Fingerprint everything that goes into the documentation of one YAML file.
+
+    Arguments:
+        yaml_path: Path to YAML file.
+        schema_path: Path to schema file, or None.
+        **options: Render options as given to main.
+
+    Returns:
+        Hex digest of the YAML and schema contents, the options and the
+        yamldoc version.
+    """
+    record = {
+        "yaml": file_digest(yaml_path),
+        "schema": None if schema_path is None else file_digest(schema_path),
+        "options": {key: options.get(key) for key in FINGERPRINT_OPTIONS},
+        "version": yamldoc.__version__,
+    }
+    return hashlib.sha256(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+
+class Manifest:
+    """
+    Record of the fingerprint each output in a directory was built from,
+    used to skip inputs that have not changed since the last run.
+    """
+
+    def __init__(self, output_dir):
+        """
+        Initialize the object, reading any existing manifest.
+
+        Arguments:
+            output_dir: Directory the documentation is written to.
+        """
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.entries = {}
+
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+
+        if isinstance(entries, dict):
+            self.entries = entries
+
+    def _name(self, output_path):
+        return os.path.relpath(output_path, self.output_dir).replace(os.sep, "/")
+
+    def is_current(self, output_path, fingerprint):
+        """Returns True if output_path exists and was built from fingerprint."""
+        return (
+            self.entries.get(self._name(output_path)) == fingerprint
+            and os.path.exists(output_path)
+        )
+
+    def record(self, output_path, fingerprint):
+        """Records that output_path was built from fingerprint."""
+        self.entries[self._name(output_path)] = fingerprint
+
+    def save(self):
+        """Writes the manifest atomically next to the outputs."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.output_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.remove(tmp)
+            raise
@@ -1,181 +1,407 @@
 import yamldoc.entries
-from datetime import date
+import io
+import os
+import sys
+from contextlib import closing, contextmanager
+from yamldoc.profile import count_memo, memo_snapshot, tally, timed
+from yamldoc.render import render, render_documents
 
 
-def parse_yaml(file_path, char="#'", debug=False, exclude_char="#'!", override_exclude=False):
+@contextmanager
+def _open_text(path_or_file):
+    """
+    Open a path for reading, or pass an already open file object through.
+
+    File objects supplied by the caller are left open.
+    """
+    if hasattr(path_or_file, "read"):
+        yield path_or_file
+    else:
+        with open(path_or_file) as f:
+            yield f
+
+
+def parse_yaml(
+    file_path,
+    char="#'",
+    debug=False,
+    exclude_char="#'!",
+    override_exclude=False,
+    profile=None,
+    use_mmap=False,
+):
     """
     Parse a YAML file and return a list of YAML classes.
 
     Arguments:
-        file_path: Path to the YAML file.
+        file_path: Path to the YAML file, or an open text file object.
         char: A character string used to identify yamldoc blocks.
         debug: Print debug information
         exclude_char: A character string used to identify blocks to exclude.
+        profile: (Optional) yamldoc.profile.Profile to count the lines read in.
+        use_mmap: Read the file through a memory map, see iter_yaml.
 
 
     Return:
         List of YAML blocks.
     """
+    return list(
+        iter_yaml(file_path, char, debug, exclude_char, override_exclude, profile, use_mmap)
+    )
+
+
+def parse_documents(
+    file_path,
+    char="#'",
+    debug=False,
+    exclude_char="#'!",
+    override_exclude=False,
+    profile=None,
+    use_mmap=False,
+):
+    """
+    Parse a YAML file holding one or more documents separated by "---".
+
+    The file is read in a single pass, as by parse_yaml. Documents without
+    any keys, e.g. before a leading "---", are left out.
+
+    Arguments:
+        The same as for parse_yaml.
+
+    Returns:
+        List of documents, each a list of YAML blocks.
+    """
+    items = iter_yaml(
+        file_path, char, debug, exclude_char, override_exclude, profile, use_mmap, True
+    )
+    return [document for document in split_documents(items) if document]
+
+
+def split_documents(items):
+    """
+    Group the output of iter_yaml(documents=True) into documents.
+
+    Arguments:
+        items: Blocks and DOCUMENT_BREAK markers.
+
+    Returns:
+        List of documents, each a list of YAML blocks. There is one more
+        document than there are breaks, so some may be empty.
+    """
+    documents = [[]]
+    for item in items:
+        if item is DOCUMENT_BREAK:
+            documents.append([])
+        else:
+            documents[-1].append(item)
+    return documents
+
+
+# Kinds of line returned by classify_line.
+BLANK = 0
+COMMENT = 1  # A yamldoc comment, starting with char or exclude_char.
+PLAIN_COMMENT = 2  # Any other comment, which is ignored.
+KEY = 3  # A key with no value, opening a mapping or a list.
+KEY_VALUE = 4
+LIST_ITEM = 5
+DOCUMENT = 6  # A document marker, "---" or "...".
+OTHER = 7  # Anything else, e.g. a bare scalar.
+
+# Yielded by iter_yaml(documents=True) where one document ends and the next begins.
+DOCUMENT_BREAK = object()
+
+
+def classify_line(line, char="#'", exclude_char="#'!"):
+    """
+    Classify a single YAML line, looking at it only once.
+
+    Arguments:
+        line: A character string to be processed.
+        char: A character string used to identify yamldoc blocks.
+        exclude_char: A character string used to identify blocks to exclude.
+
+    Returns:
+        Tuple of (indent, kind, first, second). For KEY and KEY_VALUE these are
+        the key and value, for LIST_ITEM the item and None, for COMMENT the
+        stripped comment and None.
+    """
+    body = line.lstrip(" ")
+    indent = len(line) - len(body)
+    body = body.rstrip()
+
+    if not body:
+        return indent, BLANK, None, None
+
+    first = body[0]
+    if first == "#":
+        if body.startswith((char, exclude_char)):
+            return indent, COMMENT, body, None
+        return indent, PLAIN_COMMENT, None, None
+
+    if first == "-":
+        if body == "---" or body.startswith("--- "):
+            return indent, DOCUMENT, body, None
+        return indent, LIST_ITEM, body.lstrip("-").lstrip(), None
+
+    if body == "...":
+        return indent, DOCUMENT, body, None
+
+    colon = body.find(":")
+    if colon == -1:
+        return indent, OTHER, body, None
+
+    value = body[colon + 1:].lstrip()
+    if value:
+        return indent, KEY_VALUE, body[:colon], value
+    return indent, KEY, body[:colon], None
+
+
+def _iter_text_lines(file_path, char="#'", exclude_char="#'!"):
+    """Read a text file line by line, yielding (line, *classify_line(line))."""
+    with _open_text(file_path) as f:
+        for line in f:
+            yield (line, *classify_line(line, char, exclude_char))
+
+
+def _as_text(line):
+    """Returns a line as text, whichever reader it came from."""
+    if isinstance(line, bytes):
+        return line.decode("utf-8", "replace")
+    return line
+
+
+def _continues(value):
+    """
+    Returns True if a value carries on over the following, more indented
+    lines: a block scalar (| or >), an unclosed flow list or mapping, or a
+    node given only an anchor or tag (e.g. "&defaults" or "!!map"), whose
+    content is on the lines below.
+    """
+    value = value.split(" #", 1)[0].rstrip()
+    # Anchors and tags come before the node they label.
+    while value[:1] in ("&", "!"):
+        value = value.partition(" ")[2].lstrip()
+    if not value:
+        return True
+    if value[:1] in ("|", ">"):
+        return not value[1:].strip("-+0123456789")
+    if value[:1] in ("[", "{"):
+        return value.count("[") + value.count("{") > value.count("]") + value.count("}")
+    return False
+
+
+def _pop(stack):
+    """
+    Closes the innermost open mapping. If it only holds list elements, it is
+    replaced in its parent by a list entry.
+    """
+    _, entry = stack.pop()
+    if stack and entry.is_list():
+        # A mapping is always the last child of its parent when it closes.
+        stack[-1][1].entries[-1] = entry.to_list_entry()
+
+
+def _close_block(block, mapping=False):
+    """
+    Returns what a finished top level block is yielded as. A block known to
+    be a mapping (e.g. one whose children were skipped) is never turned into
+    a list entry.
+    """
+    if not mapping and block.is_list():
+        return block.to_list_entry()
+    return block
+
+
+def iter_yaml(
+    file_path,
+    char="#'",
+    debug=False,
+    exclude_char="#'!",
+    override_exclude=False,
+    profile=None,
+    use_mmap=False,
+    documents=False,
+):
+    """
+    Lazily parse a YAML file, yielding each top level block as soon as it is complete.
+
+    The file is read one line at a time, so only the block currently being
+    parsed is held in memory.
+
+    Arguments:
+        file_path: Path to the YAML file, or an open text file object.
+        char: A character string used to identify yamldoc blocks.
+        debug: Print debug information
+        exclude_char: A character string used to identify blocks to exclude.
+        override_exclude: Override the exclusion character and force inclusion.
+        profile: (Optional) yamldoc.profile.Profile to count the lines read in.
+        use_mmap: Map the file into memory and scan its raw bytes, decoding
+                  only keys, values and comments (see scanner.iter_mmap_lines).
+                  Worthwhile for very large files. Ignored for file objects.
+        documents: Yield DOCUMENT_BREAK at every "---" or "..." line, see
+                   parse_documents. Otherwise the markers are ignored and the
+                   documents run together.
+
+    Yields:
+        Top level Entry or MetaEntry objects, in file order.
+    """
 
     # The parser works as follows:
-    #   YAML files have key value pairings seperated by
-    #   newlines. The most straightforward kind of things to parse will be
-    #   keyvalue pairs preceeded by comments with the Doxygen marker #'
-    #   (or whatever the user specifies). The parser will look for these
-    #   comments and then parse the key value pairs that follow. The
-    #   parser will then look for the next comment and repeat the
-    #   process. The parser will also look for a comment that starts with
-    #   the exclude_char and ignore the following block.
-
-    current_entry = None
+    #   Each line is classified once by classify_line. yamldoc comments
+    #   (starting with #' or whatever the user specifies) are collected
+    #   until the next key, which they document. Keys without a value
+    #   open a MetaEntry, and a stack of the open MetaEntry objects and
+    #   their indentation tells us where each following line belongs:
+    #   anything indented less than or as much as an open key closes it.
+    #   When the stack empties, the top level block is done and is
+    #   yielded. A block made only of list items becomes a list entry.
+    #   The lines of an excluded top level block are skipped without
+    #   building anything: it is yielded with no children, as nothing of
+    #   it is shown, unless override_exclude is set. The lines of a block
+    #   scalar or a flow collection that goes on past its key's line, or of
+    #   a node given only an anchor or tag (e.g. "defaults: &defaults"), are
+    #   skipped too, and so is any other indented line that is not a key,
+    #   list item or comment (e.g. a wrapped plain scalar): only the first
+    #   line of such values is documented.
+
+    Entry = yamldoc.entries.Entry
+    MetaEntry = yamldoc.entries.MetaEntry
+
     meta = ""
-    things = []
+    stack = []  # (indent, MetaEntry) for every open mapping
+    block = None  # The top level MetaEntry, at the bottom of the stack
+    nlines = 0
+    skip = None  # Indentation of the excluded block being skipped, if any
+    skipped_keys = False  # Whether the skipped block held keys, i.e. was a mapping
+    skipped = 0
+    scalar = None  # Indentation of a key whose value continues on later lines
+
+    if use_mmap and not hasattr(file_path, "read"):
+        from yamldoc.scanner import iter_mmap_lines
+
+        lines = iter_mmap_lines(file_path, char, exclude_char)
+    else:
+        lines = _iter_text_lines(file_path, char, exclude_char)
+
+    with closing(lines):
+        for nlines, (line, indent, kind, first, second) in enumerate(lines, 1):
+            if kind == BLANK:
+                continue
+
+            if scalar is not None:
+                if indent > scalar:
+                    continue
+                scalar = None
+
+            if skip is not None:
+                # Only comments and lines inside the excluded block are
+                # skipped. Comments are kept for whatever follows them.
+                if kind == COMMENT:
+                    meta = meta + first
+                    continue
+                if kind == PLAIN_COMMENT or (kind == DOCUMENT and not documents):
+                    continue
+                if kind != DOCUMENT and (
+                    indent > skip or (kind == LIST_ITEM and indent == skip)
+                ):
+                    skipped += 1
+                    if kind == KEY or kind == KEY_VALUE:
+                        skipped_keys = True
+                    meta = ""
+                    continue
+                skip = None
 
-    with open(file_path) as yaml:
-        for line in [l for l in yaml.readlines() if l.rstrip()]:
             if debug:
-                print(line.rstrip())
-
-            if current_entry is not None:
-                if current_entry.isBase:
-                    # If we're back at 0 indentation, the
-                    # block is done and we need to quit.
-                    if len(line) - len(line.lstrip(" ")) == 0:
-                        # Is current_entry a list or a meta-entry?
-                        if current_entry.is_list():
-                            if debug:
-                                print("@\tAdding list entry to things.")
-                            things.append(current_entry.to_list_entry())
-                        else:
-                            if debug:
-                                print("@\tAdding meta entry to things.")
-                            things.append(current_entry)
-                        current_entry = None
-
-                    # If not, continue parsing the sub entries.
-                    #
-                    if current_entry is not None:
-                        if line.lstrip(" ").startswith(char) or line.lstrip(
-                            " "
-                        ).startswith(exclude_char):
-                            meta = meta + line.lstrip().rstrip()
-                        else:
-                            try:
-                                key, value = line.lstrip().rstrip().split(":", 1)
-
-                                if not value.lstrip():
-                                    new_entry = yamldoc.entries.MetaEntry(
-                                        key, meta, char, exclude_char, override_exclude
-                                    )
-                                else:
-                                    new_entry = yamldoc.entries.Entry(
-                                        key,
-                                        value.lstrip(" "),
-                                        meta.lstrip(),
-                                        char,
-                                        exclude_char,
-                                        override_exclude
-                                    )
-
-                                current_entry.entries.append(new_entry)
-
-                                if debug:
-                                    print("@\tFound an entry and deposited it in meta.")
-                                meta = ""
-                            except ValueError:
-                                # If there's only one value, it's a list.
-                                # in this case, we add ths value to the
-                                # current entry and continue.
-                                if debug:
-                                    print("@\tFound a list entry.")
-
-                                # Have to figure out if this is an element of 
-                                # a nested list or a new list.
-
-                                if len(current_entry.entries) != 0:
-                                    if isinstance(current_entry.entries[-1], yamldoc.entries.MetaEntry):
-                                        current_entry.entries[-1].entries.append(
-                                            yamldoc.entries.ListElement(
-                                                line.lstrip().lstrip("-").lstrip().rstrip()
-                                            )
-                                        )
-                                    else: 
-                                        current_entry.entries.append(
-                                            yamldoc.entries.ListElement(
-                                                line.lstrip().lstrip("-").lstrip().rstrip()
-                                            )
-                                        )
-                                else:
-                                    current_entry.entries.append(
-                                        yamldoc.entries.ListElement(
-                                            line.lstrip().lstrip("-").lstrip().rstrip()
-                                        )
-                                    )
-
-            # Either we haven't started yet
-            # or we've just flushed the entry.
-            if current_entry is None:
-                # Find the number of leading spaces.
-                # YAML only uses spaces.
-                nspaces = len(line) - len(line.lstrip(" "))
+                print(_as_text(line).rstrip())
+
+            if kind == COMMENT:
+                meta = meta + first
+                continue
+
+            if kind == PLAIN_COMMENT:
+                continue
+
+            if kind == DOCUMENT:
+                if documents:
+                    while stack:
+                        _pop(stack)
+                    if block is not None:
+                        yield _close_block(block, skipped_keys)
+                        block = None
+                        skipped_keys = False
+                    yield DOCUMENT_BREAK
+                continue
+
+            # Close every mapping this line is not inside of. A list item
+            # may sit at the same indentation as its key.
+            if kind == LIST_ITEM:
+                while stack and indent < stack[-1][0]:
+                    _pop(stack)
+            else:
+                while stack and indent <= stack[-1][0]:
+                    _pop(stack)
+
+            if not stack and block is not None:
                 if debug:
-                    print("@\tFound " + str(nspaces) + " indent level.")
+                    print("@\tAdding block to things.")
+                yield _close_block(block, skipped_keys)
+                block = None
+                skipped_keys = False
+            parent = stack[-1][1] if stack else None
+
+            if kind == OTHER and parent is None and indent == 0:
+                raise ValueError(
+                    f"Line {nlines} is not a key, list item or comment:"
+                    f" {_as_text(line).rstrip()!r}"
+                )
+
+            if kind == KEY:
+                new_entry = MetaEntry(first, meta, char, exclude_char, override_exclude)
+                if parent is None:
+                    block = new_entry
+                    if new_entry.exclude:
+                        skip = indent
+                else:
+                    parent.add_entry(new_entry)
+                stack.append((indent, new_entry))
 
-                if nspaces == 0:
-                    current_entry = None
-                    if line.startswith(char):
-                        meta = meta + line.rstrip()
-                    else:
-                        key, value = line.rstrip().split(":", 1)
-
-                        # If there is no value, this is the beginning of a
-                        # base entry (i.e. there are subentries to follow)
-                        #
-                        # This could also be a simple list entry but I can't
-                        # know that until I see the next line.
-                        if not value.lstrip():
-                            current_entry = yamldoc.entries.MetaEntry(
-                                key, meta, char, exclude_char, override_exclude
-                            )
-
-                            # Metadata must be flushed after being added as a parent
-                            # element
-                            meta = ""
-
-                            if debug:
-                                print("@\tFound a meta entry.")
-                            continue
-
-                        # Otherwise continue on.
-                        else:
-                            things.append(
-                                yamldoc.entries.Entry(
-                                    key,
-                                    value.lstrip(" "),
-                                    meta.lstrip(),
-                                    char,
-                                    exclude_char,
-                                    override_exclude
-                                )
-                            )
-                            if debug:
-                                print("@\tFound an entry.")
-                            meta = ""
+                if debug:
+                    print("@\tFound a meta entry.")
+
+            elif kind == KEY_VALUE:
+                new_entry = Entry(
+                    first, second, meta.lstrip(), char, exclude_char, override_exclude
+                )
+                if _continues(second):
+                    scalar = indent
+                if parent is None:
+                    yield new_entry
+                else:
+                    parent.add_entry(new_entry)
+
+                if debug:
+                    print("@\tFound an entry.")
+
+            elif kind == LIST_ITEM and parent is not None:
+                parent.add_item(first)
+
+                if debug:
+                    print("@\tFound a list entry.")
+
+            # Metadata is flushed once something has used it.
+            meta = ""
 
         # The file might run out
-        # before the final meta
-        # entry is added.
-        try:
-            if current_entry is not None:
-                if current_entry.isBase:
-                    if current_entry.is_list():
-                        things.append(current_entry.to_list_entry())
-                    else:
-                        things.append(current_entry)
-        except AttributeError:
-            pass
+        # before the final block
+        # is added.
+        while stack:
+            _pop(stack)
+        if block is not None:
+            yield _close_block(block, skipped_keys)
 
-    return things
+    if profile is not None:
+        profile.count("lines", nlines)
+        profile.count("lines_skipped", skipped)
 
 
 def key_value(line):
@@ -215,7 +441,7 @@ def parse_schema(path_to_file, debug=False):
     values and their associated types.
 
     Arguments:
-        path_to_file: Path to schema file.
+        path_to_file: Path to schema file, or an open text file object.
 
     Returns: Tuple of (schema, specials) where specials are unique YAMLDOC strings for
     the title and description of the desired markdown.
@@ -233,8 +459,8 @@ def parse_schema(path_to_file, debug=False):
 
     special_type_case = False
 
-    with open(path_to_file) as schema:
-        for line in [line for line in schema.readlines() if line.rstrip()]:
+    with _open_text(path_to_file) as schema:
+        for line in (line for line in schema if line.rstrip()):
             indent = [indent[1], count_indent(line)]
 
             # The base level has to start with a special name
@@ -358,7 +584,56 @@ def parse_schema(path_to_file, debug=False):
         return current, specials, extras
 
 
-def add_type_metadata(schema, yaml, debug=False):
+# Section of the top level keys in index_entries. parse_schema calls it
+# "base", but a YAML file may hold a mapping named base of its own.
+TOP_LEVEL = None
+
+
+def schema_section(name):
+    """Returns the index_entries section of a section named by parse_schema."""
+    return TOP_LEVEL if name == "base" else name
+
+
+def index_entries(yaml):
+    """
+    Index a parsed YAML document by schema section and key.
+
+    Top level key value pairs are filed under the TOP_LEVEL section and the
+    children of every meta entry, at any depth, under the meta entry's name,
+    which is how parse_schema names its sections (see schema_section).
+
+    Arguments:
+        yaml: List of yaml representations from parse_yaml.
+
+    Returns:
+        Dictionary mapping (section, key) to a list of (parent, entry) pairs,
+        where parent is None for top level entries.
+    """
+    index = {}
+
+    stack = []
+    for value in yaml:
+        if value.isBase:
+            stack.append(value)
+        else:
+            index.setdefault((TOP_LEVEL, value.key), []).append((None, value))
+
+    while stack:
+        parent = stack.pop()
+        for entry in parent.entries:
+            if isinstance(entry, yamldoc.entries.ListElement):
+                continue
+            if entry.isBase:
+                stack.append(entry)
+                key = entry.name
+            else:
+                key = entry.key
+            index.setdefault((parent.name, key), []).append((parent, entry))
+
+    return index
+
+
+def add_type_metadata(schema, yaml, debug=False, index=None):
     """
     Modified a list of yaml entries in place to add type information
     from a parsed schema.
@@ -367,39 +642,37 @@ def add_type_metadata(schema, yaml, debug=False):
         schema: List of schema representations from parse_schema.
         yaml: List of yaml representations from parse_yaml.
         debug: Print debug information
+        index: (Optional) Result of index_entries(yaml), if already built.
 
     Returns:
-        Nothing.
+        Number of schema properties that matched at least one entry.
     """
-    # Loop over each value of the schema
+    if index is None:
+        index = index_entries(yaml)
+
+    matched = 0
+
+    # Loop over each value of the schema and look
+    # up the corresponding entries in the YAML.
     for name, variables in schema.items():
-        # Find the corresponding entry in the YAML.
-
-        # Special case: if the name is base in the schema
-        # these are top level variables
-        # which need to be dealt with seperately.
-        if name == "base":
-            # Look for top level entries
-            for var, var_type in variables.items():
-                for value in yaml:
-                    if not value.isBase:
-                        if var == value.key:
-                            value.type = var_type
-        else:
-            for value in yaml:
-                if value.isBase:
-                    if name == value.name:
-                        for var, var_type in variables.items():
-                            for entry in value.entries:
-                                if var == entry.key:
-                                    if debug:
-                                        print(f"Setting type of {var}")
-                                    entry.type = var_type
-                                    # If we find at least one
-                                    # then we can say that
-                                    # there's a schema.
-                                    value.has_schema = True
-                                    entry.has_schema = True
+        for var, var_type in variables.items():
+            entries = index.get((schema_section(name), var), ())
+            if entries:
+                matched += 1
+
+            for parent, entry in entries:
+                if parent is not None and debug:
+                    print(f"Setting type of {var}")
+                entry.type = var_type
+
+                # If we find at least one
+                # then we can say that
+                # there's a schema.
+                if parent is not None:
+                    parent.has_schema = True
+                    entry.has_schema = True
+
+    return matched
 
 
 def strip_footer(md: str) -> str:
@@ -436,7 +709,7 @@ def strip_footer(md: str) -> str:
     return stripped_string
 
 
-def add_extra_metadata(extras, yaml, debug=False):
+def add_extra_metadata(extras, yaml, debug=False, index=None):
     """
     Modified a list of yaml entries in place to add extra type information
     from a parsed schema.
@@ -445,36 +718,23 @@ def add_extra_metadata(extras, yaml, debug=False):
         schema: List of schema representations from parse_schema.
         yaml: List of yaml representations from parse_yaml.
         debug: Print debug information
+        index: (Optional) Result of index_entries(yaml), if already built.
 
     Returns:
         Nothing.
     """
-    # Loop over each value of the schema
+    if index is None:
+        index = index_entries(yaml)
+
+    # Loop over each value of the schema and look
+    # up the corresponding entries in the YAML.
     for name, variables in extras.items():
-        # Find the corresponding entry in the YAML.
-
-        # Special case: if the name is base in the schema
-        # these are top level variables
-        # which need to be dealt with seperately.
-        if name == "base":
-            # Look for top level entries
-            for var, meta in variables.items():
-                for value in yaml:
-                    if not value.isBase:
-                        if var == value.key:
-                            for key, v in meta.items():
-                                value.key = value
-        else:
-            for value in yaml:
-                if value.isBase:
-                    if name == value.name:
-                        for var, meta in variables.items():
-                            for entry in value.entries:
-                                if var == entry.key:
-                                    if debug:
-                                        print(f"Setting type of {var}")
-                                    for key, v in meta.items():
-                                        setattr(entry, key, v)
+        for var, meta in variables.items():
+            for parent, entry in index.get((schema_section(name), var), ()):
+                if parent is not None and debug:
+                    print(f"Setting type of {var}")
+                for key, v in meta.items():
+                    setattr(entry, key, v)
 
 
 def main(
@@ -487,6 +747,16 @@ def main(
     title="Configuration Parameters Reference",
     description="Any information about this page goes here.",
     footer=True,
+    output=None,
+    cache_dir=None,
+    profile=None,
+    use_mmap=False,
+    split_documents=False,
+    formats=None,
+    schema_report=None,
+    lists=None,
+    deterministic=False,
+    render_cache=None,
 ):
     """
     Takes a given YAML file and optionally an associated schema, parsing each for their
@@ -501,75 +771,376 @@ def main(
         title: Title of markdown generated.
         description: Description given below the title in markdown.
         footer: Whether to include the footer (generated by yamldoc + date).
+        output: Path or open text stream to write the markdown to. Defaults to stdout.
+        cache_dir: Directory to cache parsed schemas in. Defaults to the
+                   YAMLDOC_CACHE_DIR environment variable, if set.
+        profile: (Optional) yamldoc.profile.Profile to record the time spent in
+                 each phase and counts of what was parsed.
+        use_mmap: Read the YAML file through a memory map, see iter_yaml.
+        split_documents: Write each document of a file holding several to its
+                         own file, named after output (see document_files).
+                         output must then be a path.
+        formats: (Optional) Names of output formats from yamldoc.emitters, e.g.
+                 ["markdown", "html"]. All are written from one parse, each
+                 to output with its extension replaced (see
+                 emitters.format_outputs). Defaults to markdown alone.
+        schema_report: (Optional) Dictionary to store the schema.SchemaReport
+                       of the file in, under yaml_path: which properties of
+                       the schema were matched or missing, and which keys it
+                       does not describe. Only filled in with a schema.
+        lists: (Optional) entries.ListPolicy bounding how much of each list
+               is shown. A list longer than lists.limit is cut short and
+               followed by its length and hash. With lists.spill_dir, the
+               whole list is written to a file there, linked relative to
+               output.
+        deterministic: Leave the date out of the footer, so that the same
+                       input always gives the same output.
+        render_cache: (Optional) Directory to cache rendered pages in, see
+                      cache.render_cached. A page whose YAML, schema,
+                      options and yamldoc version were all seen before is
+                      written without parsing anything. Not used with
+                      split_documents, formats or lists.spill_dir.
 
     Returns:
-        Nothing, prints to stdout.
+        Nothing, writes to stdout or the given output.
     """
-    # If a schema has been specified, add the
-    # type information to the rest of the
-    # variables.
+    if split_documents and (output is None or hasattr(output, "write")):
+        raise ValueError("split_documents needs an output path to name the files after.")
+
+    if formats:
+        if split_documents:
+            raise ValueError("split_documents cannot be used with formats.")
+        from yamldoc.emitters import format_outputs
+
+        outputs = format_outputs(formats, output)
+
+    if (
+        render_cache is not None
+        and not formats
+        and not split_documents
+        and (lists is None or lists.spill_dir is None)
+    ):
+        from yamldoc.cache import render_cached
+
+        options = dict(
+            char=char,
+            exclude_char=exclude_char,
+            override_exclude=override_exclude,
+            title=title,
+            description=description,
+            footer=footer,
+            lists=lists,
+            deterministic=deterministic,
+        )
+
+        def page():
+            out = io.StringIO()
+            report = {}
+            main(
+                yaml_path, debug=debug, schema_path=schema_path, output=out,
+                cache_dir=cache_dir, profile=profile, use_mmap=use_mmap,
+                schema_report=report, **options
+            )
+            return out.getvalue(), report.get(yaml_path)
+
+        markdown, report = render_cached(
+            render_cache, yaml_path, schema_path, options, page, profile
+        )
+        if schema_report is not None and report is not None:
+            schema_report[yaml_path] = report
+
+        if output is None:
+            sys.stdout.write(markdown)
+        elif hasattr(output, "write"):
+            output.write(markdown)
+        else:
+            with open(output, "w") as out:
+                out.write(markdown)
+        return
+
+    if lists is not None:
+        lists = lists.for_output(output)
+
+    parsed_schema = None
     if schema_path is not None:
-        schema, specials, extras = parse_schema(schema_path, debug)
-        yaml = parse_yaml(yaml_path, char, debug, exclude_char, override_exclude)
+        from yamldoc.cache import load_schema
+
+        with timed(profile, "parse_schema"):
+            parsed_schema = load_schema(schema_path, debug, cache_dir)
+
+    options = dict(
+        char=char,
+        debug=debug,
+        exclude_char=exclude_char,
+        override_exclude=override_exclude,
+        title=title,
+        description=description,
+        footer=footer,
+        profile=profile,
+        use_mmap=use_mmap,
+        schema_report=schema_report,
+        lists=lists,
+        deterministic=deterministic,
+    )
+
+    if formats:
+        document_formats(yaml_path, outputs, parsed_schema, **options)
+    elif split_documents:
+        document_files(yaml_path, output, parsed_schema, **options)
+    elif output is None:
+        document(yaml_path, sys.stdout, parsed_schema, **options)
+    elif hasattr(output, "write"):
+        document(yaml_path, output, parsed_schema, **options)
+    else:
+        with open(output, "w") as out:
+            document(yaml_path, out, parsed_schema, **options)
 
-        # Edit the yaml in place with type information.
-        add_type_metadata(schema, yaml, debug)
 
-        if "_yamldoc_title" in specials:
-            title = specials["_yamldoc_title"]
+def document(
+    yaml_path,
+    out,
+    parsed_schema=None,
+    char="#'",
+    debug=False,
+    exclude_char="#'!",
+    override_exclude=False,
+    title="Configuration Parameters Reference",
+    description="Any information about this page goes here.",
+    footer=True,
+    profile=None,
+    use_mmap=False,
+    schema_report=None,
+    lists=None,
+    deterministic=False,
+):
+    """
+    Parse a YAML file, merge in an already parsed schema and write the markdown
+    to a text stream.
 
-        if "_yamldoc_description" in specials:
-            description = specials["_yamldoc_description"]
+    This is the body of main, split out so that a schema parsed once can be
+    reused for many YAML files.
 
-        # And do the printing
-        print("# " + title + "\n\n" + description + "\n")
+    Arguments:
+        yaml_path: Path to YAML file.
+        out: Text stream to write the markdown to.
+        parsed_schema: The (schema, specials, extras) tuple from parse_schema, a
+                       schema.CompiledSchema, or None.
+        char: Special character to identify comments to be included in YAMLDOC
+              documentation.
+        debug: Print debug information
+        title: Title of markdown generated.
+        description: Description given below the title in markdown.
+        footer: Whether to include the footer (generated by yamldoc + date).
+        profile: (Optional) yamldoc.profile.Profile, see main.
+        use_mmap: Read the YAML file through a memory map, see iter_yaml.
+        schema_report: (Optional) Dictionary to store the schema.SchemaReport
+                       of the file in, under yaml_path, see main.
+        lists: (Optional) entries.ListPolicy bounding how much of each list
+               is shown, see main.
+        deterministic: Leave the date out of the footer, see main.
 
-        # Build the table with top level yaml
+    Returns:
+        Nothing.
+    """
+    if profile is not None:
+        memo = memo_snapshot()
+
+    documents, title, description = _prepare(
+        yaml_path, parsed_schema, char, debug, exclude_char, override_exclude,
+        title, description, profile, use_mmap, schema_report,
+    )
+
+    options = dict(
+        schema=parsed_schema is not None,
+        title=title,
+        description=description,
+        footer=footer,
+        lists=lists,
+        deterministic=deterministic,
+    )
+
+    with timed(profile, "render"):
+        if len(documents) > 1:
+            render_documents(documents, out, **options)
+        else:
+            render(documents[0] if documents else [], out, **options)
 
-        # We only need to print this if there's no
-        # top level variable first
-        if not yaml[0].isBase:
-            print("| Key | Value | Type | Information |")
-            print("| :-: | :-: | :-: | :-- |")
+    if profile is not None:
+        count_memo(profile, memo)
 
-        for value in yaml:
-            if not value.isBase:
-                print(value.to_markdown(schema=True))
 
-        # print("\n\n")
+def document_files(
+    yaml_path,
+    output,
+    parsed_schema=None,
+    char="#'",
+    debug=False,
+    exclude_char="#'!",
+    override_exclude=False,
+    title="Configuration Parameters Reference",
+    description="Any information about this page goes here.",
+    footer=True,
+    profile=None,
+    use_mmap=False,
+    schema_report=None,
+    lists=None,
+    deterministic=False,
+):
+    """
+    Like document, but writes each document in the YAML file to its own file.
 
-        for value in yaml:
-            if value.isBase:
-                print(value.to_markdown(schema=True))
+    Arguments:
+        output: Path the file names are made from: the documents of
+                "docs/config.md" are written to "docs/config-1.md",
+                "docs/config-2.md" and so on.
 
-        if footer:
-            print(
-                "---\nGenerated by [yamldoc](https://github.com/chris1221/yaml.doc)"
-                f" v{yamldoc.__version__} on {date.today()}"
-            )
+        The remaining arguments are the same as for document.
 
-    else:
-        print("# " + title + "\n\n" + description + "\n")
+    Returns:
+        List of the paths written, in document order.
+    """
+    if profile is not None:
+        memo = memo_snapshot()
+
+    documents, title, description = _prepare(
+        yaml_path, parsed_schema, char, debug, exclude_char, override_exclude,
+        title, description, profile, use_mmap, schema_report,
+    )
+
+    stem, extension = os.path.splitext(output)
+    paths = []
+    with timed(profile, "render"):
+        for number, yaml in enumerate(documents, 1):
+            path = f"{stem}-{number}{extension}"
+            with open(path, "w") as out:
+                render(
+                    yaml,
+                    out,
+                    schema=parsed_schema is not None,
+                    title=title,
+                    description=description,
+                    footer=footer,
+                    lists=lists,
+                    deterministic=deterministic,
+                )
+            paths.append(path)
+
+    if profile is not None:
+        count_memo(profile, memo)
+
+    return paths
+
+
+def document_formats(
+    yaml_path,
+    outputs,
+    parsed_schema=None,
+    char="#'",
+    debug=False,
+    exclude_char="#'!",
+    override_exclude=False,
+    title="Configuration Parameters Reference",
+    description="Any information about this page goes here.",
+    footer=True,
+    profile=None,
+    use_mmap=False,
+    schema_report=None,
+    lists=None,
+    deterministic=False,
+):
+    """
+    Like document, but writes the page in several formats from a single parse
+    and schema merge, through the representation in yamldoc.ir.
+
+    Arguments:
+        outputs: Dictionary mapping the name of each format (see
+                 yamldoc.emitters.EMITTERS) to a path or text stream.
 
-        yaml = parse_yaml(yaml_path, char, debug, exclude_char, override_exclude)
-        # Build the table with top level yaml
+        The remaining arguments are the same as for document.
 
-        # We only need to print this if there's no
-        # top level variable first
-        if not yaml[0].isBase:
-            print("| Key | Value | Information |")
-            print("| :-: | :-: | :-- |")
+    Returns:
+        Nothing.
+    """
+    from yamldoc.emitters import check_formats, emit
+    from yamldoc.ir import page_ir
 
-        for value in yaml:
-            if not value.isBase:
-                print(value.to_markdown())
+    check_formats(outputs)
 
-        for value in yaml:
-            if value.isBase:
-                print(value.to_markdown())
+    if profile is not None:
+        memo = memo_snapshot()
 
-        if footer:
-            print(
-                "---\nGenerated by [yamldoc](https://github.com/chris1221/yaml.doc)"
-                f" v{yamldoc.__version__} on {date.today()}"
-            )
+    documents, title, description = _prepare(
+        yaml_path, parsed_schema, char, debug, exclude_char, override_exclude,
+        title, description, profile, use_mmap, schema_report,
+    )
+
+    with timed(profile, "render"):
+        ir = page_ir(
+            documents, parsed_schema is not None, title, description, footer, lists,
+            deterministic,
+        )
+        for format, output in outputs.items():
+            if hasattr(output, "write"):
+                emit(ir, output, format)
+            else:
+                with open(output, "w") as out:
+                    emit(ir, out, format)
+
+    if profile is not None:
+        count_memo(profile, memo)
+
+
+def _prepare(
+    yaml_path,
+    parsed_schema,
+    char,
+    debug,
+    exclude_char,
+    override_exclude,
+    title,
+    description,
+    profile,
+    use_mmap,
+    schema_report,
+):
+    """
+    Parse the documents in a YAML file and merge in the schema.
+
+    Returns:
+        Tuple of (documents, title, description), the title and description
+        being replaced by those of the schema, if it has any.
+    """
+    with timed(profile, "parse_yaml"):
+        documents = parse_documents(
+            yaml_path, char, debug, exclude_char, override_exclude, profile, use_mmap
+        )
+
+    if profile is not None:
+        profile.count("documents", len(documents))
+        for yaml in documents:
+            tally(profile, yaml)
+
+    # If a schema has been specified, add the
+    # type information to the rest of the
+    # variables.
+    report = None
+    if parsed_schema is not None:
+        from yamldoc.schema import SchemaReport, as_compiled
+
+        compiled = as_compiled(parsed_schema)
+        report = SchemaReport(missing=compiled.properties)
+
+        # Edit the yaml in place with type information.
+        with timed(profile, "add_type_metadata"):
+            for yaml in documents:
+                document_report = compiled.apply(yaml, debug)
+                report = report.merge(document_report)
+                if profile is not None:
+                    profile.count("schema_properties_matched", len(document_report.matched))
+
+        title, description = compiled.page_text(title, description)
+
+    if schema_report is not None and report is not None:
+        schema_report[yaml_path] = report
+
+    return documents, title, description
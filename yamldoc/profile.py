@@ -0,0 +1,132 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+import yamldoc.entries
+
+
+class Profile:
+    """
+    Wall time per phase and counters collected while documenting YAML files.
+
+    Pass an instance as the profile argument of main (or document,
+    main_many, ...) and read it afterwards, or give a callback to hear about
+    each phase as it finishes.
+    """
+
+    def __init__(self, callback=None):
+        """
+        Initialize the object.
+
+        Arguments:
+            callback: (Optional) Called as callback(phase, seconds) whenever a
+                      phase finishes.
+        """
+        self.phases = {}
+        self.counters = {}
+        self.callback = callback
+
+    @contextmanager
+    def phase(self, name):
+        """Times the body of a with block and adds it to the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+            if self.callback is not None:
+                self.callback(name, elapsed)
+
+    def count(self, name, n=1):
+        """Adds n to the named counter."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other):
+        """Adds the phases and counters of another Profile, or of its as_dict()."""
+        if isinstance(other, Profile):
+            other = other.as_dict()
+        for name, seconds in other["phases"].items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        for name, n in other["counters"].items():
+            self.count(name, n)
+
+    def as_dict(self):
+        """Returns the phases and counters as plain dictionaries."""
+        return {"phases": dict(self.phases), "counters": dict(self.counters)}
+
+    def report(self):
+        """Returns a human readable summary."""
+        lines = [f"{'Phase':<28} {'Seconds':>9}"]
+        for name, seconds in self.phases.items():
+            lines.append(f"{name:<28} {seconds:>9.4f}")
+        lines.append(f"{'total':<28} {sum(self.phases.values()):>9.4f}")
+        lines.append("")
+        lines.append(f"{'Counter':<28} {'Count':>9}")
+        for name, n in self.counters.items():
+            lines.append(f"{name:<28} {n:>9}")
+        return "\n".join(lines)
+
+
+def timed(profile, name):
+    """Returns profile.phase(name), or a context manager that does nothing without a profile."""
+    if profile is None:
+        return nullcontext()
+    return profile.phase(name)
+
+
+def tally(profile, yaml):
+    """
+    Counts the entries, list elements and excluded blocks in a parsed document.
+
+    Arguments:
+        profile: Profile to add the counts to.
+        yaml: List of yaml representations from parse_yaml.
+    """
+    entries = 0
+    list_elements = 0
+    excluded = 0
+
+    for value in yaml:
+        if value.exclude:
+            excluded += 1
+
+    stack = list(yaml)
+    while stack:
+        entry = stack.pop()
+        if isinstance(entry, yamldoc.entries.ListElement):
+            list_elements += 1
+        elif entry.isBase:
+            stack.extend(entry.entries)
+        else:
+            entries += 1
+            if isinstance(entry.value, (list, yamldoc.entries.ListValue)):
+                list_elements += len(entry.value)
+
+    profile.count("entries", entries)
+    profile.count("list_elements", list_elements)
+    profile.count("excluded_blocks", excluded)
+
+
+# The memoized helpers whose hits and misses are reported as counters.
+MEMOIZED = {
+    "sanitize_meta": yamldoc.entries.sanitize_meta,
+    "wrap_meta": yamldoc.entries.wrap_meta,
+}
+
+
+def memo_snapshot():
+    """Returns the (hits, misses) of each memoized helper so far."""
+    return {name: function.cache_info()[:2] for name, function in MEMOIZED.items()}
+
+
+def count_memo(profile, before):
+    """
+    Counts the cache hits and misses of the memoized helpers since a snapshot.
+
+    Arguments:
+        profile: Profile to add the counts to.
+        before: Result of memo_snapshot taken when the work started.
+    """
+    for name, (hits, misses) in memo_snapshot().items():
+        profile.count(f"{name}_cache_hits", hits - before[name][0])
+        profile.count(f"{name}_cache_misses", misses - before[name][1])
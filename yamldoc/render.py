@@ -0,0 +1,177 @@
+import yamldoc
+
+
+def iter_markdown(
+    yaml,
+    schema=False,
+    title="Configuration Parameters Reference",
+    description="Any information about this page goes here.",
+    footer=True,
+    cache=False,
+    lists=None,
+    deterministic=False,
+):
+    """
+    Generate the markdown for a parsed YAML document in chunks.
+
+    Arguments:
+        yaml: List of yaml representations from parse_yaml.
+        schema: Print with four columns instead of three.
+        title: Title of markdown generated.
+        description: Description given below the title in markdown.
+        footer: Whether to include the footer (generated by yamldoc + date).
+        cache: Reuse the markdown of sections rendered before, see
+               MetaEntry.to_markdown.
+        lists: (Optional) entries.ListPolicy bounding how much of each list
+               is shown. By default lists are shown in full.
+        deterministic: Leave the date out of the footer, so that the same
+                       input always gives the same page.
+
+    Yields:
+        Pieces of the markdown document which, joined, form the whole page.
+    """
+    yield page_header(title, description)
+
+    # We only need to print this if there's no
+    # top level variable first
+    if yaml and not yaml[0].isBase:
+        yield table_header(schema)
+
+    yield from iter_rows(yaml, schema, lists)
+    yield from iter_sections(yaml, schema, cache, lists=lists)
+
+    if footer:
+        yield footer_text(False if deterministic else None)
+
+
+def page_header(title, description):
+    """Returns the title and description at the top of the page."""
+    return "# " + title + "\n\n" + description + "\n\n"
+
+
+def table_header(schema=False):
+    """Returns the header of the table of top level key value pairs."""
+    if schema:
+        return "| Key | Value | Type | Information |\n| :-: | :-: | :-: | :-- |\n"
+    return "| Key | Value | Information |\n| :-: | :-: | :-- |\n"
+
+
+def iter_rows(yaml, schema=False, lists=None):
+    """Generates the table rows of the top level key value pairs."""
+    for value in yaml:
+        if not value.isBase and not value.exclude:
+            yield value.to_markdown(schema=schema, lists=lists)
+            yield "\n"
+
+
+def has_rows(yaml):
+    """Returns True if iter_rows would generate any rows."""
+    return any(not value.isBase and not value.exclude for value in yaml)
+
+
+def iter_sections(yaml, schema=False, cache=False, level=2, lists=None):
+    """Generates the sections of the top level mappings."""
+    for value in yaml:
+        if value.isBase and not value.exclude:
+            if cache:
+                yield value.to_markdown(schema=schema, cache=True, level=level, lists=lists)
+            else:
+                yield from value.iter_markdown(schema=schema, level=level, lists=lists)
+            yield "\n"
+
+
+def document_header(number):
+    """Returns the heading of one document of a file holding several."""
+    return f"## Document {number}\n\n"
+
+
+def iter_documents_markdown(
+    documents,
+    schema=False,
+    title="Configuration Parameters Reference",
+    description="Any information about this page goes here.",
+    footer=True,
+    cache=False,
+    lists=None,
+    deterministic=False,
+):
+    """
+    Generate the markdown for several YAML documents from one file in chunks.
+
+    Each document gets its own numbered section holding its table and, one
+    level further down, the sections of its mappings.
+
+    Arguments:
+        documents: List of documents from parse_documents.
+
+        The remaining arguments are the same as for iter_markdown.
+
+    Yields:
+        Pieces of the markdown document which, joined, form the whole page.
+    """
+    yield page_header(title, description)
+
+    for number, yaml in enumerate(documents, 1):
+        yield document_header(number)
+
+        if yaml and not yaml[0].isBase:
+            yield table_header(schema)
+
+        yield from iter_rows(yaml, schema, lists)
+        if has_rows(yaml):
+            yield "\n"
+        yield from iter_sections(yaml, schema, cache, level=3, lists=lists)
+
+    if footer:
+        yield footer_text(False if deterministic else None)
+
+
+def footer_text(day=None):
+    """Returns the attribution footer, dated day or today, or undated if day is False."""
+    if day is False:
+        return (
+            "---\nGenerated by [yamldoc](https://github.com/chris1221/yaml.doc)"
+            f" v{yamldoc.__version__}\n"
+        )
+
+    if day is None:
+        # Imported here as it is the only use, to keep importing yamldoc fast.
+        from datetime import date
+
+        day = date.today()
+
+    return (
+        "---\nGenerated by [yamldoc](https://github.com/chris1221/yaml.doc)"
+        f" v{yamldoc.__version__} on {day}\n"
+    )
+
+
+def render(yaml, out, **kwargs):
+    """
+    Write the markdown for a parsed YAML document to a text stream.
+
+    Arguments:
+        yaml: List of yaml representations from parse_yaml.
+        out: Any object with a write method, e.g. an open file or io.StringIO.
+        **kwargs: Passed through to iter_markdown.
+
+    Returns:
+        Nothing.
+    """
+    write = out.write
+    for chunk in iter_markdown(yaml, **kwargs):
+        write(chunk)
+
+
+def render_documents(documents, out, **kwargs):
+    """
+    Write the markdown for several YAML documents to a text stream.
+
+    Arguments:
+        documents: List of documents from parse_documents.
+        out: Any object with a write method, e.g. an open file or io.StringIO.
+        **kwargs: Passed through to iter_documents_markdown.
+    """
+    write = out.write
+    for chunk in iter_documents_markdown(documents, **kwargs):
+        write(chunk)
@@ -0,0 +1,182 @@
+import codecs
+import mmap
+import re
+
+import yamldoc.parser
+
+
+def classify_bytes(line, char=b"#'", exclude_char=b"#'!"):
+    """
+    Classify a single line of raw UTF-8 bytes, as parser.classify_line does
+    for text. Only the slices that are returned are decoded.
+
+    Arguments:
+        line: A bytes object holding one line.
+        char: The yamldoc comment marker, encoded.
+        exclude_char: The exclusion marker, encoded.
+
+    Returns:
+        Tuple of (indent, kind, first, second), see parser.classify_line.
+    """
+    P = yamldoc.parser
+
+    body = line.lstrip(b" ")
+    indent = len(line) - len(body)
+    body = body.rstrip()
+
+    if not body:
+        return indent, P.BLANK, None, None
+
+    first = body[:1]
+    if first == b"#":
+        if body.startswith((char, exclude_char)):
+            return indent, P.COMMENT, body.decode("utf-8"), None
+        return indent, P.PLAIN_COMMENT, None, None
+
+    if first == b"-":
+        if body == b"---" or body.startswith(b"--- "):
+            return indent, P.DOCUMENT, body.decode("utf-8"), None
+        return indent, P.LIST_ITEM, body.lstrip(b"-").lstrip().decode("utf-8"), None
+
+    if body == b"...":
+        return indent, P.DOCUMENT, "...", None
+
+    colon = body.find(b":")
+    if colon == -1:
+        return indent, P.OTHER, body.decode("utf-8"), None
+
+    value = body[colon + 1:].lstrip()
+    if value:
+        return indent, P.KEY_VALUE, body[:colon].decode("utf-8"), value.decode("utf-8")
+    return indent, P.KEY, body[:colon].decode("utf-8"), None
+
+
+def iter_mmap_lines(path, char="#'", exclude_char="#'!"):
+    """
+    Read a file through a memory map, yielding each line classified.
+
+    The file is never read or decoded as a whole: lines are copied out of the
+    mapped bytes one at a time and only their keys, values and comments are
+    decoded. A leading UTF-8 byte order mark is skipped.
+
+    Arguments:
+        path: Path to the file.
+        char: A character string used to identify yamldoc blocks.
+        exclude_char: A character string used to identify blocks to exclude.
+
+    Yields:
+        Tuples of (line, indent, kind, first, second), where line is the raw bytes.
+    """
+    char = char.encode("utf-8")
+    exclude_char = exclude_char.encode("utf-8")
+
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            return
+
+        with buffer:
+            if buffer[:3] == codecs.BOM_UTF8:
+                buffer.seek(len(codecs.BOM_UTF8))
+
+            for line in iter(buffer.readline, b""):
+                yield (line, *classify_bytes(line, char, exclude_char))
+
+
+# A line at the top level that starts a key, i.e. not indented, not a
+# comment and not a list item.
+_TOP_LEVEL_KEY = re.compile(rb"^[^\s#\-][^\n]*:", re.MULTILINE)
+
+# A document marker, "---" (maybe followed by more) or "...".
+_DOCUMENT = re.compile(rb"^(?:---(?: [^\n]*)?|\.\.\.)[ \t\r]*$", re.MULTILINE)
+
+
+def split_points(path, n, char="#'", exclude_char="#'!"):
+    """
+    Find byte offsets that split a YAML file into about n independent pieces.
+
+    Every piece starts at a top level key, so each one can be parsed on its
+    own. A split is moved back over any comments right before the key, so
+    that the yamldoc comments documenting it stay in the same piece. Only a
+    few lines around each split are looked at; the rest of the file is left
+    to the regular expression engine.
+
+    Arguments:
+        path: Path to the YAML file.
+        n: Number of pieces wanted. Fewer are returned for small files.
+        char: A character string used to identify yamldoc blocks.
+        exclude_char: A character string used to identify blocks to exclude.
+
+    Returns:
+        Sorted list of offsets, starting with 0 and ending with the file size.
+    """
+    P = yamldoc.parser
+    char = char.encode("utf-8")
+    exclude_char = exclude_char.encode("utf-8")
+
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return [0, 0]
+
+        with buffer:
+            size = len(buffer)
+            points = [0]
+            for i in range(1, n):
+                match = _TOP_LEVEL_KEY.search(buffer, max(size * i // n, points[-1] + 1))
+                if match is None:
+                    break
+                start = match.start()
+
+                # Walk back over the comments and blank lines before the key.
+                # Indented comments are left alone, as they may be lines of
+                # a block scalar above it.
+                while start > points[-1]:
+                    previous = buffer.rfind(b"\n", 0, start - 1) + 1
+                    indent, kind = classify_bytes(buffer[previous:start], char, exclude_char)[:2]
+                    if kind != P.BLANK and (
+                        indent
+                        or kind not in (P.COMMENT, P.PLAIN_COMMENT, P.DOCUMENT)
+                    ):
+                        break
+                    start = previous
+
+                if start > points[-1]:
+                    points.append(start)
+
+            points.append(size)
+
+    return points
+
+
+def has_several_documents(path):
+    """
+    Tells whether a YAML file holds more than one document with keys in it.
+
+    That is the case when a top level key comes both before and after some
+    document marker. Only a few regular expression searches are run over
+    the file, which is not parsed.
+
+    Arguments:
+        path: Path to the YAML file.
+
+    Returns:
+        True or False.
+    """
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return False
+
+        with buffer:
+            key = _TOP_LEVEL_KEY.search(buffer)
+            if key is None:
+                return False
+            marker = _DOCUMENT.search(buffer, key.end())
+            if marker is None:
+                return False
+            return _TOP_LEVEL_KEY.search(buffer, marker.end()) is not None
@@ -0,0 +1,230 @@
+"""
+Schemas compiled once into lookup tables, so that one schema can be applied
+to many YAML files, and reports of how well each file matches it.
+
+Schema properties are (section, key) pairs, as filed by index_entries:
+the section is parser.TOP_LEVEL for the top level, which parse_schema calls
+"base", and otherwise the name of the mapping holding the key.
+"""
+from types import MappingProxyType
+
+import yamldoc.cache
+import yamldoc.parser
+
+
+def property_name(prop):
+    """Returns a (section, key) pair as a dotted name, e.g. "two.entry"."""
+    section, key = prop
+    return key if section is yamldoc.parser.TOP_LEVEL else f"{section}.{key}"
+
+
+class SchemaReport:
+    """
+    Which schema properties a YAML file uses.
+
+    Attributes:
+        matched: Frozen set of the schema properties found in the file.
+        missing: Frozen set of the schema properties not found in the file.
+        unknown: Frozen set of the keys in the file the schema does not describe.
+    """
+
+    __slots__ = ("matched", "missing", "unknown")
+
+    def __init__(self, matched=(), missing=(), unknown=()):
+        self.matched = frozenset(matched)
+        self.missing = frozenset(missing)
+        self.unknown = frozenset(unknown)
+
+    def merge(self, other):
+        """
+        Combine the reports of two parts of the same file, e.g. two of its
+        documents. A property is only missing if neither part has it.
+        """
+        matched = self.matched | other.matched
+        return SchemaReport(
+            matched, (self.missing | other.missing) - matched, self.unknown | other.unknown
+        )
+
+    def as_dict(self):
+        """Returns the report as sorted lists of dotted names, e.g. for JSON."""
+        return {
+            "matched": sorted(map(property_name, self.matched)),
+            "missing": sorted(map(property_name, self.missing)),
+            "unknown": sorted(map(property_name, self.unknown)),
+        }
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.matched, self.missing, self.unknown) == (
+            other.matched,
+            other.missing,
+            other.unknown,
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        counts = ", ".join(f"{name}={len(getattr(self, name))}" for name in self.__slots__)
+        return f"SchemaReport({counts})"
+
+
+class CompiledSchema:
+    """
+    A parsed schema turned into lookup tables keyed by property.
+
+    The tables are never changed once built, so one compiled schema can be
+    applied to any number of YAML files, from several threads at once.
+    """
+
+    __slots__ = ("types", "extras", "specials", "properties", "sections")
+
+    def __init__(self, parsed_schema):
+        """
+        Initialize the object.
+
+        Arguments:
+            parsed_schema: The (schema, specials, extras) tuple from parse_schema.
+        """
+        schema, specials, extras = parsed_schema
+        section_of = yamldoc.parser.schema_section
+
+        # Variables with several types keep them in a list, stored as a tuple
+        # here and copied back into a list for each entry.
+        types = {
+            (section_of(section), key): tuple(value) if isinstance(value, list) else value
+            for section, variables in schema.items()
+            for key, value in variables.items()
+        }
+        extra = {
+            (section_of(section), key): MappingProxyType(dict(meta))
+            for section, variables in extras.items()
+            for key, meta in variables.items()
+        }
+
+        init = object.__setattr__
+        init(self, "types", MappingProxyType(types))
+        init(self, "extras", MappingProxyType(extra))
+        init(self, "specials", MappingProxyType(dict(specials)))
+        init(self, "properties", frozenset(types) | frozenset(extra))
+        init(self, "sections", frozenset(map(section_of, set(schema) | set(extras))))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledSchema cannot be changed.")
+
+    def __reduce__(self):
+        # Back to the sections as parse_schema names them.
+        def name(section):
+            return "base" if section is yamldoc.parser.TOP_LEVEL else section
+
+        schema = {name(section): {} for section in self.sections}
+        extras = {name(section): {} for section in self.sections}
+        for (section, key), value in self.types.items():
+            schema[name(section)][key] = list(value) if isinstance(value, tuple) else value
+        for (section, key), meta in self.extras.items():
+            extras[name(section)][key] = dict(meta)
+        return self.__class__, ((schema, dict(self.specials), extras),)
+
+    def __repr__(self):
+        return f"CompiledSchema({len(self.properties)} properties)"
+
+    def page_text(self, title, description):
+        """Returns the title and description, replaced by the schema's own if it has any."""
+        return (
+            self.specials.get("_yamldoc_title", title),
+            self.specials.get("_yamldoc_description", description),
+        )
+
+    def apply(self, yaml, debug=False):
+        """
+        Modify a parsed YAML document in place to add the types and extra
+        information of the schema, as add_type_metadata and
+        add_extra_metadata do, and report which properties it matched.
+
+        Arguments:
+            yaml: List of yaml representations from parse_yaml.
+            debug: Print debug information
+
+        Returns:
+            SchemaReport of the document.
+        """
+        matched = set()
+        unknown = set()
+
+        for prop, entries in yamldoc.parser.index_entries(yaml).items():
+            if prop in self.properties:
+                matched.add(prop)
+            elif not (prop[1] in self.sections and any(entry.isBase for _, entry in entries)):
+                # Mappings are described by the sections named after them.
+                unknown.add(prop)
+
+            var_type = self.types.get(prop)
+            if var_type is not None:
+                for parent, entry in entries:
+                    if parent is not None and debug:
+                        print(f"Setting type of {prop[1]}")
+                    entry.type = list(var_type) if isinstance(var_type, tuple) else var_type
+
+                    if parent is not None:
+                        parent.has_schema = True
+                        entry.has_schema = True
+
+            meta = self.extras.get(prop)
+            if meta is not None:
+                for _, entry in entries:
+                    for key, value in meta.items():
+                        setattr(entry, key, value)
+
+        for value in yaml:
+            prop = (yamldoc.parser.TOP_LEVEL, value.name) if value.isBase else None
+            if prop and value.name not in self.sections and prop not in self.properties:
+                unknown.add(prop)
+
+        return SchemaReport(matched, self.properties - matched, unknown)
+
+
+def as_compiled(parsed_schema):
+    """Returns a parsed schema as a CompiledSchema, compiling it if needed."""
+    if parsed_schema is None or isinstance(parsed_schema, CompiledSchema):
+        return parsed_schema
+    return CompiledSchema(parsed_schema)
+
+
+def compile_schema(schema_path, debug=False, cache_dir=None):
+    """
+    Parse and compile a schema file.
+
+    Arguments:
+        schema_path: Path to schema file.
+        debug: Print debug information
+        cache_dir: Directory to cache the parsed schema in, see cache.load_schema.
+
+    Returns:
+        CompiledSchema.
+    """
+    return CompiledSchema(yamldoc.cache.load_schema(schema_path, debug, cache_dir))
+
+
+def apply_schema(compiled, yaml_paths, debug=False, **options):
+    """
+    Apply one compiled schema to many YAML files.
+
+    Arguments:
+        compiled: CompiledSchema, or a (schema, specials, extras) tuple.
+        yaml_paths: Paths to YAML files.
+        debug: Print debug information
+        options: Any of char, exclude_char and override_exclude, see parse_yaml.
+
+    Returns:
+        List of (documents, report) pairs in the order of yaml_paths, the
+        documents having been given types in place, see parse_documents.
+    """
+    compiled = as_compiled(compiled)
+    results = []
+    for yaml_path in yaml_paths:
+        documents = yamldoc.parser.parse_documents(yaml_path, debug=debug, **options)
+        report = SchemaReport(missing=compiled.properties)
+        for yaml in documents:
+            report = report.merge(compiled.apply(yaml, debug))
+        results.append((documents, report))
+    return results
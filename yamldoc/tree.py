@@ -0,0 +1,341 @@
+"""
+Documenting a whole directory tree of YAML files, each with its own schema,
+into a mirrored tree of markdown pages with an index page.
+
+Each YAML file is paired with a schema by the first of:
+
+1. The first pattern in the mapping file that matches its path relative to
+   the tree. The mapping file is itself flat YAML, read with parse_yaml,
+   whose keys are glob patterns and whose values are schema paths relative
+   to the mapping file::
+
+       "envs/*.yaml": schemas/app.schema
+       services/*/deploy.yaml: schemas/deploy.schema
+
+2. A schema beside it with the same name: config.yaml uses config.schema.
+3. The default schema, if one is given.
+
+Files and directories starting with a dot are not documented.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatchcase
+
+import yamldoc.parser
+from yamldoc.batch import write_page
+from yamldoc.profile import Profile, timed
+from yamldoc.render import footer_text
+from yamldoc.schema import compile_schema
+
+# Read from the top of the tree when no mapping file is given.
+MAPPING_NAME = ".yamldoc-schemas.yaml"
+INDEX_NAME = "index.md"
+YAML_EXTENSIONS = (".yaml", ".yml")
+SCHEMA_EXTENSION = ".schema"
+
+# Schemas compiled by this process, by path, or the exception raised while
+# compiling them, so that each is only read once however many files use it.
+_schemas = {}
+
+
+def read_mapping(mapping_path):
+    """
+    Read a mapping file of glob patterns to schema paths.
+
+    Arguments:
+        mapping_path: Path to the mapping file.
+
+    Returns:
+        List of (pattern, schema_path) pairs in file order, with the schema
+        paths joined to the directory of the mapping file.
+
+    Raises:
+        ValueError: If a pattern maps to a list or a mapping.
+    """
+    base = os.path.dirname(mapping_path)
+    mapping = []
+    for entry in yamldoc.parser.parse_yaml(mapping_path):
+        # Lists, whether written as items or in brackets, and mappings are
+        # not schema paths.
+        if entry.isBase or not isinstance(entry.value, str) or entry.value[:1] in "[{":
+            name = entry.name if entry.isBase else entry.key
+            raise ValueError(f"{mapping_path}: {name!r} should map a pattern to a schema.")
+        mapping.append((_unquote(entry.key), os.path.join(base, _unquote(entry.value))))
+    return mapping
+
+
+def _unquote(text):
+    """Returns text without the quotes around it, if it is quoted."""
+    if len(text) > 1 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    return text
+
+
+def find_pairs(root, mapping_path=None, schema_path=None):
+    """
+    Find the YAML files in a directory tree and the schema of each one.
+
+    Arguments:
+        root: Directory to walk.
+        mapping_path: (Optional) Mapping file, see the module documentation.
+                      Defaults to MAPPING_NAME in root, if there is one.
+        schema_path: (Optional) Schema for files nothing else pairs up.
+
+    Returns:
+        List of (yaml_path, schema_path) pairs sorted by path, schema_path
+        being None for files without one. Files used as schemas, and the
+        mapping file, are left out.
+    """
+    if mapping_path is None and os.path.isfile(os.path.join(root, MAPPING_NAME)):
+        mapping_path = os.path.join(root, MAPPING_NAME)
+    mapping = [] if mapping_path is None else read_mapping(mapping_path)
+
+    yaml_paths = []
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if not name.startswith(".") and name.endswith(YAML_EXTENSIONS):
+                yaml_paths.append(os.path.join(directory, name))
+
+    pairs = []
+    for path in yaml_paths:
+        relative = os.path.relpath(path, root).replace(os.sep, "/")
+        schema = next(
+            (schema for pattern, schema in mapping if fnmatchcase(relative, pattern)), None
+        )
+        if schema is None:
+            beside = os.path.splitext(path)[0] + SCHEMA_EXTENSION
+            schema = beside if os.path.isfile(beside) else schema_path
+        pairs.append((path, schema))
+
+    skip = {os.path.abspath(schema) for _, schema in pairs if schema is not None}
+    if mapping_path is not None:
+        skip.add(os.path.abspath(mapping_path))
+    return [pair for pair in pairs if os.path.abspath(pair[0]) not in skip]
+
+
+def tree_outputs(root, yaml_paths, output_dir):
+    """
+    Work out where the page of each YAML file is written, mirroring the
+    tree under output_dir. Files that would share a page, e.g. a.yaml and
+    a.yml, keep their extension in its name instead.
+
+    Returns:
+        List of output paths, one for each input.
+    """
+    stems = [os.path.splitext(os.path.relpath(path, root))[0] for path in yaml_paths]
+    outputs = []
+    for path, stem in zip(yaml_paths, stems):
+        if stems.count(stem) > 1:
+            stem = os.path.relpath(path, root)
+        outputs.append(os.path.join(output_dir, stem + ".md"))
+    return outputs
+
+
+def _document_pair(
+    yaml_path, output_path, schema_path, options, profiling, render_cache, debug, cache_dir
+):
+    """
+    Document one YAML file with its schema, compiling the schema the first
+    time this process needs it.
+
+    Returns a tuple of (profile, report, error): the profile as a dictionary
+    if profiling, the schema.SchemaReport of the file or None, and a message
+    describing why the file could not be documented, or None.
+    """
+    profile = Profile() if profiling else None
+    try:
+        parsed_schema = None
+        if schema_path is not None:
+            if schema_path not in _schemas:
+                try:
+                    with timed(profile, "parse_schema"):
+                        _schemas[schema_path] = compile_schema(schema_path, debug, cache_dir)
+                except Exception as e:
+                    _schemas[schema_path] = e
+            parsed_schema = _schemas[schema_path]
+            if isinstance(parsed_schema, Exception):
+                raise parsed_schema
+
+        report = write_page(
+            yaml_path, output_path, parsed_schema, options, profile, render_cache, schema_path
+        )
+    except Exception as e:
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+        return None if profile is None else profile.as_dict(), None, f"{type(e).__name__}: {e}"
+
+    return None if profile is None else profile.as_dict(), report, None
+
+
+def main_tree(
+    root,
+    output_dir,
+    jobs=1,
+    schema_path=None,
+    mapping_path=None,
+    char="#'",
+    debug=False,
+    exclude_char="#'!",
+    override_exclude=False,
+    title="Configuration Parameters Reference",
+    description="Any information about this page goes here.",
+    footer=True,
+    cache_dir=None,
+    profile=None,
+    use_mmap=False,
+    schema_report=None,
+    lists=None,
+    deterministic=False,
+    render_cache=None,
+):
+    """
+    Document every YAML file in a directory tree, writing a mirrored tree of
+    pages to output_dir and an index page linking to them.
+
+    A file that cannot be documented, or whose schema cannot be read, is
+    listed on the index page with the error and the rest carry on.
+
+    Arguments:
+        root: Directory to document.
+        output_dir: Directory to write the pages and INDEX_NAME to.
+        jobs: Number of worker processes. 1 documents the files in this
+              process and 0 or None uses one process per CPU. Each process
+              compiles a schema only once, however many files use it.
+        schema_path: (Optional) Schema for files without one of their own,
+                     see find_pairs.
+        mapping_path: (Optional) Mapping file of patterns to schemas, see
+                      find_pairs.
+        schema_report: (Optional) Dictionary to store the schema.SchemaReport
+                       of each file with a schema in, see main.
+
+        The remaining arguments are the same as for batch.main_many.
+
+    Returns:
+        A tuple of (pages, failures): a list of (yaml_path, schema_path,
+        output_path) for each page written, and a dictionary mapping each
+        YAML file that failed to its error message.
+    """
+    if not os.path.isdir(root):
+        raise NotADirectoryError(f"No such directory: {root!r}")
+
+    pairs = find_pairs(root, mapping_path, schema_path)
+    # Files sharing a schema are handed out together, so each worker tends
+    # to compile fewer of them.
+    pairs.sort(key=lambda pair: (pair[1] or "", pair[0]))
+    yaml_paths = [path for path, _ in pairs]
+    schema_paths = [schema for _, schema in pairs]
+    outputs = tree_outputs(root, yaml_paths, output_dir)
+
+    options = dict(
+        char=char,
+        debug=debug,
+        exclude_char=exclude_char,
+        override_exclude=override_exclude,
+        title=title,
+        description=description,
+        footer=footer,
+        use_mmap=use_mmap,
+        lists=lists,
+        deterministic=deterministic,
+    )
+    n = len(pairs)
+    args = (
+        yaml_paths, outputs, schema_paths, [options] * n, [profile is not None] * n,
+        [render_cache] * n, [debug] * n, [cache_dir] * n,
+    )
+
+    if (not jobs or jobs > 1) and n > 1:
+        workers = jobs or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, n)) as pool:
+            results = list(pool.map(_document_pair, *args, chunksize=max(1, n // (workers * 4))))
+    else:
+        try:
+            results = list(map(_document_pair, *args))
+        finally:
+            _schemas.clear()
+
+    pages = []
+    failures = {}
+    for yaml_path, schema, output, (worker_profile, report, error) in zip(
+        yaml_paths, schema_paths, outputs, results
+    ):
+        if profile is not None:
+            profile.merge(worker_profile)
+        if error is not None:
+            failures[yaml_path] = error
+            continue
+        pages.append((yaml_path, schema, output))
+        if schema_report is not None and report is not None:
+            schema_report[yaml_path] = report
+
+    pages.sort()
+    if profile is not None:
+        profile.count("pages", len(pages))
+        profile.count("failures", len(failures))
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, INDEX_NAME), "w") as out:
+        out.writelines(iter_index(root, output_dir, pages, failures, footer, deterministic))
+
+    return pages, failures
+
+
+def _cell(text):
+    """Returns text fit for a markdown table cell."""
+    return " ".join(str(text).split()).replace("|", "\\|")
+
+
+def _relative(path, start):
+    return os.path.relpath(path, start).replace(os.sep, "/")
+
+
+def iter_index(root, output_dir, pages, failures, footer=True, deterministic=False):
+    """
+    Generate the markdown of the index page of a documented tree.
+
+    Arguments:
+        root: Directory that was documented.
+        output_dir: Directory the index page is written to.
+        pages: (yaml_path, schema_path, output_path) of each page written.
+        failures: Dictionary mapping each YAML file that failed to its error.
+        footer: Whether to include the footer.
+        deterministic: Leave the date out of the footer.
+
+    Yields:
+        Pieces of the markdown page.
+    """
+    yield "# Configuration Index\n\n"
+    yield f"{len(pages)} of {len(pages) + len(failures)} YAML files documented.\n\n"
+
+    if pages:
+        yield "| File | Schema | Documentation |\n| :-- | :-- | :-- |\n"
+        for yaml_path, schema, output in pages:
+            link = _relative(output, output_dir)
+            schema = "" if schema is None else f"`{_cell(_schema_name(schema, root))}`"
+            yield f"| `{_cell(_relative(yaml_path, root))}` | {schema} | [{link}]({link}) |\n"
+        yield "\n"
+
+    if failures:
+        yield "## Failures\n\n| File | Error |\n| :-- | :-- |\n"
+        for yaml_path, error in sorted(failures.items()):
+            yield f"| `{_cell(_relative(yaml_path, root))}` | {_cell(error)} |\n"
+        yield "\n"
+
+    if footer:
+        yield footer_text(False if deterministic else None)
+
+
+def _schema_name(schema_path, root):
+    """Returns a schema path relative to root if it is inside it."""
+    relative = _relative(os.path.abspath(schema_path), os.path.abspath(root))
+    return schema_path if relative.startswith("../") else relative
+
+
+def report_failures(failures, stream=None):
+    """Prints one line to stream (default stderr) for each file that failed."""
+    for yaml_path, error in sorted(failures.items()):
+        print(f"yamldoc: could not document {yaml_path}: {error}", file=stream or sys.stderr)
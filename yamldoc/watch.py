@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+
+import yamldoc.cache
+import yamldoc.parser
+
+
+class Watcher:
+    """
+    Keeps documentation up to date with its YAML and schema files by polling
+    them for changes.
+
+    Only the outputs of YAML files that changed are rendered again, with the
+    schema parsed at the start. A change to the schema re-parses it and
+    renders every output.
+    """
+
+    def __init__(
+        self,
+        yaml_paths,
+        outputs,
+        schema_path=None,
+        debounce=0.5,
+        cache_dir=None,
+        **options,
+    ):
+        """
+        Initialize the object.
+
+        Arguments:
+            yaml_paths: Paths to YAML files.
+            outputs: Output path for each YAML file, or None for stdout.
+            schema_path: Path to schema file, or None.
+            debounce: Seconds the files must stay unchanged before rendering,
+                      so that a burst of saves causes a single render.
+            cache_dir: Directory to cache the parsed schema in, see main.
+            **options: Passed to parser.document, e.g. char or footer.
+        """
+        self.targets = list(zip(yaml_paths, outputs))
+        self.schema_path = schema_path
+        self.debounce = debounce
+        self.cache_dir = cache_dir
+        self.options = options
+
+        self.parsed_schema = None
+        self._seen = {}
+        self._pending = set()
+        self._changed_at = None
+
+    def watched(self):
+        """Returns the paths being watched."""
+        paths = [path for path, _ in self.targets]
+        if self.schema_path is not None:
+            paths.append(self.schema_path)
+        return paths
+
+    def _load_schema(self):
+        if self.schema_path is not None:
+            self.parsed_schema = yamldoc.cache.load_schema(
+                self.schema_path, self.options.get("debug", False), self.cache_dir
+            )
+
+    def _render(self, yaml_path, output):
+        if output is None:
+            yamldoc.parser.document(yaml_path, sys.stdout, self.parsed_schema, **self.options)
+            sys.stdout.flush()
+        else:
+            options = self.options
+            if options.get("lists") is not None:
+                options = dict(options, lists=options["lists"].for_output(output))
+            os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+            with open(output, "w") as out:
+                yamldoc.parser.document(yaml_path, out, self.parsed_schema, **options)
+
+    def _rebuild(self, changed):
+        """Renders the outputs affected by the changed paths."""
+        rendered = []
+        try:
+            if self.schema_path in changed:
+                self._load_schema()
+                targets = self.targets
+            else:
+                targets = [(path, out) for path, out in self.targets if path in changed]
+
+            for path, out in targets:
+                try:
+                    self._render(path, out)
+                except Exception as e:
+                    print(f"yamldoc: could not document {path}: {e}", file=sys.stderr)
+                else:
+                    rendered.append(path)
+        except Exception as e:
+            print(f"yamldoc: could not parse {self.schema_path}: {e}", file=sys.stderr)
+
+        return rendered
+
+    def start(self):
+        """
+        Renders every output and records the state of the watched files.
+
+        Returns:
+            List of the YAML paths that were rendered.
+        """
+        self._seen = {path: yamldoc.cache.file_signature(path) for path in self.watched()}
+        return self._rebuild(set(self.watched()))
+
+    def poll(self, now=None):
+        """
+        Checks the watched files once, rendering if a change has settled.
+
+        Arguments:
+            now: Current time from time.monotonic, mainly for testing.
+
+        Returns:
+            List of the YAML paths that were rendered, usually empty.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        for path in self.watched():
+            signature = yamldoc.cache.file_signature(path)
+            if signature != self._seen.get(path):
+                self._seen[path] = signature
+                self._pending.add(path)
+                self._changed_at = now
+
+        if self._pending and now - self._changed_at >= self.debounce:
+            changed, self._pending = self._pending, set()
+            return self._rebuild(changed)
+
+        return []
+
+    def run(self, interval=0.5):
+        """Renders everything, then polls every interval seconds until interrupted."""
+        self.start()
+        try:
+            while True:
+                time.sleep(interval)
+                self.poll()
+        except KeyboardInterrupt:
+            pass
+
+
+def watch(yaml_paths, outputs, schema_path=None, interval=0.5, debounce=0.5, **options):
+    """
+    Render documentation and keep re-rendering it as the inputs change.
+
+    Arguments:
+        yaml_paths: Paths to YAML files.
+        outputs: Output path for each YAML file, or None for stdout.
+        schema_path: Path to schema file, or None.
+        interval: Seconds between checks of the files.
+        debounce: Seconds the files must stay unchanged before rendering.
+        **options: Passed to Watcher.
+
+    Returns:
+        Nothing, runs until interrupted.
+    """
+    Watcher(yaml_paths, outputs, schema_path, debounce, **options).run(interval)
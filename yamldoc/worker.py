@@ -0,0 +1,217 @@
+import io
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from datetime import date
+
+import yamldoc.cache
+import yamldoc.parser
+from yamldoc.profile import Profile
+from yamldoc.schema import compile_schema
+
+# Request fields passed on to parser.document, with their defaults.
+OPTIONS = {
+    "char": "#'",
+    "exclude_char": "#'!",
+    "override_exclude": False,
+    "title": "Configuration Parameters Reference",
+    "description": "Any information about this page goes here.",
+    "footer": True,
+    "deterministic": False,
+}
+
+# Request fields that are not rendering options.
+FIELDS = {"id", "yaml_path", "schema_path", "output"}
+
+
+class LRU:
+    """A dictionary that forgets its least recently used items past a size."""
+
+    def __init__(self, size):
+        self.size = size
+        self.items = OrderedDict()
+
+    def get(self, key, default=None):
+        if key not in self.items:
+            return default
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Worker:
+    """
+    Documents YAML files on request, keeping parsed schemas and rendered
+    markdown in memory between requests.
+
+    A schema is parsed again only when its modification time or size
+    changes, and a request whose YAML file, schema and options are all the
+    same as an earlier one is answered from memory.
+    """
+
+    def __init__(self, schemas=16, outputs=64, cache_dir=None):
+        """
+        Initialize the object.
+
+        Arguments:
+            schemas: Number of parsed schemas to keep.
+            outputs: Number of rendered documents to keep.
+            cache_dir: Directory to cache parsed schemas in, see main.
+        """
+        self.schemas = LRU(schemas)
+        self.outputs = LRU(outputs)
+        self.cache_dir = cache_dir
+
+    def _schema(self, schema_path, profile):
+        """Returns the compiled schema and the signature it was parsed at."""
+        signature = yamldoc.cache.file_signature(schema_path)
+        if signature is None:
+            raise FileNotFoundError(f"No such schema file: {schema_path!r}")
+
+        key = os.path.abspath(schema_path)
+        cached = self.schemas.get(key)
+        if cached is not None and cached[0] == signature:
+            profile.count("schema_cache_hits")
+            return cached
+
+        profile.count("schema_cache_misses")
+        with profile.phase("parse_schema"):
+            parsed = compile_schema(schema_path, cache_dir=self.cache_dir)
+        self.schemas.put(key, (signature, parsed))
+        return signature, parsed
+
+    def handle(self, request):
+        """
+        Answer a single request.
+
+        Arguments:
+            request: Dictionary with a yaml_path and optionally a schema_path,
+                     an output path, an id echoed in the response and any of
+                     the options in OPTIONS. Without an output, the markdown
+                     is returned in the response.
+
+        Returns:
+            Response dictionary with a status of "ok" or "error", the
+            seconds spent in each phase, whether the output was cached and,
+            with a schema, the schema report (see schema.SchemaReport).
+        """
+        start = time.perf_counter()
+        response = {"id": request.get("id")}
+        profile = Profile()
+
+        try:
+            unknown = set(request) - FIELDS - set(OPTIONS)
+            if unknown:
+                raise ValueError(f"Unknown request fields: {', '.join(sorted(unknown))}")
+            if "yaml_path" not in request:
+                raise ValueError("Request has no yaml_path.")
+
+            yaml_path = request["yaml_path"]
+            schema_path = request.get("schema_path")
+            output = request.get("output")
+            options = {name: request.get(name, default) for name, default in OPTIONS.items()}
+
+            yaml_signature = yamldoc.cache.file_signature(yaml_path)
+            if yaml_signature is None:
+                raise FileNotFoundError(f"No such YAML file: {yaml_path!r}")
+
+            schema_signature = parsed_schema = None
+            if schema_path is not None:
+                schema_signature, parsed_schema = self._schema(schema_path, profile)
+
+            key = (
+                os.path.abspath(yaml_path),
+                yaml_signature,
+                schema_path and os.path.abspath(schema_path),
+                schema_signature,
+                tuple(sorted(options.items())),
+                # The footer holds the date.
+                date.today() if options["footer"] and not options["deterministic"] else None,
+            )
+            cached = self.outputs.get(key)
+            response["cached"] = cached is not None
+
+            if cached is None:
+                out = io.StringIO()
+                report = {}
+                yamldoc.parser.document(
+                    yaml_path, out, parsed_schema, profile=profile, schema_report=report,
+                    **options
+                )
+                report = report.get(yaml_path)
+                cached = out.getvalue(), None if report is None else report.as_dict()
+                self.outputs.put(key, cached)
+
+            markdown, report = cached
+            if report is not None:
+                response["schema_report"] = report
+
+            if output is None:
+                response["markdown"] = markdown
+            else:
+                with profile.phase("write"):
+                    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+                    with open(output, "w") as f:
+                        f.write(markdown)
+                response["output"] = output
+
+            response["status"] = "ok"
+        except Exception as e:
+            response["status"] = "error"
+            response["error"] = f"{type(e).__name__}: {e}"
+
+        response["timings"] = dict(profile.phases)
+        response["timings"]["total"] = time.perf_counter() - start
+        response["counters"] = dict(profile.counters)
+        return response
+
+    def serve(self, stdin=None, stdout=None):
+        """
+        Answer JSON line requests until stdin is closed.
+
+        Each line of stdin holds one request as a JSON object, see handle,
+        and each gets one line of JSON in reply, written and flushed before
+        the next request is read. Blank lines are ignored.
+
+        Arguments:
+            stdin: Text stream to read requests from. Defaults to sys.stdin.
+            stdout: Text stream to write responses to. Defaults to sys.stdout.
+        """
+        stdin = sys.stdin if stdin is None else stdin
+        stdout = sys.stdout if stdout is None else stdout
+
+        for line in stdin:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"id": None, "status": "error", "error": f"Bad request: {e}"}
+            else:
+                if isinstance(request, dict):
+                    response = self.handle(request)
+                else:
+                    response = {
+                        "id": None,
+                        "status": "error",
+                        "error": "Bad request: expected a JSON object.",
+                    }
+
+            stdout.write(json.dumps(response) + "\n")
+            stdout.flush()
+
+
+def serve(stdin=None, stdout=None, cache_dir=None):
+    """Runs a Worker on stdin and stdout, see Worker.serve."""
+    Worker(cache_dir=cache_dir).serve(stdin, stdout)